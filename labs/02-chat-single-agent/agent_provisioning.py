@@ -0,0 +1,191 @@
+import hashlib
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict
+
+FINGERPRINT_KEY = "toolset_fingerprint"
+DEFAULT_CACHE_PATH = Path(__file__).parent / ".agent_cache.json"
+
+
+def agent_fingerprint(model: str, instructions: str, toolset) -> str:
+    """Hash of everything that requires the agent to be updated when it changes"""
+    payload = json.dumps({
+        "model": model,
+        "instructions": instructions.strip(),
+        # Function tools come from a set, so sort to be independent of its order
+        "tools": sorted((definition.as_dict() for definition in toolset.definitions),
+                        key=lambda d: json.dumps(d, sort_keys=True)),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _load_cache(cache_path: Path) -> Dict[str, Dict[str, str]]:
+    try:
+        return json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path: Path, cache: Dict[str, Dict[str, str]]) -> None:
+    try:
+        cache_path.write_text(json.dumps(cache, indent=2))
+    except OSError as e:
+        print(f"Failed to write agent cache: {e}")
+
+
+def _register_toolset(project_client, agent_id: str, toolset):
+    """
+    Register the toolset of an agent reused by id with the client.
+
+    The SDK executes local function tools during streaming only for agents it
+    created or updated itself, so the agent is updated with its unchanged
+    toolset through the public API. The update returns the agent, so it also
+    takes the place of fetching the agent by id.
+
+    Raises:
+        Exception: If the toolset cannot be registered; tool calls would fail later otherwise
+    """
+    try:
+        return project_client.agents.update_agent(assistant_id=agent_id, toolset=toolset)
+    except Exception as e:
+        raise Exception(f"Failed to register toolset for agent {agent_id}: {str(e)}") from e
+
+
+def _find_agent_by_name(project_client, name: str):
+    after = None
+    while True:
+        page = project_client.agents.list_agents(limit=100, after=after)
+        for agent in page.data:
+            if agent.name == name:
+                return agent
+        if not page.has_more:
+            return None
+        after = page.last_id
+
+
+def resolve_agent(project_client,
+                  name: str,
+                  model: str,
+                  instructions: str,
+                  toolset,
+                  cache_path: Path = DEFAULT_CACHE_PATH):
+    """
+    Get the agent with the given name, creating or updating it only when needed.
+
+    The agent id is cached locally, and a fingerprint of model, instructions
+    and tool definitions is stored in the agent's metadata. On startup an
+    unchanged cached agent costs one round-trip: it is updated by id with its
+    toolset, which registers the local function tools and returns the agent.
+    Listing agents is only needed when the cache is empty or stale, and the
+    agent's model and instructions are updated only when the fingerprint
+    changed.
+
+    Args:
+        project_client: Azure AI project client
+        name: Agent name, e.g. "kyc-agent"
+        model: Model deployment name
+        instructions: Agent instructions
+        toolset: ToolSet with the agent's tools
+        cache_path: File storing agent ids and fingerprints
+
+    Returns:
+        The agent
+    """
+    fingerprint = agent_fingerprint(model, instructions, toolset)
+    cache = _load_cache(cache_path)
+    cached = cache.get(name)
+
+    agent = None
+    registered = False
+    if cached:
+        try:
+            if cached.get("fingerprint") == fingerprint:
+                agent = _register_toolset(project_client, cached["id"], toolset)
+                registered = True
+            else:
+                agent = project_client.agents.get_agent(cached["id"])
+        except Exception as e:
+            print(f"Cached agent {cached['id']} not available: {e}")
+    if agent is None:
+        agent = _find_agent_by_name(project_client, name)
+
+    metadata = {FINGERPRINT_KEY: fingerprint}
+    if agent is None:
+        agent = project_client.agents.create_agent(
+            model=model, name=name, instructions=instructions, toolset=toolset, metadata=metadata
+        )
+        print(f"agent > created {agent.id}")
+    elif (agent.metadata or {}).get(FINGERPRINT_KEY) != fingerprint:
+        agent = project_client.agents.update_agent(
+            assistant_id=agent.id, model=model, instructions=instructions, toolset=toolset, metadata=metadata
+        )
+        print(f"agent > updated {agent.id}")
+    else:
+        if not registered:
+            agent = _register_toolset(project_client, agent.id, toolset)
+        print(f"agent > reusing {agent.id}")
+
+    cache[name] = {"id": agent.id, "fingerprint": fingerprint}
+    _save_cache(cache_path, cache)
+    return agent
+
+
+class WarmThreadPool:
+    """
+    Small pool of pre-created agent threads, refilled in the background, so
+    opening or clearing a chat does not wait for thread creation.
+
+    Usage:
+        pool = WarmThreadPool(project_client, size=2)
+        sessions = ThreadSessions(project_client, create_thread=pool.acquire)
+    """
+
+    def __init__(self, project_client, size: int = 2):
+        self._project_client = project_client
+        self.size = size
+        self._threads: "queue.Queue[Any]" = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-thread-pool")
+        self._refill()
+
+    def acquire(self):
+        """Return a pre-created thread, or create one synchronously if the pool is empty"""
+        try:
+            thread = self._threads.get_nowait()
+        except queue.Empty:
+            thread = self._project_client.agents.create_thread()
+        self._refill()
+        return thread
+
+    def close(self) -> None:
+        """Stop refilling and delete the unused pooled threads"""
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                thread = self._threads.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._project_client.agents.delete_thread(thread.id)
+            except Exception as e:
+                print(f"Failed to delete thread {thread.id}: {e}")
+
+    def _refill(self) -> None:
+        with self._lock:
+            missing = self.size - self._threads.qsize() - self._pending
+            self._pending += max(0, missing)
+        for _ in range(missing):
+            self._executor.submit(self._create_one)
+
+    def _create_one(self) -> None:
+        try:
+            self._threads.put(self._project_client.agents.create_thread())
+        except Exception as e:
+            print(f"Failed to pre-create thread: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
@@ -0,0 +1,143 @@
+"""
+Offline benchmark of the KYC functions against the in-memory Cosmos DB stand-in.
+
+Runs a realistic mix of lookups (a small set of customers asked about again
+and again, plus a long tail) and updates over synthetic records, then reports
+latency percentiles and simulated request units per operation.
+
+Usage:
+    python benchmark_kyc.py --records 10000 --operations 2000
+    python benchmark_kyc.py --records 1000000 --operations 200 --latency-ms 5 --no-cache
+"""
+import argparse
+import contextlib
+import os
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from in_memory_cosmos import InMemoryContainer
+import kyc_functions
+
+FIRST_NAMES = ["Anna", "Luca", "Sofia", "Noah", "Mia", "Leon", "Emma", "Elias", "Lena", "Liam",
+               "Laura", "David", "Sara", "Jonas", "Nina", "Marco", "Julia", "Samuel", "Elena", "Tim",
+               "Chiara", "Nicolas", "Alina", "Fabian", "Lea", "Matteo", "Clara", "Simon", "Eva", "Jan"]
+MIDDLE_NAMES = ["Maria", "Peter", "Louise", "Andreas", "Claire", "Thomas", "Rose", "Martin", "Anne", "Paul",
+                "Beatrice", "Felix", "Irene", "Lukas", "Sophie", "Adrian", "Helen", "Oliver", "Vera", "Rafael"]
+LAST_NAMES = ["Müller", "Meier", "Schmid", "Keller", "Weber", "Huber", "Schneider", "Meyer", "Steiner", "Fischer",
+              "Gerber", "Brunner", "Baumann", "Frei", "Zimmermann", "Moser", "Widmer", "Wyss", "Graf", "Roth",
+              "Bianchi", "Rossi", "Favre", "Bonvin", "Rochat", "Berset", "Maurer", "Suter", "Kunz", "Marti",
+              "Lehmann", "Bühler", "Hofmann", "Kaufmann", "Frey", "Koch", "Egli", "Sutter", "Bachmann", "Vogel"]
+NATIONALITIES = ["Swiss", "German", "French", "Italian", "Austrian", "British", "American"]
+COMPANIES = ["UBS", "Nestlé", "Novartis", "Roche", "Swiss Re", "ABB", "Zurich Insurance", "Swisscom"]
+ROLES = ["CEO", "CFO", "Board Member", "Director", "Partner", "Advisor"]
+
+
+def generate_records(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Create synthetic KYC records shaped like data/kyc_results_outdated.jsonl"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(LAST_NAMES)}"
+        records.append({
+            "id": f"{full_name.lower().replace(' ', '-')}-{i}",
+            "full_name": full_name,
+            "birth_date": f"{rng.randint(1, 28)} {rng.choice(['January', 'April', 'July', 'October'])} {rng.randint(1940, 2000)}",
+            "nationality": rng.choice(NATIONALITIES),
+            "affiliations": [
+                {"company": rng.choice(COMPANIES), "role": rng.choice(ROLES), "year": str(rng.randint(1990, 2024))}
+                for _ in range(rng.randint(0, 3))
+            ],
+            "legal_issues": [],
+            "political_exposure": rng.random() < 0.02,
+            "summary": f"{full_name} is a {rng.choice(NATIONALITIES)} professional in financial services."
+        })
+    return records
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(args: argparse.Namespace) -> None:
+    print(f"Generating {args.records:,} synthetic records...")
+    records = generate_records(args.records, args.seed)
+    container = InMemoryContainer(
+        records,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        partition_ranges=args.partition_ranges,
+        seed=args.seed
+    )
+    kyc_functions.configure_cache(ttl_seconds=0 if args.no_cache else args.cache_ttl)
+    kyc_functions.use_container(container, change_feed=not args.no_cache)
+
+    rng = random.Random(args.seed + 1)
+    hot = rng.sample(records, min(args.hot_customers, len(records)))
+    hot_weights = [1 / (rank + 1) for rank in range(len(hot))]
+
+    def pick_name() -> str:
+        record = rng.choices(hot, hot_weights)[0] if rng.random() < args.hot_ratio else rng.choice(records)
+        name = record["full_name"]
+        # Analysts ask with varying spelling of the same customer
+        return rng.choice([name, name.lower(), name.upper()])
+
+    latencies: Dict[str, List[float]] = {"lookup": [], "update": []}
+    charges: Dict[str, List[float]] = {"lookup": [], "update": []}
+    container.reset_metrics()
+
+    print(f"Running {args.operations:,} operations ({args.update_ratio:.0%} updates)...")
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(args.operations):
+            operation = "update" if rng.random() < args.update_ratio else "lookup"
+            name = pick_name()
+            charge_before = container.total_request_charge
+            op_start = time.perf_counter()
+            if operation == "update":
+                kyc_functions.update_kyc_data(name, {"political_exposure": rng.random() < 0.5})
+            else:
+                kyc_functions.get_kyc_data(name)
+            latencies[operation].append((time.perf_counter() - op_start) * 1000)
+            charges[operation].append(container.total_request_charge - charge_before)
+    elapsed = time.perf_counter() - started
+
+    print()
+    print(f"Records: {len(container):,}  Partition ranges: {args.partition_ranges}  "
+          f"Latency: {args.latency_ms}ms (+{args.jitter_ms}ms jitter)  Cache: {'off' if args.no_cache else 'on'}")
+    print(f"{'operation':<10}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'RU/op':>10}{'RU total':>12}")
+    for operation, samples in latencies.items():
+        if not samples:
+            continue
+        print(f"{operation:<10}{len(samples):>8}"
+              f"{percentile(samples, 50):>10.2f}{percentile(samples, 90):>10.2f}"
+              f"{percentile(samples, 99):>10.2f}{max(samples):>10.2f}"
+              f"{statistics.fmean(charges[operation]):>10.2f}{sum(charges[operation]):>12.1f}")
+    print(f"Throughput: {args.operations / elapsed:,.1f} ops/s  Requests: {container.request_count:,}  "
+          f"Total RU: {container.total_request_charge:,.1f}")
+    if not args.no_cache:
+        print(f"Cache: {kyc_functions.get_cache_stats()}")
+    kyc_functions.use_container(container, change_feed=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kyc_functions against an in-memory Cosmos DB stand-in")
+    parser.add_argument("--records", type=int, default=10_000, help="Number of synthetic KYC records")
+    parser.add_argument("--operations", type=int, default=2_000, help="Number of lookups and updates to run")
+    parser.add_argument("--update-ratio", type=float, default=0.05, help="Share of operations that are updates")
+    parser.add_argument("--hot-customers", type=int, default=50, help="Size of the frequently asked customer set")
+    parser.add_argument("--hot-ratio", type=float, default=0.8, help="Share of operations targeting the hot set")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per Cosmos request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Additional random latency per request")
+    parser.add_argument("--partition-ranges", type=int, default=1, help="Physical partitions a query fans out to")
+    parser.add_argument("--cache-ttl", type=float, default=300.0, help="KYC cache TTL in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the KYC record cache")
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
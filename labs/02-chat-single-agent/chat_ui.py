@@ -1,6 +1,7 @@
 import json
 import time
-from typing import List, Callable, Any
+import threading
+from typing import List, Callable, Any, Optional
 import gradio as gr
 from gradio import ChatMessage
 
@@ -13,12 +14,13 @@ from azure.ai.projects.models import (
     MessageDeltaChunk,
 )
 
+from thread_sessions import ThreadSession, ThreadSessions
+
 
 class EventHandler(AgentEventHandler):
     def __init__(self):
         super().__init__()
         self._current_message_id = None
-        self._accumulated_text = ""
         self._current_tools = {}
         self.conversation = None
         self.create_tool_bubble_fn = None
@@ -28,21 +30,17 @@ class EventHandler(AgentEventHandler):
             if self._current_message_id is not None:
                 print()
             self._current_message_id = delta.id
-            self._accumulated_text = ""
             print("\nassistant> ", end="")
 
         partial_text = ""
         if delta.delta.content:
-            for chunk in delta.delta.content:
-                partial_text += chunk.text.get("value", "")
-        self._accumulated_text += partial_text
+            partial_text = "".join(chunk.text.get("value", "") for chunk in delta.delta.content)
         print(partial_text, end="", flush=True)
 
     def on_thread_message(self, message: ThreadMessage) -> None:
         if message.status == "completed" and message.role == "assistant":
             print()
             self._current_message_id = None
-            self._accumulated_text = ""
 
     def on_thread_run(self, run: ThreadRun) -> None:
         print(f"thread_run status > {run.status}")
@@ -82,22 +80,55 @@ class EventHandler(AgentEventHandler):
 def convert_dict_to_chatmessage(msg: dict) -> ChatMessage:
     return ChatMessage(role=msg["role"], content=msg["content"], metadata=msg.get("metadata"))
 
-def create_chat_interface(project_client, agent, thread):
-    last_message = None
-    last_message_timestamp = 0
-    
-    def azure_kyc_chat(user_message: str, history: List[dict]):
-        nonlocal last_message, last_message_timestamp
-        
+def create_chat_interface(project_client,
+                          agent,
+                          thread=None,
+                          max_fps: float = 10.0,
+                          flush_bytes: int = 2048,
+                          sessions: Optional[ThreadSessions] = None,
+                          max_concurrent_runs: int = 8):
+    """
+    Create the streaming chat handler for Gradio.
+
+    Every Gradio session gets its own agent thread, so concurrent users do
+    not queue behind each other's runs.
+
+    Args:
+        project_client: Azure AI project client
+        agent: Agent to run
+        thread: Thread for calls made outside of a Gradio session
+        max_fps: Maximum number of UI updates per second while an answer streams
+        flush_bytes: Push buffered text to the UI early once this many bytes are pending
+        sessions: Per-session thread store, created with default idle expiry if omitted
+        max_concurrent_runs: Maximum number of agent runs streaming at the same time
+    """
+    min_flush_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+    if sessions is None:
+        sessions = ThreadSessions(project_client)
+    run_slots = threading.BoundedSemaphore(max_concurrent_runs)
+    default_session = ThreadSession(thread=thread, last_used=time.monotonic()) if thread else None
+
+    def azure_kyc_chat(user_message: str, history: List[dict], request: gr.Request = None):
         print(f"User message: {user_message}")
-        if last_message == user_message and time.time() - last_message_timestamp < 5:
+        if request is not None and request.session_hash:
+            session = sessions.get(request.session_hash)
+        else:
+            session = default_session or sessions.get("default")
+
+        if session.last_message == user_message and time.time() - session.last_message_timestamp < 5:
             return history, ""
-        last_message_timestamp = time.time()
+        session.last_message = user_message
+        session.last_message_timestamp = time.time()
 
         conversation = [convert_dict_to_chatmessage(m) for m in history]
         conversation.append(ChatMessage(role="user", content=user_message))
         yield conversation, ""
 
+        with run_slots, session.run_lock:
+            yield from _run_agent(session.thread, user_message, conversation)
+        return conversation, ""
+
+    def _run_agent(thread, user_message: str, conversation: List[ChatMessage]):
         project_client.agents.create_message(thread_id=thread.id, role="user", content=user_message)
 
         tool_titles = {
@@ -106,10 +137,36 @@ def create_chat_interface(project_client, agent, thread):
             "bing_grounding": "🌐 Searching Web Sources"
         }
 
+        # Streamed text is buffered and applied to the conversation in batches,
+        # so Gradio re-renders the history at most max_fps times per second
+        pending_text: List[str] = []
+        pending_bytes = 0
+        last_flush = 0.0
+
+        def apply_pending_text() -> bool:
+            nonlocal pending_bytes
+            if not pending_text:
+                return False
+            # Only the pending deltas are joined, the answer so far is kept as one string
+            text = "".join(pending_text)
+            if not conversation or conversation[-1].role != "assistant" or conversation[-1].metadata:
+                conversation.append(ChatMessage(role="assistant", content=text))
+            else:
+                conversation[-1].content += text
+            pending_text.clear()
+            pending_bytes = 0
+            return True
+
+        def flush_due() -> bool:
+            return (pending_bytes >= flush_bytes
+                    or time.monotonic() - last_flush >= min_flush_interval)
+
         def create_tool_bubble(tool_name: str, content: str = "", call_id: str = None):
             title = tool_titles.get(tool_name, f"🛠️ {tool_name}")
             if tool_name is None:
                 return
+            # Keep buffered answer text ahead of the tool bubble
+            apply_pending_text()
             
             msg = ChatMessage(
                 role="assistant",
@@ -137,13 +194,17 @@ def create_chat_interface(project_client, agent, thread):
                 if event_type == "thread.run.step.delta":
                     step_delta = event_data.get("delta", {}).get("step_details", {})
                     if step_delta.get("type") == "tool_calls":
+                        bubble_added = False
                         for tcall in step_delta.get("tool_calls", []):
                             call_id = tcall.get("id")
                             if tcall.get("type") == "bing_grounding":
                                 search_query = tcall.get("bing_grounding", {}).get("requesturl", "").split("?q=")[-1]
                                 if search_query:
                                     create_tool_bubble("bing_grounding", f"Searching for '{search_query}'...", call_id)
-                        yield conversation, ""
+                                    bubble_added = True
+                        # Argument deltas alone do not change what is rendered
+                        if bubble_added:
+                            yield conversation, ""
 
                 elif event_type == "run_step":
                     if event_data["type"] == "tool_calls" and event_data["status"] == "completed":
@@ -167,12 +228,13 @@ def create_chat_interface(project_client, agent, thread):
                                     citations.append(citation_text)
                     citations_str = "\n" + "\n".join(citations) if citations else ""
                     
-                    if not conversation or conversation[-1].role != "assistant" or conversation[-1].metadata:
-                        conversation.append(ChatMessage(role="assistant", content=content + citations_str))
-                    else:
-                        conversation[-1].content += content + citations_str
-                    yield conversation, ""
+                    pending_text.append(content + citations_str)
+                    pending_bytes += len(content) + len(citations_str)
+                    if flush_due() and apply_pending_text():
+                        last_flush = time.monotonic()
+                        yield conversation, ""
 
-        return conversation, ""
+        if apply_pending_text():
+            yield conversation, ""
 
     return azure_kyc_chat
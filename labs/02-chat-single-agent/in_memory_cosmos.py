@@ -0,0 +1,296 @@
+import copy
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+
+
+class _ClientConnection:
+    """Mimics `container.client_connection` so callers can read response headers"""
+
+    def __init__(self):
+        self.last_response_headers: Dict[str, str] = {}
+
+
+class _ItemPaged:
+    """Mimics `azure.core.paging.ItemPaged`: iterate items or walk pages with `by_page()`"""
+
+    def __init__(self, container: "InMemoryContainer", ranges: List[List[Dict[str, Any]]], page_size: int, scanned: List[int]):
+        self._container = container
+        self._ranges = ranges
+        self._page_size = page_size
+        self._scanned = scanned
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for page in self.by_page():
+            yield from page
+
+    def by_page(self, continuation_token: Optional[str] = None) -> Iterator[Iterator[Dict[str, Any]]]:
+        range_id, offset = (0, 0)
+        if continuation_token:
+            range_id, offset = (int(v) for v in continuation_token.split(":"))
+
+        while range_id < len(self._ranges):
+            results = self._ranges[range_id]
+            page = results[offset:offset + self._page_size]
+            # The scan cost of a partition range is charged with its first page
+            scanned = self._scanned[range_id] if offset == 0 else 0
+            current_range = range_id
+            offset += self._page_size
+            if offset >= len(results):
+                range_id, offset = range_id + 1, 0
+
+            continuation = f"{range_id}:{offset}" if range_id < len(self._ranges) else None
+            charge = self._container._query_charge(page, scanned)
+            self._container._respond(charge, {
+                "x-ms-item-count": str(len(page)),
+                "x-ms-documentdb-partitionkeyrangeid": str(current_range),
+                **({"x-ms-continuation": continuation} if continuation else {})
+            })
+            yield iter(copy.deepcopy(page))
+
+
+class InMemoryContainer:
+    """
+    Local stand-in for `azure.cosmos.ContainerProxy`.
+
+    Supports the subset of the SDK used by the KYC functions, so the labs can
+    run and be benchmarked without a Cosmos DB account:
+        - query_items with `CONTAINS(LOWER(c.<field>), @param)` conditions
+          joined by OR/AND, where the parameter may be wrapped in LOWER()
+        - read_item, upsert_item, patch_item
+        - query_items_change_feed with continuation tokens
+
+    Every request sleeps for the configured latency and reports a simulated
+    request charge in `client_connection.last_response_headers`, like the SDK.
+    The charge model is a rough approximation of Cosmos DB pricing: point
+    reads cost 1 RU per KB, writes ~5.5 RU per KB, and queries pay a per
+    partition range overhead plus a cost per scanned and returned document.
+    CONTAINS(LOWER()) cannot be served from the index, so queries scan all
+    documents of every partition range.
+
+    Usage:
+        container = InMemoryContainer(load_kyc_data(), latency_ms=5)
+        kyc_functions.use_container(container)
+    """
+
+    READ_RU_PER_KB = 1.0
+    WRITE_RU_PER_KB = 5.5
+    QUERY_RU_PER_RANGE = 2.3
+    QUERY_RU_PER_SCANNED_DOC = 0.002
+    QUERY_RU_PER_RETURNED_KB = 0.4
+    DEFAULT_PAGE_SIZE = 100
+
+    _CONDITION = re.compile(
+        r"CONTAINS\(\s*LOWER\(\s*c\.(\w+)\s*\)\s*,\s*(?:LOWER\(\s*(@\w+)\s*\)|(@\w+))\s*\)",
+        re.IGNORECASE
+    )
+
+    def __init__(self,
+                 items: Optional[List[Dict[str, Any]]] = None,
+                 latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0,
+                 partition_ranges: int = 1,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            items: Initial documents
+            latency_ms: Simulated network and server latency per request
+            jitter_ms: Upper bound of uniformly distributed extra latency
+            partition_ranges: Number of physical partitions a cross-partition query fans out to
+            seed: Seed for the latency jitter
+        """
+        self.client_connection = _ClientConnection()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.partition_ranges = max(1, partition_ranges)
+        self.total_request_charge = 0.0
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._sizes: Dict[str, int] = {}
+        # field -> id -> lowered value, filled lazily by queries
+        self._lowered: Dict[str, Dict[str, str]] = {}
+        self._feed: List[Dict[str, Any]] = []
+        for item in items or []:
+            self._store(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def reset_metrics(self) -> None:
+        """Reset the accumulated request charge and request count"""
+        with self._lock:
+            self.total_request_charge = 0.0
+            self.request_count = 0
+
+    def query_items(self,
+                    query: str,
+                    parameters: Optional[List[Dict[str, Any]]] = None,
+                    partition_key: Any = None,
+                    enable_cross_partition_query: Optional[bool] = None,
+                    max_item_count: Optional[int] = None,
+                    **kwargs) -> _ItemPaged:
+        """Run a query from the supported CONTAINS/LOWER subset"""
+        conditions, combine = self._compile(query, parameters or [])
+        ranges: List[List[Dict[str, Any]]] = [[] for _ in range(self.partition_ranges)]
+        scanned = [0] * self.partition_ranges
+        with self._lock:
+            columns = [(self._lowered_column(field_name), needle) for field_name, needle in conditions]
+            for doc_id, item in self._items.items():
+                # crc32 rather than hash(), which changes with PYTHONHASHSEED and would reshuffle the ranges per run
+                range_id = zlib.crc32(doc_id.encode()) % self.partition_ranges
+                scanned[range_id] += 1
+                if not columns or combine(needle in column[doc_id] for column, needle in columns):
+                    ranges[range_id].append(item)
+        page_size = max_item_count if max_item_count and max_item_count > 0 else self.DEFAULT_PAGE_SIZE
+        return _ItemPaged(self, ranges, page_size, scanned)
+
+    def read_item(self, item: str, partition_key: Any, **kwargs) -> Dict[str, Any]:
+        """Point read by id"""
+        with self._lock:
+            stored = self._items.get(item)
+            size = self._sizes.get(item, 0)
+        if stored is None:
+            self._respond(self.READ_RU_PER_KB, {})
+            raise CosmosResourceNotFoundError(status_code=404, message=f"Item {item} not found")
+        self._respond(self.READ_RU_PER_KB * self._kb(size), {})
+        return copy.deepcopy(stored)
+
+    def upsert_item(self, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """Insert or replace an item and append it to the change feed"""
+        stored = self._store(body)
+        self._respond(self.WRITE_RU_PER_KB * self._kb(self._sizes[stored["id"]]), {})
+        return copy.deepcopy(stored)
+
+    def patch_item(self,
+                   item: str,
+                   partition_key: Any,
+                   patch_operations: List[Dict[str, Any]],
+                   **kwargs) -> Dict[str, Any]:
+        """
+        Apply partial document updates
+
+        Supports the `add`, `set`, `replace`, `remove` and `incr` operations on
+        top-level paths such as `/political_exposure`.
+        """
+        with self._lock:
+            stored = self._items.get(item)
+            if stored is None:
+                raise CosmosResourceNotFoundError(status_code=404, message=f"Item {item} not found")
+            patched = copy.deepcopy(stored)
+
+        for operation in patch_operations:
+            op, key = operation["op"], operation["path"].lstrip("/")
+            if op in ("add", "set"):
+                patched[key] = operation["value"]
+            elif op == "replace":
+                if key not in patched:
+                    raise ValueError(f"Cannot replace missing path {operation['path']}")
+                patched[key] = operation["value"]
+            elif op == "remove":
+                patched.pop(key, None)
+            elif op == "incr":
+                patched[key] = patched.get(key, 0) + operation["value"]
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+
+        stored = self._store(patched)
+        self._respond(self.WRITE_RU_PER_KB * self._kb(self._sizes[stored["id"]]), {})
+        return copy.deepcopy(stored)
+
+    def query_items_change_feed(self,
+                                continuation: Optional[str] = None,
+                                start_time: Optional[str] = None,
+                                response_hook: Optional[Callable[[Dict[str, str], Dict[str, Any]], None]] = None,
+                                **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Return items changed since `continuation` (or since `start_time`)
+
+        Like the SDK, `response_hook` is called with the headers of the page,
+        whose "etag" is the continuation of the next read.
+        """
+        with self._lock:
+            if continuation is not None:
+                start = int(continuation)
+            elif start_time == "Beginning":
+                start = 0
+            else:
+                start = len(self._feed)
+            changes = [copy.deepcopy(item) for item in self._feed[start:]]
+            end = len(self._feed)
+        headers = self._respond(self.QUERY_RU_PER_RANGE, {"etag": str(end)})
+        if response_hook:
+            response_hook(headers, {"Documents": changes})
+        return iter(changes)
+
+    def _store(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if "id" not in body:
+            raise ValueError("Item must have an 'id'")
+        stored = copy.deepcopy(body)
+        size = len(json.dumps(stored, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            self._items[stored["id"]] = stored
+            self._sizes[stored["id"]] = size
+            for column in self._lowered.values():
+                column.pop(stored["id"], None)
+            self._feed.append(stored)
+        return stored
+
+    def _lowered_column(self, field_name: str) -> Dict[str, str]:
+        column = self._lowered.setdefault(field_name, {})
+        if len(column) != len(self._items):
+            for doc_id, item in self._items.items():
+                if doc_id not in column:
+                    column[doc_id] = str(item.get(field_name, "")).lower()
+        return column
+
+    def _query_charge(self, page: List[Dict[str, Any]], scanned: int) -> float:
+        returned_kb = sum(self._sizes.get(item["id"], 0) for item in page) / 1024
+        overhead = self.QUERY_RU_PER_RANGE if scanned else 0.0
+        return overhead + scanned * self.QUERY_RU_PER_SCANNED_DOC + returned_kb * self.QUERY_RU_PER_RETURNED_KB
+
+    def _respond(self, charge: float, headers: Dict[str, str]) -> Dict[str, str]:
+        delay_ms = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        with self._lock:
+            self.total_request_charge += charge
+            self.request_count += 1
+        response_headers = {
+            "x-ms-request-charge": f"{charge:.2f}",
+            "x-ms-request-duration-ms": f"{delay_ms:.3f}",
+            **headers
+        }
+        self.client_connection.last_response_headers = response_headers
+        return response_headers
+
+    @staticmethod
+    def _kb(size: int) -> int:
+        return max(1, math.ceil(size / 1024))
+
+    def _compile(self, query: str, parameters: List[Dict[str, Any]]):
+        values = {p["name"]: str(p["value"]) for p in parameters}
+        where = re.split(r"\bWHERE\b", query, maxsplit=1, flags=re.IGNORECASE)
+        if len(where) == 1:
+            return [], any
+
+        clause = where[1]
+        conditions = []
+        for match in self._CONDITION.finditer(clause):
+            field_name, param = match.group(1), match.group(2) or match.group(3)
+            if param not in values:
+                raise ValueError(f"Missing query parameter {param}")
+            needle = values[param].lower() if match.group(2) else values[param]
+            conditions.append((field_name, needle))
+
+        if not conditions:
+            raise ValueError(f"Unsupported query: {query}")
+        combine = all if re.search(r"\bAND\b", clause, re.IGNORECASE) else any
+        return conditions, combine
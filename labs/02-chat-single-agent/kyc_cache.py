@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+
+def normalize_name(person_name: str) -> str:
+    """Normalize a person name so equivalent lookups share one cache key"""
+    return " ".join(person_name.lower().split())
+
+
+class KycCache:
+    """
+    Read-through cache of serialized KYC documents keyed by document id.
+
+    Name lookups are mapped to document ids through an alias table, so the
+    same customer asked about as "Alain Berset" and "berset" resolves to one
+    cached document. Entries expire after `ttl_seconds` and the least recently
+    used documents are evicted once `max_entries` or `max_bytes` is exceeded.
+    """
+
+    def __init__(self,
+                 ttl_seconds: float = 300.0,
+                 max_entries: int = 1024,
+                 max_bytes: int = 8 * 1024 * 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        # id -> (serialized document, expires_at)
+        self._documents: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # normalized name -> (id, name parts)
+        self._aliases: "OrderedDict[str, Tuple[str, List[str]]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, person_name: str) -> Optional[str]:
+        """Return the cached serialized document for a name, if fresh"""
+        key = normalize_name(person_name)
+        with self._lock:
+            alias = self._aliases.get(key)
+            entry = self._documents.get(alias[0]) if alias else None
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    self._drop(alias[0])
+                self.misses += 1
+                return None
+            self._documents.move_to_end(alias[0])
+            self._aliases.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, person_name: str, document: Dict[str, Any]) -> str:
+        """Cache a document under its id and alias the lookup name to it"""
+        payload = json.dumps(document, ensure_ascii=False)
+        doc_id = document.get("id")
+        if doc_id is None:
+            return payload
+
+        key = normalize_name(person_name)
+        with self._lock:
+            self._drop(doc_id)
+            self._documents[doc_id] = (payload, self._clock() + self.ttl_seconds)
+            self._bytes += len(payload)
+            self._aliases[key] = (doc_id, key.split())
+            self._aliases.move_to_end(key)
+            self._evict()
+        return payload
+
+    def invalidate(self, doc_id: str, full_name: Optional[str] = None) -> None:
+        """
+        Drop a document from the cache
+
+        Args:
+            doc_id: Id of the changed document
+            full_name: Name of the changed document. When given, aliases that
+                could now resolve to this document are dropped as well, so a
+                newly inserted customer is not shadowed by an older match.
+        """
+        with self._lock:
+            self.invalidations += 1
+            self._drop(doc_id)
+            if full_name:
+                lowered = full_name.lower()
+                stale = [key for key, (_, parts) in self._aliases.items()
+                         if any(part in lowered for part in parts)]
+                for key in stale:
+                    del self._aliases[key]
+
+    def clear(self) -> None:
+        """Drop all cached documents"""
+        with self._lock:
+            self._documents.clear()
+            self._aliases.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._documents),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _drop(self, doc_id: str) -> None:
+        entry = self._documents.pop(doc_id, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def _evict(self) -> None:
+        while self._documents and (len(self._documents) > self.max_entries
+                                   or self._bytes > self.max_bytes):
+            _, (payload, _) = self._documents.popitem(last=False)
+            self._bytes -= len(payload)
+        # Aliases of evicted documents become misses; keep the table bounded too
+        while len(self._aliases) > self.max_entries * 4:
+            self._aliases.popitem(last=False)
+
+
+class ChangeFeedInvalidator:
+    """
+    Background consumer of the container change feed that invalidates cached
+    documents written by other processes.
+
+    Usage:
+        invalidator = ChangeFeedInvalidator(container, cache)
+        invalidator.start()
+    """
+
+    def __init__(self, container, cache: KycCache, poll_interval: float = 2.0):
+        self._container = container
+        self._cache = cache
+        self.poll_interval = poll_interval
+        self._continuation: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> int:
+        """Read pending changes once and invalidate them. Returns the number of changes"""
+        # Headers of the last change feed page. The client's last_response_headers
+        # are shared with the queries of other threads, whose responses carry no etag
+        last_page: List[Mapping[str, Any]] = []
+
+        def remember_page(headers: Mapping[str, Any], result: Any) -> None:
+            # The SDK also calls the hook with the client's shared headers when
+            # the feed is created; only page responses come with a body dict
+            if isinstance(result, dict):
+                last_page[:] = [headers]
+
+        if self._continuation is None:
+            feed = self._container.query_items_change_feed(start_time="Now", response_hook=remember_page)
+        else:
+            feed = self._container.query_items_change_feed(continuation=self._continuation,
+                                                           response_hook=remember_page)
+
+        changed = 0
+        for doc in feed:
+            self._cache.invalidate(doc["id"], doc.get("full_name"))
+            changed += 1
+        # Without a new continuation, read from the previous one again rather
+        # than from "Now", which would skip the writes in between
+        continuation = last_page[0].get("etag") if last_page else None
+        if continuation:
+            self._continuation = continuation
+        return changed
+
+    def start(self) -> None:
+        """Start polling the change feed in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        # Establish the starting point before returning, so no write is missed
+        self.poll()
+        self._thread = threading.Thread(target=self._run, name="kyc-change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 2)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                # Cached entries still expire by TTL while the feed is unavailable
+                print(f"Change feed poll failed: {e}")
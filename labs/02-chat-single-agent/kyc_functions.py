@@ -1,12 +1,29 @@
 import os
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 from azure.cosmos import CosmosClient
+import cosmos_metrics
+from kyc_cache import KycCache, ChangeFeedInvalidator
 
 load_dotenv(override=True)
 
+_container = None
+_change_feed = None
+_cache = KycCache(
+    ttl_seconds=float(os.environ.get("KYC_CACHE_TTL_SECONDS", "300")),
+    max_entries=int(os.environ.get("KYC_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.environ.get("KYC_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+)
+
+def _cache_enabled() -> bool:
+    return _cache.ttl_seconds > 0
+
 def _get_container():
+    global _container
+    if _container is not None:
+        return _container
+
     endpoint = os.environ.get("COSMOS_ENDPOINT")
     key = os.environ.get("COSMOS_KEY")
     db_name = os.environ.get("COSMOS_DB_NAME")
@@ -17,12 +34,62 @@ def _get_container():
 
     client = CosmosClient(endpoint, credential=key)
     db = client.get_database_client(db_name)
-    container = db.get_container_client(container_name)
-    return container
+    use_container(db.get_container_client(container_name))
+    return _container
+
+def use_container(container, change_feed: bool = True) -> None:
+    """
+    Route all KYC operations to the given container and reset the cache.
+
+    Args:
+        container: Cosmos DB container client or a local stand-in such as
+            `in_memory_cosmos.InMemoryContainer`
+        change_feed: Invalidate cached records on writes from other processes
+    """
+    global _container, _change_feed
+    if _change_feed is not None:
+        _change_feed.stop()
+        _change_feed = None
+
+    _container = container
+    _cache.clear()
+    if change_feed and _cache_enabled():
+        _change_feed = ChangeFeedInvalidator(
+            container,
+            _cache,
+            poll_interval=float(os.environ.get("KYC_CACHE_CHANGE_FEED_INTERVAL", "2"))
+        )
+        try:
+            _change_feed.start()
+        except Exception as e:
+            # Fall back to TTL-only invalidation
+            print(f"Change feed invalidation disabled: {e}")
+            _change_feed = None
+
+def configure_cache(ttl_seconds: Optional[float] = None,
+                    max_entries: Optional[int] = None,
+                    max_bytes: Optional[int] = None) -> None:
+    """Change cache limits at runtime (ttl_seconds=0 disables caching) and drop cached records"""
+    if ttl_seconds is not None:
+        _cache.ttl_seconds = ttl_seconds
+    if max_entries is not None:
+        _cache.max_entries = max_entries
+    if max_bytes is not None:
+        _cache.max_bytes = max_bytes
+    _cache.clear()
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss statistics of the KYC record cache"""
+    return _cache.stats()
 
 def get_kyc_data(person_name: str) -> str:
     try:
         print(f"Performing fuzzy search for KYC record matching '{person_name}'...")
+        if _cache_enabled():
+            cached = _cache.get(person_name)
+            if cached is not None:
+                return cached
+
         container = _get_container()
         
         # Split name into parts and create a more flexible search
@@ -36,11 +103,13 @@ def get_kyc_data(person_name: str) -> str:
             params.append({"name": param_name, "value": part})
         
         query = f"SELECT * FROM c WHERE {' OR '.join(conditions)}"
-        results = list(container.query_items(
+        results = cosmos_metrics.query_items(
+            container,
+            "get_kyc_data",
             query=query, 
             parameters=params,
             enable_cross_partition_query=True
-        ))
+        )
         
         if not results:
             return json.dumps({"error": f"No KYC records found matching '{person_name}'."})
@@ -51,6 +120,8 @@ def get_kyc_data(person_name: str) -> str:
             for part in name_parts
         ), reverse=True)
             
+        if _cache_enabled():
+            return _cache.put(person_name, results[0])
         return json.dumps(results[0], ensure_ascii=False)
     except Exception as e:
         return json.dumps({"error": f"Exception: {str(e)}"})
@@ -60,16 +131,20 @@ def update_kyc_data(person_name: str, updated_data: Dict[str, Any]) -> str:
         container = _get_container()
         query = "SELECT * FROM c WHERE CONTAINS(LOWER(c.full_name), LOWER(@person_name))"
         params = [{"name": "@person_name", "value": person_name}]
-        results = list(container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
+        results = cosmos_metrics.query_items(container, "update_kyc_data", query=query, parameters=params, enable_cross_partition_query=True)
         
         if not results:
             return json.dumps({"error": f"No KYC record found for '{person_name}' to update."})
 
         record = results[0]
+        previous_name = record.get("full_name")
         for key, val in updated_data.items():
             record[key] = val
 
-        container.upsert_item(record)
+        cosmos_metrics.upsert_item(container, "update_kyc_data", record)
+        _cache.invalidate(record["id"], previous_name)
+        if record.get("full_name") != previous_name:
+            _cache.invalidate(record["id"], record.get("full_name"))
         return json.dumps({
             "message": f"KYC record updated for {record['full_name']}", 
             "record": record
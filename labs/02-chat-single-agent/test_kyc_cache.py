@@ -0,0 +1,49 @@
+from in_memory_cosmos import InMemoryContainer
+from kyc_cache import ChangeFeedInvalidator, KycCache
+
+ALAIN = {"id": "1", "full_name": "Alain Berset", "risk_level": "low"}
+
+
+class QueryDuringPollContainer(InMemoryContainer):
+    """Runs a query while the change feed is read, like a cache miss on another thread"""
+
+    def query_items_change_feed(self, **kwargs):
+        changes = super().query_items_change_feed(**kwargs)
+        list(self.query_items(
+            "SELECT * FROM c WHERE CONTAINS(LOWER(c.full_name), @name)",
+            parameters=[{"name": "@name", "value": "berset"}]
+        ))
+        return changes
+
+
+def test_change_feed_invalidation_survives_concurrent_queries():
+    container = QueryDuringPollContainer([ALAIN])
+    cache = KycCache()
+    invalidator = ChangeFeedInvalidator(container, cache)
+    invalidator.poll()
+
+    for risk_level in ("medium", "high"):
+        cache.put("Alain Berset", ALAIN)
+        container.upsert_item({**ALAIN, "risk_level": risk_level})
+        assert invalidator.poll() == 1
+        assert cache.get("Alain Berset") is None
+
+
+def test_change_feed_keeps_previous_continuation_without_etag():
+    container = InMemoryContainer([ALAIN])
+    cache = KycCache()
+    invalidator = ChangeFeedInvalidator(container, cache)
+    invalidator.poll()
+
+    # A response without an etag must not move the feed back to "Now"
+    original = container.query_items_change_feed
+    container.query_items_change_feed = lambda **kwargs: original(**{**kwargs, "response_hook": None})
+    cache.put("Alain Berset", ALAIN)
+    container.upsert_item({**ALAIN, "risk_level": "high"})
+    assert invalidator.poll() == 1
+
+    # The change is read again instead of skipped
+    container.query_items_change_feed = original
+    cache.put("Alain Berset", ALAIN)
+    assert invalidator.poll() == 1
+    assert cache.get("Alain Berset") is None
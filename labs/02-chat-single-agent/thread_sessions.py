@@ -0,0 +1,97 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class ThreadSession:
+    """Agent thread and chat state of one browser session"""
+    thread: object
+    last_used: float
+    last_message: Optional[str] = None
+    last_message_timestamp: float = 0.0
+    # A thread accepts only one active run at a time
+    run_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ThreadSessions:
+    """
+    Keeps one agent thread per Gradio session and deletes threads of
+    sessions that have been idle for longer than `idle_timeout` seconds.
+
+    Usage:
+        sessions = ThreadSessions(project_client)
+        session = sessions.get(request.session_hash)
+        project_client.agents.create_message(thread_id=session.thread.id, ...)
+    """
+
+    def __init__(self,
+                 project_client,
+                 idle_timeout: float = 30 * 60,
+                 create_thread: Optional[Callable[[], object]] = None):
+        """
+        Args:
+            project_client: Azure AI project client
+            idle_timeout: Seconds after which an unused session's thread is deleted
+            create_thread: Factory for new threads, defaults to `project_client.agents.create_thread`
+        """
+        self._project_client = project_client
+        self.idle_timeout = idle_timeout
+        self._create_thread = create_thread or project_client.agents.create_thread
+        self._sessions: Dict[str, ThreadSession] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> ThreadSession:
+        """Return the session, creating its thread on first use"""
+        self._sweep_if_due()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                return session
+
+        # Create the thread outside the lock so other sessions are not blocked
+        thread = self._create_thread()
+        with self._lock:
+            session = self._sessions.setdefault(session_id, ThreadSession(thread=thread, last_used=time.monotonic()))
+        if session.thread is not thread:
+            self._delete_thread(thread)
+        return session
+
+    def reset(self, session_id: str) -> ThreadSession:
+        """Start a fresh thread for the session (e.g. when the chat is cleared)"""
+        with self._lock:
+            old = self._sessions.pop(session_id, None)
+        if old is not None:
+            # The user should not wait for the old thread to be deleted
+            threading.Thread(target=self._delete_thread, args=(old.thread,), daemon=True).start()
+        return self.get(session_id)
+
+    def expire_idle(self) -> int:
+        """Delete threads of sessions idle for longer than idle_timeout. Returns the number expired"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items()
+                       if s.last_used < cutoff and not s.run_lock.locked()]
+            sessions = [self._sessions.pop(sid) for sid in expired]
+        for session in sessions:
+            self._delete_thread(session.thread)
+        return len(sessions)
+
+    def _sweep_if_due(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < min(60.0, self.idle_timeout):
+            return
+        self._last_sweep = now
+        self.expire_idle()
+
+    def _delete_thread(self, thread) -> None:
+        try:
+            self._project_client.agents.delete_thread(thread.id)
+        except Exception as e:
+            print(f"Failed to delete thread {thread.id}: {e}")
@@ -2,39 +2,238 @@ from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 import os
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from semantic_kernel import Kernel
+from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
 from semantic_kernel.agents.strategies import KernelFunctionSelectionStrategy
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.function_choice_behavior import FunctionChoiceBehavior
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.functions.kernel_function_from_prompt import KernelFunctionFromPrompt
 
 from seco_plugin import SecoPlugin
 from zefix_plugin import ZefixPlugin
 from shab_plugin import ShabPlugin
 from bank_plugin import BankPlugin
 from finma_plugin import FinmaPlugin
+from due_diligence_plugin import DueDiligencePlugin
+from output_format import OutputFormat
+from selection_strategy import FastPathSelectionStrategy, default_banking_rules
+from termination_strategy import BudgetTerminationStrategy
+from history_reducer import TokenBudgetReducer
 
 # Agent names
 KYC_OFFICER = "KYC_Officer"
 ACCOUNT_MANAGER = "Account_Manager"
 RISK_OFFICER = "Risk_Officer"
 
-def create_kernel() -> Kernel:
+def create_kernel(output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                  max_tokens: Optional[int] = None,
+                  chat_service: Optional[ChatCompletionClientBase] = None) -> Kernel:
+    """
+    Create a kernel with the chat service and all banking plugins
+
+    Args:
+        output_format: Plugin output format, COMPACT saves tokens on every later turn
+        max_tokens: Token budget per plugin call, longer results are truncated
+        chat_service: Chat service to use instead of AzureChatCompletion, e.g. LocalChatCompletion for load tests
+    """
     kernel = Kernel()
     
     # Add chat completion service
-    service = AzureChatCompletion()
+    service = chat_service if chat_service is not None else AzureChatCompletion()
     kernel.add_service(service)
     
     # Add all plugins
-    kernel.add_plugin(FinmaPlugin(), plugin_name="finma")
-    kernel.add_plugin(SecoPlugin(), plugin_name="seco")
-    kernel.add_plugin(ZefixPlugin(), plugin_name="zefix")
-    kernel.add_plugin(ShabPlugin(), plugin_name="shab")
-    kernel.add_plugin(BankPlugin(), plugin_name="bank")
+    formatting = {"output_format": output_format, "max_tokens": max_tokens}
+    kernel.add_plugin(FinmaPlugin(**formatting), plugin_name="finma")
+    kernel.add_plugin(SecoPlugin(**formatting), plugin_name="seco")
+    kernel.add_plugin(ZefixPlugin(**formatting), plugin_name="zefix")
+    kernel.add_plugin(ShabPlugin(**formatting), plugin_name="shab")
+    kernel.add_plugin(BankPlugin(**formatting), plugin_name="bank")
+    kernel.add_plugin(DueDiligencePlugin(**formatting), plugin_name="due_diligence")
     
     return kernel
 
+def create_agents(kernel: Kernel) -> List[ChatCompletionAgent]:
+    """Create the KYC officer, account manager and risk officer agents, in this order"""
+    agent_args = KernelArguments(
+        settings=PromptExecutionSettings(
+            function_choice_behavior=FunctionChoiceBehavior.Auto(),
+        )
+    )
+
+    agent_kyc = ChatCompletionAgent(
+        service_id=KYC_OFFICER,
+        kernel=kernel,
+        name=KYC_OFFICER,
+        arguments=agent_args,
+        instructions=f"""
+You are a KYC Officer with access to the following functions:
+
+- due_diligence.check_customer: Run registry, gazette, FINMA and sanctions checks for a customer in one call
+- finma.search_intermediaries: Search FINMA registry for insurance intermediaries
+- seco.check_sanctions: Check if a person/entity is on sanctions list
+- zefix.search_companies: Search Swiss company registry
+- zefix.lookup_uid: Validate a company UID and look up the registered company
+- shab.search_publications: Search official gazette publications (several rubrics at once, e.g. rubrics="HR,KK" for registry changes and bankruptcies)
+
+Base all decisions and actions strictly on gathered evidence and API responses, not on pre-existing knowledge.
+
+Process:
+1. For new customers:
+   - Start with a single due_diligence.check_customer call (is_company=true for companies)
+   - Only use the individual functions to retry a source reported as unavailable or to dig deeper
+2. Analyze results and determine risk level
+3. Make KYC recommendations
+
+Current date: {datetime.now().isoformat()}
+"""
+    )
+
+    agent_account = ChatCompletionAgent(
+        service_id=ACCOUNT_MANAGER,
+        kernel=kernel,
+        name=ACCOUNT_MANAGER,
+        arguments=agent_args,
+        instructions="""
+You are an Account Manager with access to the following functions:
+
+- bank.create_account: Create new bank accounts
+    - If Company: ONLY if Company was found in registry and is not liquidated!
+    - If Person: ONLY if person is not on sanctions list
+- bank.get_account: Get account details and status
+- bank.find_account: Find an account by account ID or company UID
+- bank.freeze_account: Freeze an account with a reason
+- bank.unfreeze_account: Unfreeze a previously frozen account
+
+Process:
+1. For new accounts:
+   - Verify KYC status is approved
+   - Use correct account type (individual/company)
+   - Include company UID for company accounts
+   - Do not create accounts for companies if they were not found in a registry
+
+2. For existing accounts / account reviews:
+   - Check account status and details
+   - Monitor for suspicious activity
+   - Freeze account if suspicious activity detected
+   - Unfreeze account when issues are resolved
+
+Always verify customer identity and risk level before operations.
+"""
+    )
+
+    agent_risk = ChatCompletionAgent(
+        service_id=RISK_OFFICER,
+        kernel=kernel,
+        name=RISK_OFFICER,
+        arguments=agent_args,
+        instructions="""
+You are a Risk Officer who evaluates overall customer risk and makes final decisions.
+
+Base all decisions and actions strictly on gathered evidence and API responses, not on pre-existing knowledge.
+
+Your responsibilities:
+1. Review KYC findings
+2. Assess overall risk level
+3. Make final decisions on account actions
+4. Monitor high-risk situations
+
+You must document all risk-related decisions.
+"""
+    )
+
+    return [agent_kyc, agent_account, agent_risk]
+
+def create_group_chat(kernel: Kernel,
+                      agents: List[ChatCompletionAgent],
+                      max_seconds: float = 90,
+                      max_turns: int = 8,
+                      max_tokens: int = 60000) -> AgentGroupChat:
+    """
+    Create the group chat of the banking agents
+
+    Each UI session gets its own group chat: the history, reducers and budgets
+    hold per-conversation state, while the kernel, plugins and agents are shared.
+
+    Args:
+        kernel: Kernel running the selection prompt
+        agents: Agents from create_agents, the first one starts every conversation
+        max_seconds: Wall-clock budget per conversation
+        max_turns: Agent turns per conversation
+        max_tokens: Token budget per conversation
+    """
+    selection_function = KernelFunctionFromPrompt(
+        function_name="agent_selection",
+        prompt=f"""
+{{{{$history}}}}
+
+Based on the chat history above, select the next appropriate agent.
+Return ONLY ONE of these names (no other text):
+{KYC_OFFICER}
+{ACCOUNT_MANAGER}
+{RISK_OFFICER}
+
+The KYC officer has access to: 
+- due_diligence.check_customer
+- finma.search_intermediaries
+- seco.check_sanctions
+- zefix.search_companies
+- zefix.lookup_uid
+- shab.search_publications
+
+The Account Manager has access to:
+- bank.create_account
+- bank.get_account
+- bank.find_account
+- bank.freeze_account
+- bank.unfreeze_account
+
+The Risk Officer has access to:
+- finma.search_intermediaries
+- seco.check_sanctions
+- zefix.search_companies
+- shab.search_publications
+
+Criteria:
+- {KYC_OFFICER} handles new customers and verification
+- {RISK_OFFICER} handles sanctions and high-risk cases
+- {ACCOUNT_MANAGER} handles account operations
+"""
+    )
+
+    # Obvious hand-overs are decided by rules, only the rest invokes the selection prompt;
+    # chat.selection_strategy.get_stats() reports the fast-path hit rate
+    return AgentGroupChat(
+        agents=agents,
+        selection_strategy=FastPathSelectionStrategy(
+            initial_agent=agents[0],
+            function=selection_function,
+            kernel=kernel,
+            rules=default_banking_rules(KYC_OFFICER, ACCOUNT_MANAGER, RISK_OFFICER),
+            # The selection prompt only needs the gist of the conversation
+            history_reducer=TokenBudgetReducer(target_tokens=2000, max_result_tokens=40),
+            history_variable_name="history",
+            agent_variable_name="agents",
+            result_parser=lambda x: str(x).strip() if x else KYC_OFFICER
+        ),
+        # Stop once the account is created or frozen with a rationale, or a budget is spent;
+        # chat.termination_strategy.get_stats() reports turns, tokens and duration per event
+        termination_strategy=BudgetTerminationStrategy(
+            max_seconds=max_seconds,
+            max_turns=max_turns,
+            max_tokens=max_tokens
+        ),
+        # Budget the history by tokens: older plugin outputs are condensed to their evidence,
+        # the latest decisions and messages are kept as they are; chat_ui reduces the
+        # history before each new user message
+        chat_history=TokenBudgetReducer(target_tokens=6000)
+    )
+
 @dataclass
 class BankingContext:
     """Shared context between agents"""
@@ -1,8 +1,12 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field, replace
+from typing import Dict, Mapping, Optional, Sequence, Set, Tuple
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
+import heapq
+import threading
 import uuid
+from zefix_index import is_valid_uid, normalize_uid
 
 class AccountType(Enum):
     INDIVIDUAL = "individual"
@@ -13,27 +17,126 @@ class AccountStatus(Enum):
     FROZEN = "frozen"
     CLOSED = "closed"
 
-@dataclass
+@dataclass(frozen=True)
 class AccountOwner:
     name: str
     type: AccountType
     uid: Optional[str] = None  # For companies
     
-@dataclass
+@dataclass(frozen=True)
 class BankAccount:
     owner: AccountOwner
     balance: float = 0.0
     status: AccountStatus = AccountStatus.ACTIVE
     created_at: datetime = field(default_factory=datetime.now)
     freeze_reason: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+def perform_basic_checks(account: BankAccount) -> BankAccount:
+    """
+    Perform basic validation checks on account data, returning the account frozen if they fail
+    """
+    owner = account.owner
+    freeze_reasons = []
+
+    # Basic name check
+    if len(owner.name.strip()) < 2:
+        freeze_reasons.append("Invalid owner name")
+
+    # Basic company check
+    if owner.type == AccountType.COMPANY and not owner.uid:
+        freeze_reasons.append("Company requires UID")
+    elif owner.uid and not is_valid_uid(owner.uid):
+        freeze_reasons.append("Invalid UID (format or check digit)")
+
+    if freeze_reasons:
+        return replace(account, status=AccountStatus.FROZEN, freeze_reason="; ".join(freeze_reasons))
+    return account
 
 class InMemoryBankAPI:
+    """
+    Thread-safe in-memory account store.
+
+    Accounts are immutable; every change stores a new version, so readers
+    can hold on to accounts and snapshots without locking. Secondary
+    indexes by id, UID, status and type turn reviews into lookups.
+
+    Usage:
+        bank = InMemoryBankAPI()
+        bank.create_account("Example AG", AccountType.COMPANY, uid="CHE-110.088.994")
+        frozen = bank.list_accounts(status=AccountStatus.FROZEN)
+    """
+
     def __init__(self):
-        self.accounts: Dict[str, BankAccount] = {}
+        self._accounts: Dict[str, BankAccount] = {}
+        self._by_id: Dict[str, str] = {}
+        self._by_uid: Dict[str, str] = {}
+        self._by_status: Dict[AccountStatus, Set[str]] = {status: set() for status in AccountStatus}
+        self._by_type: Dict[AccountType, Set[str]] = {account_type: set() for account_type in AccountType}
+        self._lock = threading.RLock()
+        self._version = 0
+        self._snapshot: Tuple[int, Tuple[BankAccount, ...]] = (0, ())
+
+    @property
+    def accounts(self) -> Mapping[str, BankAccount]:
+        """Read-only view of the accounts by owner name"""
+        return MappingProxyType(self._accounts)
+
+    @property
+    def version(self) -> int:
+        """Incremented on every change, e.g. to skip re-rendering unchanged views"""
+        return self._version
+
+    def list_accounts(self,
+                      status: Optional[AccountStatus] = None,
+                      account_type: Optional[AccountType] = None) -> Sequence[BankAccount]:
+        """
+        List accounts, optionally filtered by status and type
+
+        Args:
+            status: Only accounts with this status
+            account_type: Only accounts of this type
+
+        Returns:
+            Immutable sequence of accounts in creation order
+        """
+        with self._lock:
+            if status is None and account_type is None:
+                # The full listing is shared between callers until the next change
+                version, snapshot = self._snapshot
+                if version != self._version:
+                    snapshot = tuple(self._accounts.values())
+                    self._snapshot = (self._version, snapshot)
+                return snapshot
+
+            names = None
+            if status is not None:
+                names = self._by_status[status]
+            if account_type is not None:
+                names = self._by_type[account_type] if names is None else names & self._by_type[account_type]
+            accounts = [self._accounts[name] for name in names]
+        return tuple(sorted(accounts, key=lambda a: a.created_at))
+
+    def list_recent(self, limit: int) -> Sequence[BankAccount]:
+        """The `limit` most recently created accounts, newest first"""
+        with self._lock:
+            accounts = list(self._accounts.values())
+        # Ordered by created_at like SqliteBankAPI: re-creating an owner's account keeps
+        # its position in the mapping, so insertion order only breaks ties
+        newest = heapq.nlargest(limit, enumerate(accounts), key=lambda pair: (pair[1].created_at, pair[0]))
+        return tuple(account for _, account in newest)
+
+    def find_by_uid(self, uid: str) -> Optional[BankAccount]:
+        """Get the account of a company by UID in any common format"""
+        with self._lock:
+            name = self._by_uid.get(self._uid_key(uid))
+            return self._accounts.get(name) if name else None
 
-    def list_accounts(self) -> List[BankAccount]:
-        """List all accounts"""
-        return list(self.accounts.values())
+    def find_by_id(self, account_id: str) -> Optional[BankAccount]:
+        """Get an account by id"""
+        with self._lock:
+            name = self._by_id.get(account_id)
+            return self._accounts.get(name) if name else None
 
     def create_account(self, owner_name: str, account_type: AccountType, initial_balance: float = 0.0, uid: Optional[str] = None) -> BankAccount:
         """Create a new bank account"""
@@ -48,54 +151,59 @@ class InMemoryBankAPI:
             balance=initial_balance
         )
         
-        self._perform_basic_checks(account)
-        self.accounts[owner_name] = account
+        account = perform_basic_checks(account)
+        with self._lock:
+            self._store(account)
         return account
 
-    def _perform_basic_checks(self, account: BankAccount) -> None:
-        """
-        Perform basic validation checks on account data
-        """
-        owner = account.owner
-        freeze_reasons = []
-
-        # Basic name check
-        if len(owner.name.strip()) < 2:
-            freeze_reasons.append("Invalid owner name")
-
-        # Basic company check
-        if owner.type == AccountType.COMPANY and not owner.uid:
-            freeze_reasons.append("Company requires UID")
-
-        if freeze_reasons:
-            self.freeze_account(owner.name, "; ".join(freeze_reasons))
-
     def get_account(self, owner_name: str) -> Optional[BankAccount]:
         """Get account by owner name"""
-        return self.accounts.get(owner_name)
+        return self._accounts.get(owner_name)
 
     def freeze_account(self, owner_name: str, reason: str) -> bool:
         """Freeze an account"""
-        if account := self.accounts.get(owner_name):
-            account.status = AccountStatus.FROZEN
-            account.freeze_reason = reason
-            return True
+        with self._lock:
+            if account := self._accounts.get(owner_name):
+                self._store(replace(account, status=AccountStatus.FROZEN, freeze_reason=reason))
+                return True
         return False
 
     def unfreeze_account(self, owner_name: str) -> bool:
         """Unfreeze an account"""
-        if account := self.accounts.get(owner_name):
-            account.status = AccountStatus.ACTIVE
-            account.freeze_reason = None
-            return True
+        with self._lock:
+            if account := self._accounts.get(owner_name):
+                self._store(replace(account, status=AccountStatus.ACTIVE, freeze_reason=None))
+                return True
         return False
 
+    def _store(self, account: BankAccount) -> None:
+        """Replace the owner's account and update the indexes; caller holds the lock"""
+        name = account.owner.name
+        if previous := self._accounts.get(name):
+            self._by_id.pop(previous.id, None)
+            if previous.owner.uid and self._by_uid.get(self._uid_key(previous.owner.uid)) == name:
+                del self._by_uid[self._uid_key(previous.owner.uid)]
+            self._by_status[previous.status].discard(name)
+            self._by_type[previous.owner.type].discard(name)
+
+        self._accounts[name] = account
+        self._by_id[account.id] = name
+        if account.owner.uid:
+            self._by_uid[self._uid_key(account.owner.uid)] = name
+        self._by_status[account.status].add(name)
+        self._by_type[account.owner.type].add(name)
+        self._version += 1
+
+    @staticmethod
+    def _uid_key(uid: str) -> str:
+        return normalize_uid(uid) or uid.strip().upper()
+
 # Sample usage
 if __name__ == "__main__":
     bank = InMemoryBankAPI()
     
     # Create test accounts
-    company_acc = bank.create_account("Test Company AG", AccountType.COMPANY, 1000.0, "CHE-123.456.789")
+    company_acc = bank.create_account("Test Company AG", AccountType.COMPANY, 1000.0, "CHE-123.456.788")
     individual_acc = bank.create_account("John Doe", AccountType.INDIVIDUAL, 500.0)
     
     print(f"Company account: {company_acc.owner.name}, Balance: {company_acc.balance}")
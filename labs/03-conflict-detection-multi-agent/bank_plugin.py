@@ -1,8 +1,10 @@
-from typing import Annotated
+from typing import Annotated, Optional, Union
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 from bank_api import AccountType, AccountStatus
-from plugin_logger import log_plugin_call, PluginType
-from shared_state import bank_api
+from output_format import OutputFormat, compact_fields, fit_to_budget, parse_output_format
+from plugin_logger import log_plugin_call, timed_plugin_call, PluginType
+from shared_state import bank_api, zefix_index
+from zefix_index import format_uid, is_valid_uid
 
 class BankPlugin:
     """
@@ -12,13 +14,18 @@ class BankPlugin:
         kernel.add_plugin(BankPlugin(), plugin_name="bank")
     """
     
-    def __init__(self):
+    def __init__(self,
+                 output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                 max_tokens: Optional[int] = None):
         self._client = bank_api  # Use shared instance instead of creating new one
+        self._format = parse_output_format(output_format)
+        self._max_tokens = max_tokens
     
     @kernel_function(
         description="Create a new bank account",
         name="create_account"
     )
+    @timed_plugin_call(PluginType.BANK)
     def create_account(
         self,
         owner_name: Annotated[str, "Name of the account owner"],
@@ -28,17 +35,35 @@ class BankPlugin:
         account_type_enum = AccountType.COMPANY if account_type.lower() == "company" else AccountType.INDIVIDUAL
         
         try:
+            existing = self._client.find_by_uid(uid) if uid else None
+            if existing is not None and existing.owner.name != owner_name:
+                raise Exception(f"UID {uid} already belongs to the account of {existing.owner.name} (ID {existing.id})")
             account = self._client.create_account(
                 owner_name=owner_name,
                 account_type=account_type_enum,
                 uid=uid if uid else None
             )
-            result = (f"Account created:\n"
-                   f"ID: {account.id}\n"
-                   f"Owner: {account.owner.name}\n"
-                   f"Type: {account.owner.type.value}")
+            if self._format == OutputFormat.COMPACT:
+                result = compact_fields(
+                    "Account created",
+                    id=account.id,
+                    owner=account.owner.name,
+                    type=account.owner.type.value,
+                    uid_check=self._describe_uid(uid).removeprefix("UID check: ") if uid else None,
+                    status=f"frozen ({account.freeze_reason})" if account.status == AccountStatus.FROZEN else None
+                )
+            else:
+                result = (f"Account created:\n"
+                       f"ID: {account.id}\n"
+                       f"Owner: {account.owner.name}\n"
+                       f"Type: {account.owner.type.value}")
+                if uid:
+                    result += "\n" + self._describe_uid(uid)
+                if account.status == AccountStatus.FROZEN:
+                    result += f"\nStatus: frozen ({account.freeze_reason})"
         except Exception as e:
             result = f"Error: {str(e)}"
+        result = fit_to_budget(result, self._max_tokens)
             
         log_plugin_call(
             PluginType.BANK,
@@ -52,18 +77,32 @@ class BankPlugin:
         description="Get account details",
         name="get_account"
     )
+    @timed_plugin_call(PluginType.BANK)
     def get_account(
         self,
         owner_name: Annotated[str, "Name of the account owner"]
     ) -> Annotated[str, "Account details or error message"]:
         account = self._client.get_account(owner_name)
-        result = f"No account found for owner {owner_name}" if not account else (
-            f"Account Details:\n"
-            f"Owner: {account.owner.name}\n"
-            f"Type: {account.owner.type.value}\n"
-            f"Status: {account.status.value}\n"
-            f"Balance: {account.balance}"
-        )
+        if not account:
+            result = f"No account found for owner {owner_name}"
+        elif self._format == OutputFormat.COMPACT:
+            result = compact_fields(
+                "Account",
+                owner=account.owner.name,
+                type=account.owner.type.value,
+                status=account.status.value,
+                balance=account.balance,
+                freeze_reason=account.freeze_reason
+            )
+        else:
+            result = (
+                f"Account Details:\n"
+                f"Owner: {account.owner.name}\n"
+                f"Type: {account.owner.type.value}\n"
+                f"Status: {account.status.value}\n"
+                f"Balance: {account.balance}"
+            )
+        result = fit_to_budget(result, self._max_tokens)
         
         log_plugin_call(
             PluginType.BANK,
@@ -73,10 +112,55 @@ class BankPlugin:
         )
         return result
 
+    @kernel_function(
+        description="Find an account by account ID or company UID",
+        name="find_account"
+    )
+    @timed_plugin_call(PluginType.BANK)
+    def find_account(
+        self,
+        identifier: Annotated[str, "Account ID or company UID (e.g. CHE-123.456.789)"]
+    ) -> Annotated[str, "Account details or error message"]:
+        account = self._client.find_by_id(identifier.strip()) or self._client.find_by_uid(identifier)
+        if not account:
+            result = f"No account found for {identifier}"
+        elif self._format == OutputFormat.COMPACT:
+            result = compact_fields(
+                "Account",
+                id=account.id,
+                owner=account.owner.name,
+                type=account.owner.type.value,
+                uid=account.owner.uid,
+                status=account.status.value,
+                balance=account.balance,
+                freeze_reason=account.freeze_reason
+            )
+        else:
+            result = (
+                f"Account Details:\n"
+                f"ID: {account.id}\n"
+                f"Owner: {account.owner.name}\n"
+                f"Type: {account.owner.type.value}\n"
+                f"Status: {account.status.value}\n"
+                f"Balance: {account.balance}"
+            )
+            if account.owner.uid:
+                result += f"\nUID: {account.owner.uid}"
+        result = fit_to_budget(result, self._max_tokens)
+
+        log_plugin_call(
+            PluginType.BANK,
+            "find_account",
+            {"identifier": identifier},
+            result
+        )
+        return result
+
     @kernel_function(
         description="Freeze a bank account",
         name="freeze_account"
     )
+    @timed_plugin_call(PluginType.BANK)
     def freeze_account(
         self,
         owner_name: Annotated[str, "Name of the account owner"],
@@ -100,6 +184,7 @@ class BankPlugin:
         description="Unfreeze a bank account",
         name="unfreeze_account"
     )
+    @timed_plugin_call(PluginType.BANK)
     def unfreeze_account(
         self,
         owner_name: Annotated[str, "Name of the account owner"]
@@ -117,3 +202,12 @@ class BankPlugin:
             result
         )
         return result
+
+    def _describe_uid(self, uid: str) -> str:
+        """Offline UID check against the check digit and the local Zefix index"""
+        if not is_valid_uid(uid):
+            return f"UID check: {uid} is not a valid UID (format or check digit)"
+        record = zefix_index.get(uid)
+        if record is None:
+            return f"UID check: {format_uid(uid)} is valid but not in the local Zefix index, verify with zefix.lookup_uid"
+        return f"UID check: {format_uid(uid)} registered to {record.name} ({record.status}, {record.legal_seat})"
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from semantic_kernel.agents import AgentGroupChat
+
+from agents import BankingContext
+
+
+class SessionLimitReached(Exception):
+    """Every session slot is taken by a session with a conversation in progress"""
+
+
+@dataclass
+class ChatSession:
+    """Group chat, banking context and chat state of one browser session"""
+    chat: AgentGroupChat
+    last_used: float
+    context: BankingContext = field(default_factory=BankingContext)
+    last_message: Optional[str] = None
+    last_message_timestamp: float = 0.0
+    # A group chat runs only one conversation at a time
+    run_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def busy(self) -> bool:
+        return self.run_lock.locked()
+
+
+class ChatSessions:
+    """
+    Keeps one group chat and banking context per Gradio session, built on
+    first use from a factory sharing the kernel, agents and plugins.
+
+    Sessions idle for longer than `idle_timeout` seconds are dropped. At most
+    `max_sessions` are kept; a new session replaces the least recently used
+    idle one, and is refused when all of them are in a conversation.
+
+    Usage:
+        sessions = ChatSessions(create_chat, idle_timeout=30 * 60, max_sessions=20)
+        session = sessions.get(request.session_hash)
+        async with session.run_lock:
+            await session.chat.add_chat_message(message)
+    """
+
+    def __init__(self,
+                 create_chat: Callable[[], AgentGroupChat],
+                 idle_timeout: float = 30 * 60,
+                 max_sessions: int = 20):
+        """
+        Args:
+            create_chat: Factory for the group chat of a new session
+            idle_timeout: Seconds after which an unused session is dropped
+            max_sessions: Maximum number of sessions kept at the same time
+        """
+        self._create_chat = create_chat
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        # Least recently used first
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.created = 0
+        self.expired = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> ChatSession:
+        """
+        Return the session, creating its group chat on first use
+
+        Raises:
+            SessionLimitReached: If max_sessions are kept and all of them are busy
+        """
+        self._sweep_if_due()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+                return session
+            if len(self._sessions) >= self.max_sessions and not self._evict_least_recently_used():
+                self.rejected += 1
+                raise SessionLimitReached(
+                    f"All {self.max_sessions} sessions are busy, please try again in a moment"
+                )
+            # Building a group chat makes no requests, so it is done under the lock
+            session = self._sessions[session_id] = ChatSession(chat=self._create_chat(), last_used=time.monotonic())
+            self.created += 1
+            return session
+
+    def reset(self, session_id: str) -> bool:
+        """Drop the session's chat and context unless a conversation is in progress (e.g. when the chat is cleared).
+        Returns False if the session was kept because it is busy"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return True
+            if session.busy:
+                return False
+            del self._sessions[session_id]
+            return True
+
+    def expire_idle(self) -> int:
+        """Drop sessions idle for longer than idle_timeout. Returns the number expired"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items()
+                       if s.last_used < cutoff and not s.busy]
+            for sid in expired:
+                del self._sessions[sid]
+            self.expired += len(expired)
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counts of kept, busy, created, expired and refused sessions"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "busy": sum(1 for s in sessions if s.busy),
+            "created": self.created,
+            "expired": self.expired,
+            "rejected": self.rejected,
+        }
+
+    def _evict_least_recently_used(self) -> bool:
+        """Drop the least recently used idle session, caller holds the lock"""
+        for sid, session in self._sessions.items():
+            if not session.busy:
+                del self._sessions[sid]
+                self.expired += 1
+                return True
+        return False
+
+    def _sweep_if_due(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < min(60.0, self.idle_timeout):
+            return
+        self._last_sweep = now
+        self.expire_idle()
@@ -1,58 +1,138 @@
 import json
 import time
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 import gradio as gr
 from gradio import ChatMessage
-import asyncio
 from dataclasses import asdict
-from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
+from itertools import islice
+from semantic_kernel.agents import AgentGroupChat
 from semantic_kernel.contents import ChatMessageContent
 from semantic_kernel.contents.utils.author_role import AuthorRole
-from plugin_logger import get_last_calls
+from plugin_logger import get_last_calls, get_cache_stats, get_plugin_stats, get_activity_version
+from http_client import request_deadline
+from termination_strategy import BudgetTerminationStrategy
+from chat_sessions import ChatSession, ChatSessions, SessionLimitReached
 
-from agents import create_kernel, BankingContext, KYC_OFFICER, ACCOUNT_MANAGER, RISK_OFFICER
-from shared_state import bank_api
+from agents import KYC_OFFICER, ACCOUNT_MANAGER, RISK_OFFICER
+from shared_state import bank_api, get_sample_sanctioned_person
 
 def convert_dict_to_chatmessage(msg: dict) -> ChatMessage:
     return ChatMessage(role=msg["role"], content=msg["content"], metadata=msg.get("metadata"))
 
-def create_chat_interface(chat: AgentGroupChat):
-    last_message = None
-    last_message_timestamp = 0
-    context = BankingContext()
+def create_chat_interface(create_chat: Callable[[], AgentGroupChat],
+                          turn_deadline: float = 60.0,
+                          sessions: Optional[ChatSessions] = None,
+                          max_concurrent_runs: int = 8,
+                          accounts_shown: int = 50):
+    """
+    Create the Gradio UI for the multi-agent chat.
+
+    Every Gradio session gets its own group chat and banking context, so
+    concurrent users neither see each other's history nor wait for each other.
+
+    Args:
+        create_chat: Factory for the group chat of a new session, sharing one kernel
+        turn_deadline: Seconds each agent turn may spend on registry requests
+        sessions: Per-session chat store, created with default idle expiry and session cap if omitted
+        max_concurrent_runs: Maximum number of conversations running at the same time
+        accounts_shown: Number of most recently created accounts in the accounts panel
+    """
+    if sessions is None:
+        sessions = ChatSessions(create_chat)
     
+    # Rendered panel text per store version, and per entry so that a change
+    # only renders the new or changed entries
+    accounts_cache = {"version": None, "text": "", "entries": {}}
+    calls_cache = {"version": None, "text": "", "entries": {}}
+
     def refresh_accounts():
-        accounts = bank_api.list_accounts()
-        accounts_text = "Current Accounts:\n\n"
-        for acc in accounts:
-            accounts_text += (f"Owner: {acc.owner.name}\n"
-                            f"Type: {acc.owner.type.value}\n"
-                            f"Status: {acc.status.value}\n"
-                            f"Balance: {acc.balance}\n"
-                            f"{'=' * 40}\n")
-        return accounts_text
+        if accounts_cache["version"] == bank_api.version:
+            return accounts_cache["text"]
+        version = bank_api.version
+        previous, entries = accounts_cache["entries"], {}
+        # Only the newest accounts, the store may hold far more than the panel can show
+        for acc in bank_api.list_recent(accounts_shown):
+            cached = previous.get(acc.owner.name)
+            if cached is not None and cached[0] == acc:
+                entries[acc.owner.name] = cached
+            else:
+                entries[acc.owner.name] = (acc, f"Owner: {acc.owner.name}\n"
+                                                f"Type: {acc.owner.type.value}\n"
+                                                f"Status: {acc.status.value}\n"
+                                                f"Balance: {acc.balance}\n"
+                                                f"{'=' * 40}\n")
+        accounts_cache.update(
+            version=version,
+            entries=entries,
+            text=f"Newest Accounts (up to {accounts_shown}):\n\n" + "".join(text for _, text in entries.values())
+        )
+        return accounts_cache["text"]
 
     def refresh_plugin_calls():
-        calls = get_last_calls()
-        calls_text = "Recent Plugin Calls:\n\n"
-        for call in calls:
-            calls_text += (f"Plugin: {call.plugin_type.value}\n"
-                         f"Function: {call.function_name}\n"
-                         f"Input: {json.dumps(call.input_data, indent=2)}\n"
-                         f"Output: {call.output}\n"
-                         f"Time: {call.timestamp}\n"
-                         f"{'=' * 40}\n")
-        return calls_text
-
-    async def banking_chat(user_message: str, history_kyc: List[dict], history_risk: List[dict], history_account: List[dict]):
-        nonlocal last_message, last_message_timestamp
+        if calls_cache["version"] == get_activity_version():
+            return calls_cache["text"]
+        version = get_activity_version()
+        parts = ["Recent Plugin Calls:\n\n"]
+        cache_stats = get_cache_stats()
+        if cache_stats:
+            parts.append("Response Cache: " + ", ".join(
+                f"{source} {stats['hit_ratio']:.0%} hits" for source, stats in cache_stats.items()
+            ) + "\n\n")
+        plugin_stats = get_plugin_stats()
+        if plugin_stats:
+            # Slowest functions by total time spent, i.e. what holds up the agent turns
+            parts.append("Plugin Latency: " + ", ".join(
+                f"{name} p95 {stats['p95_ms']:.0f}ms ({stats['calls']} calls, {stats['errors']} errors)"
+                for name, stats in islice(plugin_stats.items(), 3)
+            ) + "\n\n")
+        previous, entries = calls_cache["entries"], {}
+        for call in get_last_calls():
+            entries[call.seq] = previous.get(call.seq) or (
+                f"Plugin: {call.plugin_type.value}\n"
+                f"Function: {call.function_name}\n"
+                f"Input: {json.dumps(call.input_data, indent=2)}\n"
+                f"Output: {call.output}\n"
+                f"Time: {call.timestamp}"
+                f"{f' ({call.duration_ms:.0f}ms)' if call.duration_ms is not None else ''}\n"
+                f"{'=' * 40}\n"
+            )
+        parts.extend(entries.values())
+        calls_cache.update(version=version, entries=entries, text="".join(parts))
+        return calls_cache["text"]
+
+    def panel_updates(sent: Dict[str, Any]):
+        """Panel values for one yield, or gr.update() for panels unchanged since the last yield"""
+        updates = []
+        for key, version, refresh in (("calls", get_activity_version(), refresh_plugin_calls),
+                                      ("accounts", bank_api.version, refresh_accounts)):
+            if sent.get(key) == version:
+                updates.append(gr.update())
+            else:
+                sent[key] = version
+                updates.append(refresh())
+        return tuple(updates)
+
+    def error_message(text: str) -> dict:
+        return asdict(ChatMessage(role="assistant", content=f"Error: {text}", metadata={"error": True}))
+
+    async def banking_chat(user_message: str, history_kyc: List[dict], history_risk: List[dict], history_account: List[dict],
+                           request: gr.Request = None):
+        # Panel versions already sent to this client during this call
+        sent: Dict[str, Any] = {}
+        session_id = request.session_hash if request is not None and request.session_hash else "default"
+        try:
+            session = sessions.get(session_id)
+        except SessionLimitReached as e:
+            error_dict = error_message(str(e))
+            yield (history_kyc + [error_dict], history_risk + [error_dict], history_account + [error_dict], *panel_updates(sent))
+            return
         
-        if last_message == user_message and time.time() - last_message_timestamp < 5:
-            yield history_kyc, history_risk, history_account, refresh_plugin_calls(), refresh_accounts()
+        if session.last_message == user_message and time.time() - session.last_message_timestamp < 5:
+            yield (history_kyc, history_risk, history_account, *panel_updates(sent))
             return
             
-        last_message = user_message
-        last_message_timestamp = time.time()
+        session.last_message = user_message
+        session.last_message_timestamp = time.time()
 
         # Add user message to all chatboxes
         user_msg = ChatMessage(role="user", content=user_message)
@@ -64,7 +144,15 @@ def create_chat_interface(chat: AgentGroupChat):
         history_risk.append(asdict(user_msg))
         history_account.append(asdict(user_msg))
         
-        yield history_kyc, history_risk, history_account, refresh_plugin_calls(), refresh_accounts()
+        yield (history_kyc, history_risk, history_account, *panel_updates(sent))
+
+        async with session.run_lock:
+            async for update in run_conversation(session, user_message, history_kyc, history_risk, history_account, sent):
+                yield update
+
+    async def run_conversation(session: ChatSession, user_message: str, history_kyc: List[dict], history_risk: List[dict],
+                               history_account: List[dict], sent: Dict[str, Any]):
+        chat, context = session.chat, session.context
 
         # Parse commands and update context
         if user_message.startswith("new customer"):
@@ -81,10 +169,24 @@ def create_chat_interface(chat: AgentGroupChat):
             content=f"{user_message}\nContext: {context}"
         )
         
+        # Keep the prompts within budget before the next conversation adds to them
+        await chat.reduce_history()
         await chat.add_chat_message(message)
+        budget = chat.termination_strategy if isinstance(chat.termination_strategy, BudgetTerminationStrategy) else None
+        if budget is not None:
+            budget.begin_conversation()
         
         try:
-            async for response in chat.invoke():
+            responses = chat.invoke()
+            while True:
+                # Registry calls made while producing one agent response share a deadline,
+                # never longer than what is left of the conversation's budget
+                deadline = min(turn_deadline, budget.remaining_seconds) if budget is not None else turn_deadline
+                with request_deadline(deadline):
+                    try:
+                        response = await responses.__anext__()
+                    except StopAsyncIteration:
+                        break
                 if response and response.name:
                     agent_msg = ChatMessage(
                         role="assistant",
@@ -99,19 +201,14 @@ def create_chat_interface(chat: AgentGroupChat):
                     elif response.name == ACCOUNT_MANAGER:
                         history_account.append(asdict(agent_msg))
                         
-                    yield history_kyc, history_risk, history_account, refresh_plugin_calls(), refresh_accounts()
+                    yield (history_kyc, history_risk, history_account, *panel_updates(sent))
                     
         except Exception as e:
-            error_msg = ChatMessage(
-                role="assistant",
-                content=f"Error: {str(e)}",
-                metadata={"error": True}
-            )
-            error_dict = asdict(error_msg)
+            error_dict = error_message(str(e))
             history_kyc.append(error_dict)
             history_risk.append(error_dict)
             history_account.append(error_dict)
-            yield history_kyc, history_risk, history_account, refresh_plugin_calls(), refresh_accounts()
+            yield (history_kyc, history_risk, history_account, *panel_updates(sent))
 
     with gr.Blocks(title="Banking Multi-Agent System", css="""
         .message.agent-message { border-radius: 5px; margin: 5px 0; padding: 10px; }
@@ -150,11 +247,12 @@ def create_chat_interface(chat: AgentGroupChat):
                                 
                 # Add sample query buttons
                 with gr.Row():
-                    sanctioned_name = bank_api.list_accounts()[1].owner.name  # Get the sanctioned person's name
-                    gr.Button(f"Review {sanctioned_name}'s Account").click(
-                        fn=lambda name=sanctioned_name: f"Perform an Account Review for {name}",
-                        outputs=msg
-                    )
+                    sanctioned_name = get_sample_sanctioned_person()  # Set by init_sample_data
+                    if sanctioned_name:
+                        gr.Button(f"Review {sanctioned_name}'s Account").click(
+                            fn=lambda name=sanctioned_name: f"Perform an Account Review for {name}",
+                            outputs=msg
+                        )
                     gr.Button("Create Microsoft CH Account").click(
                         fn=lambda: "new customer Microsoft Schweiz GmbH company CHE-110.088.994",
                         outputs=msg
@@ -184,21 +282,39 @@ def create_chat_interface(chat: AgentGroupChat):
                 )
                 refresh_btn = gr.Button("Refresh")
 
-        # Event handlers
+        # Event handlers; both submit events share one limit of concurrent conversations
         msg.submit(
             fn=banking_chat,
             inputs=[msg, chatbox_kyc, chatbox_risk, chatbox_account],
-            outputs=[chatbox_kyc, chatbox_risk, chatbox_account, plugin_monitor, accounts_monitor]
+            outputs=[chatbox_kyc, chatbox_risk, chatbox_account, plugin_monitor, accounts_monitor],
+            concurrency_limit=max_concurrent_runs,
+            concurrency_id="banking_chat"
         )
         submit.click(
             fn=banking_chat,
             inputs=[msg, chatbox_kyc, chatbox_risk, chatbox_account],
-            outputs=[chatbox_kyc, chatbox_risk, chatbox_account, plugin_monitor, accounts_monitor]
+            outputs=[chatbox_kyc, chatbox_risk, chatbox_account, plugin_monitor, accounts_monitor],
+            concurrency_limit=max_concurrent_runs,
+            concurrency_id="banking_chat"
         )
+
+        # Clearing the chat also starts a new group chat and context for the session
+        def clear_chat(request: gr.Request):
+            if not sessions.reset(request.session_hash):
+                # The running turn keeps its group chat, so leave its history on screen
+                gr.Warning("Please wait for the current conversation to finish before clearing the chat")
+                return gr.update(), gr.update(), gr.update(), gr.update(), gr.update()
+            return [], [], [], "", ""
+
+        def close_session(request: gr.Request):
+            sessions.reset(request.session_hash)
+
         clear.click(
-            lambda: ([], [], [], "", ""), 
+            clear_chat,
             outputs=[chatbox_kyc, chatbox_risk, chatbox_account, msg, plugin_monitor]
         )
+        # Free the session as soon as its browser tab is closed instead of waiting for the idle expiry
+        ui.unload(close_session)
         refresh_btn.click(
             fn=lambda: (refresh_plugin_calls(), refresh_accounts()),
             outputs=[plugin_monitor, accounts_monitor]
@@ -0,0 +1,153 @@
+import asyncio
+from typing import Annotated, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from semantic_kernel.functions.kernel_function_decorator import kernel_function
+from zefix_api import ZefixClient
+from shab_api import ShabClient, PublicationState
+from finma_api import FinmaClient
+from response_cache import ResponseCache
+from seco_api import SecoClient
+from output_format import OutputFormat, compact_table, fit_to_budget, parse_output_format
+from plugin_logger import log_plugin_call, timed_plugin_call, PluginType
+from shared_state import seco_client
+
+class DueDiligencePlugin:
+    """
+    Description: Plugin running all registry, gazette and sanctions lookups for one customer at once.
+
+    Usage:
+        kernel.add_plugin(DueDiligencePlugin(), plugin_name="due_diligence")
+
+    Examples:
+        {{due_diligence.check_customer name="Example AG" is_company=true}} => Returns consolidated evidence
+    """
+
+    # Seconds each source may take before it is reported as timed out
+    DEFAULT_TIMEOUTS = {"zefix": 10.0, "shab": 10.0, "finma": 10.0, "seco": 20.0}
+    MAX_ITEMS = 3
+    COLUMNS = {
+        "zefix": ("name", "uid", "status", "seat"),
+        "shab": ("date", "rubric", "title"),
+        "finma": ("name", "registration", "seat"),
+        "seco": ("match",),
+    }
+
+    def __init__(self,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 cache: Optional[ResponseCache] = None,
+                 seco: Optional[SecoClient] = None,
+                 output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                 max_tokens: Optional[int] = None):
+        # A cache other than the default one, e.g. canned registry responses for load tests
+        self._zefix = ZefixClient(cache)
+        self._shab = ShabClient(cache)
+        self._finma = FinmaClient(cache)
+        # Share the sanctions list already loaded for the bank sample data
+        self._seco = seco if seco is not None else seco_client
+        self.timeouts = {**self.DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self._output_format = parse_output_format(output_format)
+        self._max_tokens = max_tokens
+
+    @kernel_function(
+        description="Run company registry, gazette, FINMA and sanctions checks for a new customer in one call",
+        name="check_customer"
+    )
+    @timed_plugin_call(PluginType.DUE_DILIGENCE)
+    async def check_customer(
+        self,
+        name: Annotated[str, "Customer (company or person) name"],
+        is_company: Annotated[bool, "Whether the customer is a company"] = True
+    ) -> Annotated[str, "Consolidated due diligence evidence"]:
+        """Run all lookups concurrently and return one evidence block"""
+        if len(name) < 3:
+            result = "Error: Customer name must be at least 3 characters"
+        else:
+            # Sanctions first, so a token budget never cuts a hit from the evidence
+            lookups: Dict[str, Callable[[str], Awaitable[List[Sequence[str]]]]] = {"seco": self._seco_rows}
+            if is_company:
+                lookups["zefix"] = self._zefix_rows
+                lookups["shab"] = self._shab_rows
+            lookups["finma"] = self._finma_rows
+
+            outcomes = await asyncio.gather(*(
+                self._run(source, lookup, name) for source, lookup in lookups.items()
+            ))
+            result = self._format(name, outcomes)
+        result = fit_to_budget(result, self._max_tokens)
+
+        log_plugin_call(
+            PluginType.DUE_DILIGENCE,
+            "check_customer",
+            {"name": name, "is_company": is_company},
+            result
+        )
+        return result
+
+    async def _run(self, source: str, lookup: Callable[[str], Awaitable[List[Sequence[str]]]], name: str) -> Tuple[str, Optional[List[Sequence[str]]], Optional[str]]:
+        """Run one lookup, turning timeouts and failures into an error note"""
+        timeout = self.timeouts[source]
+        try:
+            return source, await asyncio.wait_for(lookup(name), timeout), None
+        except asyncio.TimeoutError:
+            return source, None, f"timed out after {timeout:g}s"
+        except Exception as e:
+            return source, None, f"failed: {str(e)}"
+
+    async def _zefix_rows(self, name: str) -> List[Sequence[str]]:
+        results = await self._zefix.search_async(name=name, max_entries=self.MAX_ITEMS, include_deleted=True)
+        return [
+            (c.name, c.uidFormatted or 'no UID', c.status, c.legalSeat)
+            for c in results.list[:self.MAX_ITEMS]
+        ]
+
+    async def _shab_rows(self, name: str) -> List[Sequence[str]]:
+        # Commercial registry and bankruptcy notices
+        results = await self._shab.search_async(
+            keyword=name,
+            publication_states=[PublicationState.PUBLISHED],
+            rubrics=["HR", "KK"],
+            page_size=self.MAX_ITEMS,
+            lazy=True
+        )
+        rows = []
+        for pub in results.content[:self.MAX_ITEMS]:
+            meta = pub.meta
+            title = meta.title.get('en') or meta.title.get('de') or "No title"
+            rows.append((meta.publicationDate.strftime('%Y-%m-%d'), meta.rubric, title))
+        return rows
+
+    async def _finma_rows(self, name: str) -> List[Sequence[str]]:
+        results = await self._finma.search_async(name)
+        return [
+            (item.Name, item.RegistrationNumber, item.LegalSeat)
+            for item in results.Items[:self.MAX_ITEMS]
+        ]
+
+    async def _seco_rows(self, name: str) -> List[Sequence[str]]:
+        # Fuzzy matching over the sanctions list is CPU bound, keep it off the event loop
+        return [(match,) for match in await asyncio.to_thread(self._seco.search, name)]
+
+    def _format(self, name: str, outcomes: List[Tuple[str, Optional[List[Sequence[str]]], Optional[str]]]) -> str:
+        empty = {
+            "zefix": "no company found",
+            "shab": "no publications",
+            "finma": "not registered",
+            "seco": "no sanctions found",
+        }
+        output = [f"Due diligence for '{name}':"]
+        missing = []
+        for source, rows, error in outcomes:
+            label = source.upper()
+            title = f"{label}: SANCTIONS FOUND" if source == "seco" else f"{label}:"
+            if error:
+                missing.append(source)
+                output.append(f"{label}: unavailable ({error})")
+            elif not rows:
+                output.append(f"{label}: {empty[source]}")
+            elif self._output_format == OutputFormat.COMPACT:
+                output.append(compact_table(title, self.COLUMNS[source], rows))
+            else:
+                output.append(title)
+                output.extend("- " + " | ".join(str(value) for value in row) for row in rows)
+        if missing:
+            output.append(f"Incomplete: {', '.join(missing)} could not be checked; retry with the individual function")
+        return "\n".join(output)
@@ -1,6 +1,9 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
-import requests
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, AsyncIterator, Callable, Iterator
+import httpx
+from http_client import run_sync
+from pagination import iter_items, iter_items_async, iter_pages, iter_pages_async
+from response_cache import ResponseCache, default_cache
 
 @dataclass
 class SearchResult:
@@ -49,8 +52,15 @@ class SearchResponse:
 class FinmaClient:
     BASE_URL = "https://www.finma.ch"
     SEARCH_DS = "{33E1F240-35A3-46B2-ADC3-61F936C7E186}"
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        self._cache = cache if cache is not None else default_cache
     
     def search(self, query: str, order: int = 4, skip: int = 0) -> SearchResponse:
+        """Synchronous wrapper around search_async"""
+        return run_sync(self.search_async(query, order, skip))
+
+    async def search_async(self, query: str, order: int = 4, skip: int = 0) -> SearchResponse:
         """
         Search for entities in FINMA registry
         
@@ -74,34 +84,68 @@ class FinmaClient:
             data["Skip"] = skip
             
         try:
-            response = requests.post(url, data=data)
-            response.raise_for_status()
-            data = response.json()
+            result = await self._cache.fetch_json("finma", "POST", url, data=data)
+            return self._parse_search_response(result)
             
-            # Convert items to SearchResult objects
-            items = [SearchResult(**item) for item in data["Items"]]
-            
-            # Convert facets
-            facets = []
-            for facet in data["Facets"]:
-                values = [FacetValue(**v) for v in facet["Values"]]
-                facets.append(Facet(Name=facet["Name"], Values=values))
-                
-            # Create bankruptcy info
-            bankruptcy = BankruptcyInfo(**data["Bankruptcy"])
+        except httpx.HTTPError as e:
+            raise Exception(f"Failed to search FINMA registry: {str(e)}")
+
+    def iter_results(self,
+                     query: str,
+                     order: int = 4,
+                     stop: Optional[Callable[[SearchResult], bool]] = None,
+                     max_items: Optional[int] = None) -> Iterator[SearchResult]:
+        """
+        Iterate over all matching entities, fetching the next page in the background
+        
+        Args:
+            query: Search term
+            order: Sort order (default=4)
+            stop: Stop after the first result for which this returns True
+            max_items: Maximum number of results to return
             
-            return SearchResponse(
-                Items=items,
-                Count=data["Count"],
-                Searchstring=data["Searchstring"],
-                Facets=facets,
-                NextPageLink=data.get("NextPageLink"),
-                LastPageLink=data.get("LastPageLink"),
-                ResultsPerPage=data["ResultsPerPage"],
-                Skip=data["Skip"],
-                MaxResultCount=data["MaxResultCount"],
-                Bankruptcy=bankruptcy
-            )
+        Returns:
+            Iterator of SearchResult
+        """
+        pages = iter_pages(lambda skip: self.search_async(query, order, skip), self._next_skip)
+        return iter_items(pages, lambda page: page.Items, stop, max_items)
+
+    def iter_results_async(self,
+                           query: str,
+                           order: int = 4,
+                           stop: Optional[Callable[[SearchResult], bool]] = None,
+                           max_items: Optional[int] = None) -> AsyncIterator[SearchResult]:
+        """Async variant of iter_results"""
+        pages = iter_pages_async(lambda skip: self.search_async(query, order, skip), self._next_skip)
+        return iter_items_async(pages, lambda page: page.Items, stop, max_items)
+
+    @staticmethod
+    def _next_skip(page: SearchResponse, skip: int) -> Optional[int]:
+        return skip + len(page.Items) if page.NextPageLink and page.Items else None
+
+    @staticmethod
+    def _parse_search_response(data: Dict[str, Any]) -> SearchResponse:
+        # Convert items to SearchResult objects
+        items = [SearchResult(**item) for item in data["Items"]]
+        
+        # Convert facets
+        facets = []
+        for facet in data["Facets"]:
+            values = [FacetValue(**v) for v in facet["Values"]]
+            facets.append(Facet(Name=facet["Name"], Values=values))
             
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to search FINMA registry: {str(e)}")
\ No newline at end of file
+        # Create bankruptcy info
+        bankruptcy = BankruptcyInfo(**data["Bankruptcy"])
+        
+        return SearchResponse(
+            Items=items,
+            Count=data["Count"],
+            Searchstring=data["Searchstring"],
+            Facets=facets,
+            NextPageLink=data.get("NextPageLink"),
+            LastPageLink=data.get("LastPageLink"),
+            ResultsPerPage=data["ResultsPerPage"],
+            Skip=data["Skip"],
+            MaxResultCount=data["MaxResultCount"],
+            Bankruptcy=bankruptcy
+        )
@@ -1,46 +1,94 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional, Union
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 from finma_api import FinmaClient
-from plugin_logger import log_plugin_call, PluginType
+from finma_snapshot import FinmaSnapshot
+from output_format import OutputFormat, compact_table, fit_to_budget, parse_output_format
+from plugin_logger import log_plugin_call, timed_plugin_call, PluginType
+from shared_state import finma_snapshot
 
 class FinmaPlugin:
     """
     Description: Plugin for searching FINMA registry for insurance intermediaries.
-    
+
     Usage:
         kernel.add_plugin(FinmaPlugin(), plugin_name="finma")
     """
-    
-    def __init__(self):
+
+    def __init__(self,
+                 snapshot: FinmaSnapshot = None,
+                 output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                 max_tokens: Optional[int] = None):
         self._client = FinmaClient()
-    
+        # Served from the local snapshot while it is loaded and recent enough, live search otherwise
+        self._snapshot = snapshot if snapshot is not None else finma_snapshot
+        self._format = parse_output_format(output_format)
+        self._max_tokens = max_tokens
+
     @kernel_function(
         description="Search for insurance intermediaries in FINMA registry",
         name="search_intermediaries"
     )
-    def search_intermediaries(
+    @timed_plugin_call(PluginType.FINMA)
+    async def search_intermediaries(
         self,
-        query: Annotated[str, "Name of insurance intermediary to search for"]
+        query: Annotated[str, "Name of insurance intermediary to search for"],
+        category: Annotated[str, "Only entries of this category (optional)"] = "",
+        location: Annotated[str, "Only entries with this legal seat (optional)"] = ""
     ) -> Annotated[str, "List of matching intermediaries or error message"]:
         if not query:
             result = "No search query provided"
+        elif self._snapshot.is_usable:
+            matches = self._snapshot.search(query, category=category or None, legal_seat=location or None)
+            loaded_at = datetime.fromtimestamp(self._snapshot.loaded_at).strftime('%Y-%m-%d %H:%M')
+            if not matches:
+                result = "No insurance intermediaries found"
+            elif self._format == OutputFormat.COMPACT:
+                result = compact_table(
+                    f"intermediaries {len(matches)} (snapshot {loaded_at})",
+                    ("name", "registration", "seat", "match"),
+                    ((entry.name, entry.registration_number, entry.legal_seat, score) for entry, score in matches)
+                )
+            else:
+                output = []
+                for entry, score in matches:
+                    output.append(f"Name: {entry.name}")
+                    output.append(f"Registration: {entry.registration_number}")
+                    output.append(f"Location: {entry.legal_seat}")
+                    output.append(f"Match: {score}%")
+                    output.append("---")
+                result = "\n".join(output)
+            if self._format == OutputFormat.TEXT or not matches:
+                result += f"\n(FINMA snapshot of {loaded_at})"
         else:
-            results = self._client.search(query)
-            if not results.Items:
+            results = await self._client.search_async(query)
+            items = [
+                item for item in results.Items
+                if (not category or (item.Category or "").lower() == category.lower())
+                and (not location or item.LegalSeat.lower() == location.lower())
+            ]
+            if not items:
                 result = "No insurance intermediaries found"
+            elif self._format == OutputFormat.COMPACT:
+                result = compact_table(
+                    f"intermediaries {min(len(items), 5)}/{len(items)}",
+                    ("name", "registration", "seat"),
+                    ((item.Name, item.RegistrationNumber, item.LegalSeat) for item in items[:5])
+                )
             else:
                 output = []
-                for item in results.Items[:5]:
+                for item in items[:5]:
                     output.append(f"Name: {item.Name}")
                     output.append(f"Registration: {item.RegistrationNumber}")
                     output.append(f"Location: {item.LegalSeat}")
                     output.append("---")
                 result = "\n".join(output)
-            
+        result = fit_to_budget(result, self._max_tokens)
+
         log_plugin_call(
             PluginType.FINMA,
             "search_intermediaries",
-            {"query": query},
+            {"query": query, "category": category, "location": location},
             result
         )
         return result
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from thefuzz import fuzz, process
+from finma_api import FinmaClient
+from http_client import run_sync
+from response_cache import ResponseCache
+
+@dataclass
+class FinmaEntry:
+    __slots__ = ("id", "name", "registration_number", "legal_seat", "category")
+    id: str
+    name: str
+    registration_number: str
+    legal_seat: str
+    category: str
+
+class FinmaSnapshot:
+    """
+    Local copy of the FINMA registry, searched with fuzzy name matching and
+    facet filters instead of one live request per query.
+
+    The registry is paged through once with Skip/NextPageLink, kept in
+    memory and saved to disk, and refreshed in the background once it is
+    older than `refresh_interval`. When refreshes keep failing, the snapshot
+    stops being usable after MAX_AGE_INTERVALS refresh intervals, so callers
+    fall back to live search instead of serving outdated entries.
+
+    Usage:
+        snapshot = FinmaSnapshot.load(Path.home() / ".cache" / "finma" / "snapshot.json")
+        snapshot.start()
+        matches = snapshot.search("Example Versicherungen", legal_seat="Zürich")
+    """
+
+    FACETS = ("category", "legal_seat")
+    MAX_AGE_INTERVALS = 3
+
+    def __init__(self,
+                 path: Optional[Path] = None,
+                 client: Optional[FinmaClient] = None,
+                 query: str = "",
+                 refresh_interval: float = 24 * 3600):
+        """
+        Args:
+            path: Snapshot file, not persisted if None
+            client: FINMA client, by default one that bypasses the response cache
+            query: Registry query the snapshot is built from, empty for all entries
+            refresh_interval: Seconds after which the snapshot is rebuilt
+        """
+        self.path = Path(path) if path else None
+        # Pages are read once per refresh, caching them would only fill the disk
+        self._client = client if client is not None else FinmaClient(cache=ResponseCache(ttls={"finma": 0}))
+        self.query = query
+        self.refresh_interval = refresh_interval
+        self.loaded_at: Optional[float] = None
+        self._entries: List[FinmaEntry] = []
+        self._choices: Dict[int, str] = {}
+        self._facets: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> "FinmaSnapshot":
+        """Load a saved snapshot; returns an empty snapshot if there is none"""
+        snapshot = cls(path, **kwargs)
+        try:
+            data = json.loads(snapshot.path.read_text(encoding="utf-8"))
+            snapshot._swap([FinmaEntry(*row) for row in data["entries"]], data["loaded_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return snapshot
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at > self.refresh_interval
+
+    @property
+    def is_usable(self) -> bool:
+        """Loaded, and not older than MAX_AGE_INTERVALS refresh intervals"""
+        return (len(self._entries) > 0 and self.loaded_at is not None
+                and time.time() - self.loaded_at <= self.refresh_interval * self.MAX_AGE_INTERVALS)
+
+    def facets(self) -> Dict[str, Dict[str, int]]:
+        """Return the entry count per value of each facet"""
+        with self._lock:
+            return {name: dict(values) for name, values in self._facets.items()}
+
+    def search(self,
+               query: str,
+               limit: int = 5,
+               threshold: int = 75,
+               category: Optional[str] = None,
+               legal_seat: Optional[str] = None) -> List[Tuple[FinmaEntry, int]]:
+        """
+        Find entries by fuzzy name match, optionally filtered by facet values
+
+        Args:
+            query: Name to search for
+            limit: Maximum number of matches
+            threshold: Minimum match score (0-100)
+            category: Only entries of this category (case-insensitive)
+            legal_seat: Only entries with this legal seat (case-insensitive)
+
+        Returns:
+            (entry, score) pairs, best match first
+        """
+        with self._lock:
+            entries, choices = self._entries, self._choices
+        if category or legal_seat:
+            category = category.lower() if category else None
+            legal_seat = legal_seat.lower() if legal_seat else None
+            choices = {
+                i: name for i, name in choices.items()
+                if (category is None or entries[i].category.lower() == category)
+                and (legal_seat is None or entries[i].legal_seat.lower() == legal_seat)
+            }
+        if not query:
+            return [(entries[i], 100) for i in list(choices)[:limit]]
+        matches = process.extractBests(
+            query.lower(), choices, processor=None, scorer=fuzz.token_set_ratio,
+            score_cutoff=threshold, limit=limit
+        )
+        return [(entries[i], score) for _, score, i in matches]
+
+    async def refresh_async(self) -> int:
+        """Page through the registry and replace the snapshot; returns the number of entries"""
+        entries: Dict[str, FinmaEntry] = {}
+        async for item in self._client.iter_results_async(self.query):
+            entries[item.Id] = FinmaEntry(item.Id, item.Name, item.RegistrationNumber, item.LegalSeat, item.Category or "")
+        self._swap(list(entries.values()), time.time())
+        self.save()
+        return len(entries)
+
+    def refresh(self) -> int:
+        """Synchronous wrapper around refresh_async"""
+        return run_sync(self.refresh_async())
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            data = {
+                "loaded_at": self.loaded_at,
+                "query": self.query,
+                "entries": [[e.id, e.name, e.registration_number, e.legal_seat, e.category] for e in self._entries],
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save FINMA snapshot: {e}")
+
+    def start(self, check_interval: float = 600.0) -> None:
+        """Refresh in a background thread whenever the snapshot is stale"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(check_interval,), name="finma-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, check_interval: float) -> None:
+        while not self._stop.is_set():
+            if self.is_stale and self._refresh_lock.acquire(blocking=False):
+                try:
+                    count = self.refresh()
+                    print(f"FINMA snapshot refreshed: {count} entries")
+                except Exception as e:
+                    print(f"Failed to refresh FINMA snapshot: {e}")
+                finally:
+                    self._refresh_lock.release()
+            self._stop.wait(check_interval)
+
+    def _swap(self, entries: List[FinmaEntry], loaded_at: float) -> None:
+        facets = {name: Counter(getattr(e, name) for e in entries if getattr(e, name)) for name in self.FACETS}
+        choices = {i: e.name.lower() for i, e in enumerate(entries)}
+        with self._lock:
+            self._entries = entries
+            self._choices = choices
+            self._facets = facets
+            self.loaded_at = loaded_at
@@ -0,0 +1,168 @@
+import re
+from typing import List, Optional
+
+from pydantic import Field
+from semantic_kernel.contents import ChatHistoryReducer, ChatMessageContent, FunctionCallContent, FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from token_budget import estimate_message_tokens, estimate_tokens
+
+# Lines of plugin output worth keeping when a result is condensed; "|" marks compact table rows
+_EVIDENCE_LINE = re.compile(
+    r"^(Name|UID|Status|Registration|Location|Title|Date|Type|Owner|ID|Match|Error|Note|Incomplete|"
+    r"ZEFIX|SHAB|FINMA|SECO|Due diligence|Account)\b|SANCTIONS|not found|frozen|\|",
+    re.IGNORECASE
+)
+_SEPARATOR_LINE = re.compile(r"^[=\-_\s]*$")
+
+def condense_result(text: str, max_tokens: int) -> str:
+    """
+    Condense a plugin result into its evidence lines within a token budget
+
+    Args:
+        text: Plugin output
+        max_tokens: Token budget of the condensed text
+
+    Returns:
+        The text itself if it fits, otherwise its key lines joined with " | "
+        and a marker with the number of omitted lines
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = [line.strip() for line in text.splitlines() if not _SEPARATOR_LINE.match(line)]
+    evidence = [line for line in lines if _EVIDENCE_LINE.search(line)] or lines
+    kept: List[str] = []
+    used = 0
+    for line in evidence:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept and evidence:
+        # A single long line, keep its start
+        kept.append(evidence[0][:max_tokens * 4])
+    omitted = len(lines) - len(kept)
+    return " | ".join(kept) + (f" [condensed, {omitted} more lines omitted]" if omitted else "")
+
+class TokenBudgetReducer(ChatHistoryReducer):
+    """
+    Chat history reduced to a token budget instead of a message count.
+
+    Older function results are condensed to their evidence lines first; if
+    the history is still over budget, the oldest turns are dropped. Function
+    calls always stay together with their results, and the latest decisions
+    (bank create/freeze calls and the messages explaining them)
+    as well as the latest messages are always kept verbatim.
+
+    Usage:
+        chat = AgentGroupChat(agents=[...], chat_history=TokenBudgetReducer(target_tokens=6000))
+        await chat.reduce_history()
+    """
+
+    target_count: int = Field(default=1000, gt=0, description="Unused, the budget is target_tokens")
+    target_tokens: int = Field(default=6000, gt=0)
+    # Latest messages that are never condensed or dropped
+    keep_recent: int = Field(default=4, ge=0)
+    keep_decisions: int = Field(default=2, ge=0)
+    max_result_tokens: int = Field(default=80, gt=0)
+    decision_functions: List[str] = Field(default_factory=lambda: ["bank-create_account", "bank-freeze_account"])
+    reductions: int = 0
+    last_tokens_before: int = 0
+    last_tokens_after: int = 0
+
+    async def reduce(self) -> Optional["TokenBudgetReducer"]:
+        # A copy, the list may be the chat's own history
+        messages = list(self.messages)
+        tokens = [estimate_message_tokens(message) for message in messages]
+        total = sum(tokens)
+        if total <= self.target_tokens:
+            return None
+        before = total
+
+        turns = self._group_turns(messages)
+        protected = self._protected_turns(messages, turns)
+
+        # 1. Condense the function results of older turns
+        for t, (start, end) in enumerate(turns):
+            if t in protected:
+                continue
+            for i in range(start, end):
+                condensed = self._condense(messages[i])
+                if condensed is not messages[i]:
+                    messages[i] = condensed
+                    new_tokens = estimate_message_tokens(condensed)
+                    total += new_tokens - tokens[i]
+                    tokens[i] = new_tokens
+
+        # 2. Drop the oldest turns that are not protected
+        dropped = set()
+        for t, (start, end) in enumerate(turns):
+            if total <= self.target_tokens:
+                break
+            if t in protected:
+                continue
+            dropped.add(t)
+            total -= sum(tokens[start:end])
+
+        self.messages = [
+            messages[i]
+            for t, (start, end) in enumerate(turns) if t not in dropped
+            for i in range(start, end)
+        ]
+        self.reductions += 1
+        self.last_tokens_before, self.last_tokens_after = before, total
+        return self
+
+    @staticmethod
+    def _group_turns(messages: List[ChatMessageContent]) -> List[tuple]:
+        """(start, end) ranges of messages that must be kept or dropped together"""
+        turns = []
+        start = 0
+        for i in range(1, len(messages) + 1):
+            if i == len(messages) or not TokenBudgetReducer._continues_turn(messages[i - 1], messages[i]):
+                turns.append((start, i))
+                start = i
+        return turns
+
+    @staticmethod
+    def _continues_turn(previous: ChatMessageContent, message: ChatMessageContent) -> bool:
+        # Function results follow their calls, and an agent's answer follows its function results
+        if message.role == AuthorRole.TOOL or any(isinstance(item, FunctionResultContent) for item in message.items):
+            return True
+        return previous.role == AuthorRole.TOOL and message.role == AuthorRole.ASSISTANT
+
+    def _protected_turns(self, messages: List[ChatMessageContent], turns: List[tuple]) -> set:
+        protected = {t for t, (start, end) in enumerate(turns) if end > len(messages) - self.keep_recent}
+        protected |= {t for t, (start, end) in enumerate(turns)
+                      if any(messages[i].role in (AuthorRole.SYSTEM, AuthorRole.DEVELOPER) for i in range(start, end))}
+        decisions = [t for t, (start, end) in enumerate(turns)
+                     if any(self._is_decision(messages[i]) for i in range(start, end))]
+        for t in decisions[len(decisions) - self.keep_decisions:] if self.keep_decisions else []:
+            protected.add(t)
+            # The message explaining the decision, if it is a turn of its own
+            if t + 1 < len(turns) and messages[turns[t + 1][0]].role == AuthorRole.ASSISTANT:
+                protected.add(t + 1)
+        return protected
+
+    def _is_decision(self, message: ChatMessageContent) -> bool:
+        return any(
+            isinstance(item, (FunctionCallContent, FunctionResultContent))
+            and f"{item.plugin_name}-{item.function_name}" in self.decision_functions
+            for item in message.items
+        )
+
+    def _condense(self, message: ChatMessageContent) -> ChatMessageContent:
+        """A copy of the message with long function results condensed, or the message itself"""
+        items = []
+        changed = False
+        for item in message.items:
+            if isinstance(item, FunctionResultContent):
+                text = str(item.result)
+                condensed = condense_result(text, self.max_result_tokens)
+                if condensed is not text:
+                    item = item.model_copy(update={"result": condensed})
+                    changed = True
+            items.append(item)
+        # Copies, the reduced messages may be shared with the chat's own history
+        return message.model_copy(update={"items": items}) if changed else message
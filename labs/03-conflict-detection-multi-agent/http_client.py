@@ -0,0 +1,350 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Deque, Dict, Iterator, Optional, TypeVar
+from urllib.parse import urlsplit
+import httpx
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# httpx connection pools are bound to the event loop they were created on,
+# so keep one pooled client per running loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+# Absolute time.monotonic() by which the current agent turn must finish
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("http_deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """The request could not complete before the deadline of the agent turn"""
+
+
+@dataclass
+class HostPolicy:
+    """Rate limit, retry and hedging settings of one upstream host"""
+    rate: float = 5.0              # requests per second
+    burst: int = 5                 # requests allowed at once after idling
+    max_retries: int = 3
+    backoff_base: float = 0.5      # seconds, doubled per attempt
+    backoff_max: float = 8.0
+    hedge_after: Optional[float] = None  # send a second request if the first takes longer (idempotent calls only)
+
+
+HOST_POLICIES: Dict[str, HostPolicy] = {
+    "www.zefix.admin.ch": HostPolicy(rate=5.0, burst=5),
+    "www.shab.ch": HostPolicy(rate=5.0, burst=5),
+    "www.finma.ch": HostPolicy(rate=2.0, burst=3),
+    "www.sesam.search.admin.ch": HostPolicy(rate=1.0, burst=1, max_retries=2),
+}
+DEFAULT_POLICY = HostPolicy()
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all event loops and threads.
+
+    Tokens are reserved immediately and the caller sleeps until its token
+    is due, so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds waited"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    retries: int = 0
+    hedges: int = 0
+    errors: int = 0
+    throttled_seconds: float = 0.0
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_stats: Dict[str, HostStats] = {}
+_state_lock = threading.Lock()
+
+
+def configure_host(host: str, **settings: Any) -> HostPolicy:
+    """Change the policy of a host, e.g. configure_host("www.zefix.admin.ch", hedge_after=1.5)"""
+    with _state_lock:
+        policy = replace(HOST_POLICIES.get(host, DEFAULT_POLICY), **settings)
+        HOST_POLICIES[host] = policy
+        _buckets.pop(host, None)
+    return policy
+
+
+def _host_state(host: str):
+    with _state_lock:
+        policy = HOST_POLICIES.get(host, DEFAULT_POLICY)
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(policy.rate, policy.burst)
+        stats = _stats.setdefault(host, HostStats())
+    return policy, bucket, stats
+
+
+def get_host_stats() -> Dict[str, Dict[str, float]]:
+    """Return request counts, retries, throttling and latency percentiles per host"""
+    def percentile(values, q):
+        return round(values[min(len(values) - 1, int(q * len(values)))], 1) if values else 0.0
+
+    result = {}
+    with _state_lock:
+        for host, stats in _stats.items():
+            latencies = sorted(stats.latencies_ms)
+            result[host] = {
+                "requests": stats.requests,
+                "retries": stats.retries,
+                "hedges": stats.hedges,
+                "errors": stats.errors,
+                "throttled_seconds": round(stats.throttled_seconds, 3),
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+            }
+    return result
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound all requests made inside the block to finish within `seconds`.
+
+    Nested deadlines can only shorten the outer one. The deadline follows
+    asyncio tasks started inside the block and calls made via run_sync.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left until the current deadline, or None without a deadline"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the shared pooled HTTP client of the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, limits=DEFAULT_LIMITS)
+            _clients[loop] = client
+    return client
+
+
+async def aclose() -> None:
+    """Close the pooled HTTP client of the running event loop"""
+    with _clients_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def request(method: str, url: str, idempotent: Optional[bool] = None, **kwargs: Any) -> httpx.Response:
+    """
+    Send a request through the per-host policy.
+
+    Every attempt waits for a token of the host's rate limit. Idempotent
+    calls are retried with exponential backoff and jitter on transport
+    errors and 429/502/503/504 responses (honouring Retry-After), and are
+    hedged when the host policy sets hedge_after. All waiting is bounded
+    by the deadline set with request_deadline().
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        idempotent: Whether the call may be repeated, defaults to True for GET/HEAD/OPTIONS/PUT/DELETE
+        **kwargs: Passed on to httpx.AsyncClient.request
+
+    Returns:
+        The final response; a retryable error status is returned once retries are exhausted
+
+    Raises:
+        httpx.HTTPError: On transport errors, or DeadlineExceeded when the deadline passes
+    """
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    host = urlsplit(url).hostname or ""
+    policy, bucket, stats = _host_state(host)
+    max_attempts = policy.max_retries + 1 if idempotent else 1
+
+    for attempt in range(max_attempts):
+        _check_deadline(url)
+        waited = await _bounded(bucket.acquire(), url)
+        with _state_lock:
+            stats.requests += 1
+            stats.throttled_seconds += waited
+            if attempt:
+                stats.retries += 1
+
+        start = time.perf_counter()
+        try:
+            if idempotent and policy.hedge_after is not None:
+                response = await _bounded(_hedged_send(method, url, policy, bucket, stats, kwargs), url)
+            else:
+                response = await _bounded(get_async_client().request(method, url, **kwargs), url)
+        except DeadlineExceeded:
+            with _state_lock:
+                stats.errors += 1
+            raise
+        except httpx.TransportError:
+            with _state_lock:
+                stats.errors += 1
+            if attempt + 1 >= max_attempts:
+                raise
+            await _bounded(asyncio.sleep(_backoff(policy, attempt)), url)
+            continue
+
+        with _state_lock:
+            stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+        if response.status_code not in RETRY_STATUSES or attempt + 1 >= max_attempts:
+            return response
+
+        with _state_lock:
+            stats.errors += 1
+        await response.aclose()
+        await _bounded(asyncio.sleep(_retry_after(response) or _backoff(policy, attempt)), url)
+    raise AssertionError("unreachable")
+
+
+async def _hedged_send(method: str, url: str, policy: HostPolicy, bucket: TokenBucket, stats: HostStats,
+                       kwargs: Dict[str, Any]) -> httpx.Response:
+    """Send a request and, if it is slow, a second one; return whichever succeeds first"""
+    client = get_async_client()
+    first = asyncio.ensure_future(client.request(method, url, **kwargs))
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=policy.hedge_after)
+        # A hedge must not exceed the host's rate limit either
+        if done or not bucket.try_acquire():
+            return await first
+
+        with _state_lock:
+            stats.hedges += 1
+        pending.add(asyncio.ensure_future(client.request(method, url, **kwargs)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        # Both failed, report the first request's error
+        return first.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _bounded(awaitable: Awaitable[T], url: str) -> T:
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(remaining, 0.0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"Deadline exceeded while requesting {url}")
+
+
+def _check_deadline(url: str) -> None:
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before requesting {url}")
+
+
+def _backoff(policy: HostPolicy, attempt: int) -> float:
+    # Full jitter keeps retries of concurrent agents from arriving together
+    return random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** attempt))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="http-client-sync", daemon=True).start()
+    return _sync_loop
+
+
+async def _with_deadline(coro: Awaitable[T], deadline: Optional[float]) -> T:
+    _deadline.set(deadline)
+    return await coro
+
+
+def submit(coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+    """Start a coroutine on the background event loop without waiting for it"""
+    # Tasks on the background loop do not inherit the caller's context, so pass the deadline along
+    return asyncio.run_coroutine_threadsafe(_with_deadline(coro, _deadline.get()), _get_sync_loop())
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    The coroutine runs on a dedicated background event loop, so this also
+    works when called from inside another running loop (e.g. a notebook).
+    """
+    return submit(coro).result()
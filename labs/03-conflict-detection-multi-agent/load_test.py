@@ -0,0 +1,301 @@
+"""
+Load test of the multi-agent onboarding flow without Azure OpenAI or the public registries.
+
+Runs concurrent onboarding conversations through the real group chat, strategies
+and plugins, with LocalChatCompletion in place of the model and canned registry
+responses with simulated latency, then reports throughput and latency per stage.
+
+    python load_test.py --conversations 500 --concurrency 200 --time-scale 0.1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from agents import create_agents, create_group_chat, create_kernel
+from due_diligence_plugin import DueDiligencePlugin
+from local_chat_completion import DEFAULT_LATENCIES, LatencyDistribution, LocalChatCompletion
+from output_format import OutputFormat
+import plugin_logger
+from plugin_logger import get_plugin_stats, reset_plugin_stats
+from seco_api import SecoClient
+from zefix_index import format_uid
+
+# Simulated latency of the public registries, in seconds
+REGISTRY_LATENCIES = {
+    "zefix": LatencyDistribution(median_s=0.25, p99_s=1.2),
+    "shab": LatencyDistribution(median_s=0.35, p99_s=1.5),
+    "finma": LatencyDistribution(median_s=0.5, p99_s=2.5),
+}
+
+_SYLLABLES = ("ba", "chi", "dor", "el", "fen", "gal", "hu", "ir", "jo", "kan", "lis", "mo",
+              "nor", "ol", "pra", "qui", "ro", "sel", "tur", "ul", "ven", "wal", "xa", "zer")
+
+@dataclass
+class Customer:
+    """One onboarding request and what the mocked registries know about it"""
+    name: str
+    is_company: bool
+    registered: bool = True
+    sanctioned: bool = False
+    uid: Optional[str] = None
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(syllables)).capitalize()
+
+def _uid(rng: random.Random) -> str:
+    """A random UID with a valid check digit"""
+    while True:
+        digits = [rng.randrange(10) for _ in range(8)]
+        check = 11 - sum(d * w for d, w in zip(digits, (5, 4, 3, 2, 7, 6, 5, 4))) % 11
+        if check != 10:
+            return format_uid("CHE" + "".join(map(str, digits)) + str(check % 11))
+
+def generate_customers(count: int, seed: int, company_share: float = 0.6,
+                       unregistered_share: float = 0.1, sanctioned_share: float = 0.1) -> List[Customer]:
+    """Unique customers with a fixed share of unregistered companies and sanctions hits"""
+    rng = random.Random(seed)
+    customers, names = [], set()
+    while len(customers) < count:
+        is_company = rng.random() < company_share
+        name = f"{_word(rng, 3)} {rng.choice(('AG', 'GmbH', 'SA'))}" if is_company else f"{_word(rng, 2)} {_word(rng, 3)}"
+        if name in names:
+            continue
+        names.add(name)
+        registered = not is_company or rng.random() >= unregistered_share
+        customers.append(Customer(
+            name=name,
+            is_company=is_company,
+            registered=registered,
+            sanctioned=rng.random() < sanctioned_share,
+            uid=_uid(rng) if is_company and registered else None
+        ))
+    return customers
+
+class MockRegistryCache:
+    """
+    Stand-in for ResponseCache answering Zefix, SHAB and FINMA requests with
+    canned JSON for the known customers after a simulated latency.
+
+    The clients parse the responses as they would real ones. Latencies are
+    seeded per request (source, searched name and how often it was asked
+    for), so they do not depend on how the conversations are scheduled.
+    """
+
+    def __init__(self, customers: List[Customer], latencies: Dict[str, LatencyDistribution], seed: int = 0):
+        self._customers = {customer.name: customer for customer in customers}
+        self._latencies = latencies
+        self._seed = seed
+        self._lock = threading.Lock()
+        self._requests: Dict[tuple, int] = {}
+        self.timings: Dict[str, List[float]] = {}
+
+    async def fetch_json(self, source: str, method: str, url: str,
+                         params: Optional[Dict[str, Any]] = None,
+                         json: Optional[Dict[str, Any]] = None,
+                         data: Optional[Dict[str, Any]] = None) -> Any:
+        searched = (json or {}).get("name") or (params or {}).get("keyword") or (data or {}).get("query") or ""
+        with self._lock:
+            count = self._requests[source, searched] = self._requests.get((source, searched), 0) + 1
+        delay = self._latencies[source].sample(random.Random(f"{self._seed}:{source}:{searched}:{count}"))
+        with self._lock:
+            self.timings.setdefault(source, []).append(delay)
+        await asyncio.sleep(delay)
+        if source == "zefix":
+            return self._zefix(json["name"], json["maxEntries"])
+        if source == "shab":
+            return self._shab(params["keyword"], params["pageRequest.size"])
+        if source == "finma":
+            return self._finma(data["query"])
+        raise Exception(f"Failed to mock registry request: unknown source {source}")
+
+    def _zefix(self, name: str, max_entries: int) -> Dict[str, Any]:
+        customer = self._customers.get(name)
+        companies = []
+        if customer is not None and customer.is_company and customer.registered:
+            companies.append({
+                "name": customer.name, "ehraid": zlib.crc32(customer.name.encode()) % 10**6, "uid": customer.uid.replace("-", "").replace(".", ""),
+                "uidFormatted": customer.uid, "chid": None, "chidFormatted": None, "legalSeatId": 261,
+                "legalSeat": "Zürich", "registerOfficeId": 20, "legalFormId": 3, "status": "ACTIVE",
+                "rabId": 0, "shabDate": "2020-01-15", "deleteDate": None, "cantonalExcerptWeb": None,
+            })
+        return {"list": companies, "offset": 0, "maxEntries": max_entries, "hasMoreResults": False, "maxOffset": 0}
+
+    def _shab(self, keyword: str, size: int) -> Dict[str, Any]:
+        customer = self._customers.get(keyword)
+        content = []
+        if customer is not None and customer.registered:
+            content.append({"meta": {
+                "id": f"HR01-{zlib.crc32(keyword.encode())}", "rubric": "HR", "subRubric": "HR01",
+                "publicationDate": "2020-01-15T00:00:00Z", "title": {"en": f"New entry {keyword}"},
+            }})
+        return {"content": content, "total": len(content), "pageRequest": {"sortOrders": [], "page": 0, "size": size}}
+
+    def _finma(self, query: str) -> Dict[str, Any]:
+        return {"Items": [], "Count": 0, "Searchstring": query, "Facets": [], "NextPageLink": None,
+                "LastPageLink": None, "ResultsPerPage": 10, "Skip": 0, "MaxResultCount": 0,
+                "Bankruptcy": {"Finishedcount": 0, "Pendingcount": 0}}
+
+class MockSecoClient(SecoClient):
+    """SecoClient over a given sanctions list instead of the downloaded Excel export"""
+
+    def __init__(self, names: List[str]):
+        super().__init__()
+        self._sanctions_list = list(names)
+
+    def _load_sanctions(self) -> List[str]:
+        return self._sanctions_list
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    if not values:
+        return {"calls": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "calls": len(values),
+        "p50_ms": values[len(values) // 2] * 1000,
+        "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))] * 1000,
+        "max_ms": values[-1] * 1000,
+    }
+
+async def run_conversation(kernel, customer: Customer) -> Dict[str, Any]:
+    """Onboard one customer with a group chat of its own, as one chat UI session would"""
+    chat = create_group_chat(kernel, create_agents(kernel))
+    chat.termination_strategy.begin_conversation()
+    started = time.monotonic()
+    kind = "company" if customer.is_company else "individual"
+    await chat.add_chat_message(ChatMessageContent(role=AuthorRole.USER, content=f"New customer: {customer.name} ({kind})"))
+    error = None
+    try:
+        async for _ in chat.invoke():
+            pass
+    except Exception as e:
+        error = str(e)
+    stats = chat.termination_strategy.get_stats()["recent"]
+    return {
+        "duration_s": time.monotonic() - started,
+        "terminated_by": stats[-1]["terminated_by"] if stats else None,
+        "turns": stats[-1]["turns"] if stats else 0,
+        "fast_path_hits": chat.selection_strategy.fast_path_hits,
+        "fallbacks": chat.selection_strategy.fallbacks,
+        "error": error,
+    }
+
+async def run_load_test(conversations: int, concurrency: int, seed: int = 0, time_scale: float = 1.0,
+                        sanctions_list_size: int = 2000) -> Dict[str, Any]:
+    """
+    Run onboarding conversations concurrently and collect per-stage latencies
+
+    Args:
+        conversations: Number of onboarding conversations
+        concurrency: Conversations in flight at once
+        seed: Seed of the customers, model turns and latencies
+        time_scale: Factor applied to all simulated latencies, e.g. 0.1 for a quick run
+        sanctions_list_size: Names on the mocked sanctions list, the fuzzy search scales with it
+
+    Returns:
+        Throughput, outcomes and latency percentiles per stage
+    """
+    def scaled(latencies: Dict[str, LatencyDistribution]) -> Dict[str, LatencyDistribution]:
+        return {key: LatencyDistribution(d.median_s * time_scale, d.p99_s * time_scale) for key, d in latencies.items()}
+
+    customers = generate_customers(conversations, seed)
+    rng = random.Random(seed + 1)
+    sanctions = [c.name for c in customers if c.sanctioned]
+    sanctions += [f"{_word(rng, 2)} {_word(rng, 4)}" for _ in range(max(0, sanctions_list_size - len(sanctions)))]
+
+    service = LocalChatCompletion(seed=seed, latencies=scaled(DEFAULT_LATENCIES))
+    registry = MockRegistryCache(customers, scaled(REGISTRY_LATENCIES), seed=seed + 2)
+    kernel = create_kernel(output_format=OutputFormat.COMPACT, max_tokens=400, chat_service=service)
+    # Replaces the plugin create_kernel registered, with mocked registries and sanctions list
+    kernel.add_plugin(DueDiligencePlugin(cache=registry, seco=MockSecoClient(sanctions), output_format=OutputFormat.COMPACT,
+                                         max_tokens=400), plugin_name="due_diligence")
+    reset_plugin_stats()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(customer: Customer) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_conversation(kernel, customer)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(bounded(customer) for customer in customers))
+    elapsed = time.monotonic() - started
+
+    outcomes: Dict[str, int] = {}
+    for result in results:
+        key = "error" if result["error"] else (result["terminated_by"] or "open")
+        outcomes[key] = outcomes.get(key, 0) + 1
+    hits = sum(r["fast_path_hits"] for r in results)
+    fallbacks = sum(r["fallbacks"] for r in results)
+
+    stages = {"conversation": _percentiles([r["duration_s"] for r in results])}
+    stages.update({f"model.{key}": stats for key, stats in sorted(service.get_stats().items())})
+    stages.update({f"registry.{key}": _percentiles(values) for key, values in sorted(registry.timings.items())})
+    # Plugin percentiles are the histogram estimates of plugin_logger
+    stages.update({
+        f"plugin.{key}": {"calls": stats["calls"], "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"], "max_ms": stats["max_ms"]}
+        for key, stats in get_plugin_stats().items()
+    })
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "conversations": conversations,
+        "concurrency": concurrency,
+        "time_scale": time_scale,
+        "elapsed_s": elapsed,
+        "throughput_per_s": conversations / elapsed if elapsed else 0.0,
+        "mean_turns": sum(r["turns"] for r in results) / len(results) if results else 0.0,
+        "outcomes": outcomes,
+        "fast_path_hit_rate": hits / (hits + fallbacks) if hits + fallbacks else 0.0,
+        "errors": [r["error"] for r in results if r["error"]][:5],
+        "stages": stages,
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render the load test report as a table per stage"""
+    lines = [
+        f"{report['conversations']} conversations, {report['concurrency']} concurrent, time scale {report['time_scale']:g}",
+        f"Elapsed: {report['elapsed_s']:.1f}s, throughput: {report['throughput_per_s']:.2f} conversations/s",
+        f"Mean turns: {report['mean_turns']:.1f}, fast path hit rate: {report['fast_path_hit_rate']:.0%}",
+        "Outcomes: " + ", ".join(f"{key}={count}" for key, count in sorted(report["outcomes"].items())),
+        "",
+        f"{'Stage':<42}{'Calls':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for stage, stats in report["stages"].items():
+        lines.append(f"{stage:<42}{stats['calls']:>8}{stats['p50_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    lines.extend(f"Error: {error}" for error in report["errors"])
+    return "\n".join(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the onboarding agents with a local chat service")
+    parser.add_argument("--conversations", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Factor applied to all simulated latencies")
+    parser.add_argument("--sanctions", type=int, default=2000, help="Names on the mocked sanctions list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep the per-conversation output of the agents")
+    parser.add_argument("--output-sample-rate", type=float,
+                        default=float(os.getenv("PLUGIN_OUTPUT_SAMPLE_RATE") or 0.25),
+                        help="Share of plugin calls whose full output is kept in the call log")
+    args = parser.parse_args()
+    plugin_logger.OUTPUT_SAMPLE_RATE = args.output_sample_rate
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        report = asyncio.run(run_load_test(args.conversations, args.concurrency, args.seed, args.time_scale, args.sanctions))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+if __name__ == "__main__":
+    main()
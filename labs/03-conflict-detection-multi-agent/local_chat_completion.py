@@ -0,0 +1,235 @@
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from openai.types import CompletionUsage
+from pydantic import Field, PrivateAttr
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import ChatHistory, ChatMessageContent, FunctionCallContent, FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from token_budget import estimate_history_tokens, estimate_message_tokens
+
+# Caller name of the selection prompt, which is not an agent
+SELECTION = "selection"
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z99 = 2.326
+
+@dataclass
+class LatencyDistribution:
+    """
+    Log-normal latency given by its median and 99th percentile in seconds.
+
+    Model latency has a long right tail; median == p99 gives a fixed latency.
+    """
+    median_s: float = 0.8
+    p99_s: float = 3.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.p99_s <= self.median_s:
+            return self.median_s
+        sigma = math.log(self.p99_s / self.median_s) / _Z99
+        return self.median_s * math.exp(rng.gauss(0.0, sigma))
+
+# Function calls are short completions, final answers longer ones
+DEFAULT_LATENCIES = {
+    "selection": LatencyDistribution(median_s=0.4, p99_s=1.5),
+    "function_call": LatencyDistribution(median_s=0.6, p99_s=2.5),
+    "answer": LatencyDistribution(median_s=1.5, p99_s=6.0),
+}
+
+@dataclass
+class ScriptedTurn:
+    """
+    One model response: a function call ("plugin-function" with arguments) or text.
+
+    For the selection prompt, `content` is the name of the next agent.
+    """
+    content: str = ""
+    function: Optional[str] = None
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def kind(self) -> str:
+        return "function_call" if self.function else "answer"
+
+# (caller, messages) -> next turn; caller is the agent name or SELECTION
+Responder = Callable[[str, List[ChatMessageContent]], ScriptedTurn]
+
+_NEW_CUSTOMER = re.compile(r"new customer:?\s*(?P<name>.+?)\s*(\((?P<type>company|individual|person)\))?\s*$", re.IGNORECASE)
+_UID = re.compile(r"CHE-\d{3}\.\d{3}\.\d{3}")
+# Authors in the history the selection prompt renders as a list of message dicts
+_RENDERED_AUTHOR = re.compile(r"['\"]name['\"]:\s*['\"](\w+)['\"]\}")
+
+def _conversation(messages: List[ChatMessageContent]) -> tuple:
+    """The latest user message and the messages after it"""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].role == AuthorRole.USER and not messages[i].name:
+            return messages[i].content or "", messages[i + 1:]
+    return "", messages
+
+def _results(messages: List[ChatMessageContent]) -> Dict[str, str]:
+    """Latest result per "plugin-function" in the messages"""
+    return {
+        f"{item.plugin_name}-{item.function_name}": str(item.result)
+        for message in messages for item in message.items if isinstance(item, FunctionResultContent)
+    }
+
+def onboarding_responder(caller: str, messages: List[ChatMessageContent]) -> ScriptedTurn:
+    """
+    Rule-generated turns of the three banking agents for "New customer: <name> (company)"
+    requests: KYC due diligence, account opening and the risk review of sanctions hits
+    """
+    request, turn = _conversation(messages)
+    match = _NEW_CUSTOMER.search(request)
+    name = match.group("name") if match else request.strip() or "unknown customer"
+    is_company = bool(match and (match.group("type") or "").lower() == "company")
+    results = _results(turn)
+    evidence = results.get("due_diligence-check_customer", "")
+    sanctioned = "SANCTIONS FOUND" in evidence or "SANCTIONS FOUND" in "\n".join(m.content or "" for m in turn)
+    not_found = is_company and "ZEFIX: no company found" in evidence
+
+    if caller == SELECTION:
+        # Only reached for hand-overs the rules leave open
+        rendered = _RENDERED_AUTHOR.findall(messages[-1].content or "") if messages else []
+        if not rendered:
+            return ScriptedTurn(content="KYC_Officer")
+        return ScriptedTurn(content="Account_Manager" if rendered[-1] == "Risk_Officer" else "Risk_Officer")
+
+    if caller == "KYC_Officer":
+        if not evidence:
+            return ScriptedTurn(function="due_diligence-check_customer", arguments={"name": name, "is_company": is_company})
+        if sanctioned:
+            return ScriptedTurn(content=f"KYC assessment for {name}: SANCTIONS FOUND on the SECO list. "
+                                        f"KYC not approved, the case needs a risk review.")
+        if not_found:
+            return ScriptedTurn(content=f"KYC assessment for {name}: no company found in the commercial registry. "
+                                        f"KYC not approved until the registration is confirmed.")
+        return ScriptedTurn(content=f"KYC assessment for {name}: registry, gazette, FINMA and sanctions checks "
+                                    f"are clear. KYC approved, please open an account.")
+
+    if caller == "Account_Manager":
+        if sanctioned or not_found:
+            reason = "the customer is on the sanctions list" if sanctioned else "the company is not registered"
+            return ScriptedTurn(content=f"Account opening declined for {name}: {reason}, no account was created.")
+        created = results.get("bank-create_account")
+        if created is None:
+            uid = _UID.search(evidence)
+            return ScriptedTurn(function="bank-create_account", arguments={
+                "owner_name": name,
+                "account_type": "company" if is_company else "individual",
+                "uid": uid.group(0) if uid and is_company else "",
+            })
+        return ScriptedTurn(content=f"Account opened for {name} after an approved KYC with clear registry and "
+                                    f"sanctions checks. {created.splitlines()[0]}")
+
+    # Risk officer
+    if sanctioned:
+        return ScriptedTurn(content=f"Risk assessment for {name}: high risk because of the sanctions hit. "
+                                    f"Decision: decline the relationship, no account is to be opened.")
+    return ScriptedTurn(content=f"Risk assessment for {name}: low risk, no adverse findings in the evidence.")
+
+def scripted_responder(script: Mapping[str, Sequence[ScriptedTurn]]) -> Responder:
+    """
+    Replay fixed turns per caller; the n-th response of a caller in a
+    conversation is script[caller][n], the last one once the script runs out
+    """
+    def respond(caller: str, messages: List[ChatMessageContent]) -> ScriptedTurn:
+        turns = script.get(caller)
+        if not turns:
+            raise Exception(f"Failed to replay turn: no script for {caller}")
+        _, turn = _conversation(messages)
+        if caller == SELECTION:
+            # The selection prompt is one message with the history rendered into it
+            index = len(_RENDERED_AUTHOR.findall(messages[-1].content or "")) if messages else 0
+        else:
+            index = sum(1 for m in turn if m.role == AuthorRole.ASSISTANT and m.name == caller)
+        return turns[min(index, len(turns) - 1)]
+    return respond
+
+class LocalChatCompletion(ChatCompletionClientBase):
+    """
+    Deterministic chat completion service for load tests without a model deployment.
+
+    Responses come from a responder, rule-generated onboarding turns by
+    default, and include function calls that the kernel invokes like those of
+    a real model. Each call waits for a latency drawn from the distribution of
+    its kind ("selection", "function_call", "answer"). Turns and latencies
+    only depend on the seed and the conversation's history, not on how
+    concurrent conversations are scheduled, so a run can be repeated.
+
+    Usage:
+        kernel = create_kernel(chat_service=LocalChatCompletion(seed=7))
+        service.get_stats()  # latency per caller and kind of call
+    """
+
+    ai_model_id: str = "local-scripted"
+    latencies: Dict[str, LatencyDistribution] = Field(default_factory=lambda: dict(DEFAULT_LATENCIES))
+    seed: int = 0
+    responder: Responder = Field(default=onboarding_responder, exclude=True)
+
+    SUPPORTS_FUNCTION_CALLING = True
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # "caller.kind" -> latencies in seconds
+    _timings: Dict[str, List[float]] = PrivateAttr(default_factory=dict)
+
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings
+    ) -> List[ChatMessageContent]:
+        messages = list(chat_history.messages)
+        # Agents send their instructions as a system message carrying their name
+        caller = next((m.name for m in messages if m.role == AuthorRole.SYSTEM and m.name), None) or SELECTION
+        turn = self.responder(caller, messages)
+        if turn.function and settings.function_choice_behavior is None:
+            raise Exception(f"Failed to replay turn: {caller} requested {turn.function} without function calling")
+
+        # Latency and call id are derived from the call's place in its conversation; the
+        # call id ends up in the history the selection prompt renders
+        request, _ = _conversation(messages)
+        key = f"{self.seed}:{caller}:{turn.kind}:{len(messages)}:{zlib.crc32(request.encode())}"
+        delay = self.latencies.get(turn.kind, DEFAULT_LATENCIES[turn.kind]).sample(random.Random(key))
+        call_id = f"call_{zlib.crc32(key.encode()):08x}"
+        with self._lock:
+            self._timings.setdefault(f"{caller}.{turn.kind}", []).append(delay)
+        await asyncio.sleep(delay)
+
+        if turn.function:
+            plugin_name, function_name = turn.function.split("-", 1)
+            response = ChatMessageContent(role=AuthorRole.ASSISTANT, items=[FunctionCallContent(
+                id=call_id,
+                plugin_name=plugin_name,
+                function_name=function_name,
+                arguments=json.dumps(turn.arguments)
+            )])
+        else:
+            response = ChatMessageContent(role=AuthorRole.ASSISTANT, content=turn.content)
+        response.ai_model_id = self.ai_model_id
+        response.metadata["usage"] = CompletionUsage(
+            prompt_tokens=estimate_history_tokens(messages),
+            completion_tokens=estimate_message_tokens(response),
+            total_tokens=0
+        )
+        return [response]
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Calls and simulated latency percentiles in ms per "caller.kind" """
+        with self._lock:
+            timings = {key: sorted(values) for key, values in self._timings.items()}
+        return {
+            key: {
+                "calls": len(values),
+                "p50_ms": values[len(values) // 2] * 1000,
+                "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))] * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+            for key, values in timings.items()
+        }
@@ -0,0 +1,73 @@
+from enum import Enum
+from typing import Any, Iterable, List, Optional, Sequence, Union
+
+from token_budget import estimate_tokens
+
+class OutputFormat(Enum):
+    TEXT = "text"        # Labelled lines with separators, easy to read in the UI
+    COMPACT = "compact"  # One header and one row per record, fewer tokens per turn
+
+def parse_output_format(value: Union[OutputFormat, str, None]) -> OutputFormat:
+    """Accept an OutputFormat or its name, e.g. "compact"; None means TEXT"""
+    if value is None:
+        return OutputFormat.TEXT
+    return value if isinstance(value, OutputFormat) else OutputFormat(str(value).lower())
+
+def _cell(value: Any) -> str:
+    # The separator must not appear inside a value
+    return "" if value is None else " ".join(str(value).split()).replace("|", "/")
+
+def compact_table(title: str, columns: Sequence[str], rows: Iterable[Sequence[Any]], notes: Iterable[str] = ()) -> str:
+    """
+    Render records as a title line, a header and one "|"-separated row per record
+
+    Args:
+        title: First line, e.g. "companies 5/12"
+        columns: Column names
+        rows: One value per column for each record
+        notes: Trailing lines, e.g. results that were not shown
+
+    Returns:
+        Compact text, e.g. "companies 1/1\\nname|uid\\nExample AG|CHE-110.088.994"
+    """
+    lines = [title, "|".join(columns)]
+    lines.extend("|".join(_cell(value) for value in row) for row in rows)
+    lines.extend(note for note in notes if note)
+    return "\n".join(lines)
+
+def compact_fields(title: str, **fields: Any) -> str:
+    """Render one record as "title: key=value; key=value", skipping empty values"""
+    return f"{title}: " + "; ".join(f"{key}={_cell(value)}" for key, value in fields.items() if value not in (None, ""))
+
+def fit_to_budget(text: str, max_tokens: Optional[int]) -> str:
+    """
+    Cut a plugin result to a token budget at line boundaries
+
+    Args:
+        text: Plugin result
+        max_tokens: Token budget, None for no limit
+
+    Returns:
+        The text itself if it fits, otherwise its first lines and a marker
+        with the number of lines left out; only the marker if the budget is
+        too small for any text
+    """
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.split("\n")
+    kept: List[str] = []
+    # Leave room for the marker
+    used = 12
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept:
+        # Not even the first line fits, keep what the budget allows of it
+        head = lines[0][:max(0, max_tokens - 12) * 4]
+        if head:
+            kept.append(head)
+    kept.append(f"[truncated: {len(lines) - len(kept)} of {len(lines)} lines omitted, narrow the query for more]")
+    return "\n".join(kept)
@@ -0,0 +1,93 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, TypeVar
+from http_client import submit
+
+P = TypeVar("P")
+T = TypeVar("T")
+
+# fetch_page(cursor) loads one page; next_cursor(page, cursor) returns the
+# cursor of the following page, or None when the page was the last one
+FetchPage = Callable[[int], Awaitable[P]]
+NextCursor = Callable[[P, int], Optional[int]]
+
+
+def iter_pages(fetch_page: FetchPage, next_cursor: NextCursor, start: int = 0) -> Iterator[P]:
+    """
+    Yield pages one by one while the next page is already being fetched.
+
+    Fetches run on the background event loop of http_client, so at most the
+    page being consumed and the one prefetched are held in memory. Closing
+    the generator early cancels the pending prefetch.
+    """
+    cursor = start
+    future = submit(fetch_page(cursor))
+    try:
+        while future is not None:
+            page = future.result()
+            cursor = next_cursor(page, cursor)
+            future = submit(fetch_page(cursor)) if cursor is not None else None
+            yield page
+    finally:
+        if future is not None:
+            future.cancel()
+
+
+async def iter_pages_async(fetch_page: FetchPage, next_cursor: NextCursor, start: int = 0) -> AsyncIterator[P]:
+    """Async variant of iter_pages, prefetching on the running event loop"""
+    cursor = start
+    task = asyncio.ensure_future(fetch_page(cursor))
+    try:
+        while task is not None:
+            page = await task
+            cursor = next_cursor(page, cursor)
+            task = asyncio.ensure_future(fetch_page(cursor)) if cursor is not None else None
+            yield page
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+def iter_items(pages: Iterator[P],
+               items_of: Callable[[P], Iterable[T]],
+               stop: Optional[Callable[[T], bool]] = None,
+               max_items: Optional[int] = None) -> Iterator[T]:
+    """
+    Flatten pages into items.
+
+    Args:
+        pages: Page iterator, closed when iteration ends early
+        items_of: Returns the items of a page
+        stop: Iteration ends after the first item for which this returns True
+        max_items: Maximum number of items to yield
+    """
+    count = 0
+    try:
+        if max_items is not None and max_items <= 0:
+            return
+        for page in pages:
+            for item in items_of(page):
+                yield item
+                count += 1
+                if (stop is not None and stop(item)) or (max_items is not None and count >= max_items):
+                    return
+    finally:
+        pages.close()
+
+
+async def iter_items_async(pages: AsyncIterator[P],
+                           items_of: Callable[[P], Iterable[T]],
+                           stop: Optional[Callable[[T], bool]] = None,
+                           max_items: Optional[int] = None) -> AsyncIterator[T]:
+    """Async variant of iter_items"""
+    count = 0
+    try:
+        if max_items is not None and max_items <= 0:
+            return
+        async for page in pages:
+            for item in items_of(page):
+                yield item
+                count += 1
+                if (stop is not None and stop(item)) or (max_items is not None and count >= max_items):
+                    return
+    finally:
+        await pages.aclose()
@@ -1,9 +1,33 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional
 from datetime import datetime
 from collections import deque
+from contextvars import ContextVar
+from itertools import islice
+import bisect
+import functools
+import inspect
+import itertools
 import json
+import os
+import random
+import threading
+import time
+
+try:
+    from opentelemetry import metrics
+except ImportError:  # OpenTelemetry is optional, the in-process stats work without it
+    metrics = None
+
+if metrics is not None:
+    _meter = metrics.get_meter(__name__)
+    _duration = _meter.create_histogram(
+        "plugin.call.duration", unit="ms", description="Duration per plugin function call")
+    _output_size = _meter.create_histogram(
+        "plugin.call.output_size", unit="By", description="Output size per plugin function call")
+    _errors = _meter.create_counter(
+        "plugin.call.errors", unit="{call}", description="Plugin function calls that failed or returned an error")
 
 class PluginType(Enum):
     FINMA = "FINMA"
@@ -11,6 +35,7 @@ class PluginType(Enum):
     ZEFIX = "ZEFIX"
     SHAB = "SHAB"
     BANK = "BANK"
+    DUE_DILIGENCE = "DUE_DILIGENCE"
 
 @dataclass
 class PluginCall:
@@ -19,21 +44,224 @@ class PluginCall:
     input_data: Dict[str, Any]
     output: str
     timestamp: str
+    duration_ms: Optional[float] = None
+    sampled: bool = True
+    seq: int = 0
+
+# Incremented on every logged call, timing record and cache event, so views
+# can skip re-rendering when nothing changed
+_activity_version = 0
+_activity_version_lock = threading.Lock()
+
+def _bump_activity_version() -> None:
+    global _activity_version
+    with _activity_version_lock:
+        _activity_version += 1
+
+def get_activity_version() -> int:
+    """Get the current version of the call log, plugin stats and cache stats"""
+    return _activity_version
 
 # Store last N plugin calls
 _call_history = deque(maxlen=50)
+_call_history_lock = threading.Lock()
+_call_seq = itertools.count(1)
+
+# Share of calls whose full output is kept; the others keep a short preview.
+# Everything is kept unless lowered, e.g. for load tests
+OUTPUT_SAMPLE_RATE = float(os.getenv("PLUGIN_OUTPUT_SAMPLE_RATE") or 1.0)
+OUTPUT_PREVIEW_CHARS = 200
+
+# Start of the plugin call running in the current task, set by timed_plugin_call
+_call_started: ContextVar[Optional[float]] = ContextVar("plugin_call_started", default=None)
 
 def log_plugin_call(plugin_type: PluginType, function_name: str, input_data: Dict[str, Any], output: str) -> None:
     """Log a plugin function call with its inputs and outputs"""
+    started = _call_started.get()
+    sampled = random.random() < OUTPUT_SAMPLE_RATE
+    if not sampled and len(output) > OUTPUT_PREVIEW_CHARS:
+        output = f"{output[:OUTPUT_PREVIEW_CHARS]}... [{len(output)} chars, not sampled]"
     call = PluginCall(
         plugin_type=plugin_type,
         function_name=function_name,
         input_data=input_data,
         output=output,
-        timestamp=datetime.now().isoformat()
+        timestamp=datetime.now().isoformat(),
+        duration_ms=(time.perf_counter() - started) * 1000 if started is not None else None,
+        sampled=sampled,
+        seq=next(_call_seq)
     )
-    _call_history.append(call)
+    with _call_history_lock:
+        _call_history.append(call)
+    _bump_activity_version()
 
 def get_last_calls(limit: int = 10) -> List[PluginCall]:
     """Get the most recent plugin calls"""
-    return list(reversed(list(_call_history)))[:limit]
+    with _call_history_lock:
+        return list(islice(reversed(_call_history), limit))
+
+# Upper bounds of the latency histogram buckets in milliseconds, plus one overflow bucket
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+@dataclass
+class FunctionStats:
+    """Aggregated timing and payload sizes of one plugin function"""
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    max_output_bytes: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def percentile(self, q: float) -> float:
+        """Estimate a latency percentile (0-1) as the upper bound of its histogram bucket"""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(float(LATENCY_BUCKETS_MS[i]), self.max_ms) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+# (plugin, function) -> stats
+_function_stats: Dict[tuple, FunctionStats] = {}
+_function_stats_lock = threading.Lock()
+
+def _payload_size(kwargs: Dict[str, Any]) -> int:
+    return sum(len(str(value)) for key, value in kwargs.items() if key not in ("kernel", "arguments"))
+
+def _record_call(plugin_type: PluginType, function_name: str, attributes: Dict[str, str],
+                 started: float, kwargs: Dict[str, Any], result: Any, failed: bool) -> None:
+    duration_ms = (time.perf_counter() - started) * 1000
+    output_bytes = len(str(result).encode("utf-8")) if result is not None else 0
+    # Plugins report most failures as an "Error..." result instead of raising
+    failed = failed or (isinstance(result, str) and result.startswith("Error"))
+    with _function_stats_lock:
+        stats = _function_stats.get((plugin_type, function_name))
+        if stats is None:
+            stats = _function_stats[(plugin_type, function_name)] = FunctionStats()
+        stats.calls += 1
+        stats.errors += failed
+        stats.total_ms += duration_ms
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        stats.input_bytes += _payload_size(kwargs)
+        stats.output_bytes += output_bytes
+        stats.max_output_bytes = max(stats.max_output_bytes, output_bytes)
+        stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+    if metrics is not None:
+        _duration.record(duration_ms, attributes)
+        _output_size.record(output_bytes, attributes)
+        if failed:
+            _errors.add(1, attributes)
+    _bump_activity_version()
+
+def timed_plugin_call(plugin_type: PluginType, function_name: Optional[str] = None) -> Callable:
+    """
+    Time every call of a plugin function and record it in the plugin stats.
+
+    Goes beneath @kernel_function so the kernel still sees the original
+    signature. Works for sync and async functions.
+
+    Usage:
+        @kernel_function(name="search_companies")
+        @timed_plugin_call(PluginType.ZEFIX)
+        async def search_companies(self, name: str) -> str: ...
+    """
+    def decorator(func: Callable) -> Callable:
+        name = function_name or func.__name__
+        attributes = {"plugin": plugin_type.value, "function": name}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                token = _call_started.set(started)
+                result, failed = None, True
+                try:
+                    result = await func(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    _call_started.reset(token)
+                    _record_call(plugin_type, name, attributes, started, kwargs, result, failed)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            token = _call_started.set(started)
+            result, failed = None, True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _call_started.reset(token)
+                _record_call(plugin_type, name, attributes, started, kwargs, result, failed)
+        return wrapper
+    return decorator
+
+def get_plugin_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get latency, error and payload statistics per plugin function
+
+    Returns:
+        Stats keyed by "PLUGIN.function", the functions with the most total time first
+    """
+    with _function_stats_lock:
+        items = [(key, FunctionStats(**{**vars(stats), "buckets": list(stats.buckets)}))
+                 for key, stats in _function_stats.items()]
+    items.sort(key=lambda item: item[1].total_ms, reverse=True)
+    result = {}
+    for (plugin_type, function_name), stats in items:
+        result[f"{plugin_type.value}.{function_name}"] = {
+            "calls": stats.calls,
+            "errors": stats.errors,
+            "error_rate": stats.errors / stats.calls,
+            "total_ms": stats.total_ms,
+            "mean_ms": stats.total_ms / stats.calls,
+            "p50_ms": stats.percentile(0.50),
+            "p95_ms": stats.percentile(0.95),
+            "p99_ms": stats.percentile(0.99),
+            "max_ms": stats.max_ms,
+            "mean_input_bytes": stats.input_bytes / stats.calls,
+            "mean_output_bytes": stats.output_bytes / stats.calls,
+            "max_output_bytes": stats.max_output_bytes,
+            "histogram": {
+                (f"<={bound}" if i < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}"): count
+                for i, (bound, count) in enumerate(zip(LATENCY_BUCKETS_MS + (None,), stats.buckets))
+            },
+        }
+    return result
+
+def reset_plugin_stats() -> None:
+    """Clear the plugin statistics, e.g. between load test runs"""
+    with _function_stats_lock:
+        _function_stats.clear()
+    _bump_activity_version()
+
+# Response cache events per upstream source, e.g. {"zefix": {"hit": 3, "miss": 1}}
+_cache_events: Dict[str, Dict[str, int]] = {}
+_cache_events_lock = threading.Lock()
+
+def record_cache_event(source: str, event: str) -> None:
+    """Count a response cache event ("hit", "miss" or "revalidated") for a source"""
+    with _cache_events_lock:
+        events = _cache_events.setdefault(source, {"hit": 0, "miss": 0, "revalidated": 0})
+        events[event] = events.get(event, 0) + 1
+    _bump_activity_version()
+
+def get_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Get response cache counts and hit ratio per source"""
+    stats = {}
+    with _cache_events_lock:
+        for source, events in _cache_events.items():
+            total = sum(events.values())
+            # A revalidated entry saved the response body, count it as a hit
+            hits = events.get("hit", 0) + events.get("revalidated", 0)
+            stats[source] = {**events, "hit_ratio": hits / total if total else 0.0}
+    return stats
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from json import dumps as json_dumps, loads as json_loads
+from typing import Any, Callable, Dict, Optional
+from http_client import request
+from plugin_logger import record_cache_event
+
+@dataclass
+class CachedResponse:
+    text: str
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+def _normalize(value: Any) -> Any:
+    """Normalize request parameters so equivalent searches share a cache key"""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+class ResponseCache:
+    """
+    JSON response cache for the registry API clients: an in-memory LRU in
+    front of an optional on-disk tier.
+
+    Entries younger than the source's TTL are served without a request.
+    Older entries are revalidated with If-None-Match / If-Modified-Since
+    when the upstream sent an ETag or Last-Modified header.
+
+    The disk tier is off unless a directory is given; its directory is
+    created on the first write.
+
+    Usage:
+        cache = ResponseCache(disk_dir=Path.home() / ".cache" / "registry-responses")
+        data = await cache.fetch_json("zefix", "POST", url, json=payload)
+    """
+
+    DEFAULT_TTLS = {
+        "zefix": 6 * 3600,
+        "shab": 3600,
+        "finma": 24 * 3600,
+    }
+    # Disk entries older than this are dropped instead of revalidated
+    MAX_STALE = 7 * 24 * 3600
+
+    def __init__(self,
+                 ttls: Optional[Dict[str, float]] = None,
+                 max_entries: int = 512,
+                 disk_dir: Optional[Path] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            ttls: Seconds a response stays fresh, per source
+            max_entries: Maximum number of responses kept in memory
+            disk_dir: Directory of the on-disk tier, disabled if None
+            clock: Time source (seconds since the epoch)
+        """
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._clock = clock
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(source: str, method: str, url: str, **request: Any) -> str:
+        """Cache key of a request, independent of parameter order, case and whitespace"""
+        normalized = json_dumps({
+            "source": source,
+            "method": method.upper(),
+            "url": url,
+            "request": _normalize({k: v for k, v in request.items() if v is not None}),
+        }, sort_keys=True, default=str)
+        return f"{source}-{hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:40]}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for a key, fresh or stale"""
+        entry = self._recall(key)
+        if entry is None:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        """Store a response in memory and on disk"""
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    async def aget(self, key: str) -> Optional[CachedResponse]:
+        """Like get, with the disk tier read in a worker thread instead of on the event loop"""
+        entry = self._recall(key)
+        if entry is None and self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def aput(self, key: str, entry: CachedResponse) -> None:
+        """Like put, with the disk tier written in a worker thread instead of on the event loop"""
+        self._remember(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    def clear(self) -> None:
+        """Drop all cached responses, including the disk tier"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def is_fresh(self, source: str, entry: CachedResponse) -> bool:
+        return self._clock() - entry.stored_at < self.ttls.get(source, 0)
+
+    async def fetch_json(self,
+                         source: str,
+                         method: str,
+                         url: str,
+                         params: Optional[Dict[str, Any]] = None,
+                         json: Optional[Dict[str, Any]] = None,
+                         data: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Return the parsed JSON response of a request, from the cache when possible.
+
+        Args:
+            source: Upstream name used for the TTL and statistics, e.g. "zefix"
+            method: HTTP method
+            url: Request URL
+            params: Query parameters
+            json: JSON body
+            data: Form body
+
+        Returns:
+            Parsed JSON (a fresh copy on every call, callers may modify it)
+
+        Raises:
+            httpx.HTTPError: If a request is needed and fails; stale entries are not served instead
+        """
+        key = self.make_key(source, method, url, params=params, json=json, data=data)
+        entry = await self.aget(key)
+        if entry is not None and self.is_fresh(source, entry):
+            record_cache_event(source, "hit")
+            return json_loads(entry.text)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        # Registry searches are read-only, so their POSTs may be retried and hedged too
+        response = await request(
+            method, url, idempotent=True, params=params, json=json, data=data, headers=headers
+        )
+        if response.status_code == 304 and entry is not None:
+            entry = CachedResponse(entry.text, self._clock(), entry.etag, entry.last_modified)
+            await self.aput(key, entry)
+            record_cache_event(source, "revalidated")
+            return json_loads(entry.text)
+
+        response.raise_for_status()
+        record_cache_event(source, "miss")
+        if self.ttls.get(source, 0) > 0:
+            await self.aput(key, CachedResponse(
+                text=response.text,
+                stored_at=self._clock(),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            ))
+        return response.json()
+
+    def _recall(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[CachedResponse]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            entry = CachedResponse(**json_loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        if self._clock() - entry.stored_at > self.MAX_STALE:
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: CachedResponse) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json_dumps(asdict(entry)), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to write response cache entry: {e}")
+
+# Shared by the Zefix, SHAB and FINMA clients unless they are given their own cache;
+# responses are only kept on disk when REGISTRY_CACHE_DIR is set
+default_cache = ResponseCache(disk_dir=os.getenv("REGISTRY_CACHE_DIR") or None)
@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 from typing import List, Optional, Set
 import pandas as pd
-import requests
+import httpx
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
 from thefuzz import fuzz
+from http_client import request, run_sync
 
 @dataclass
 class SanctionedEntity:
@@ -19,6 +20,8 @@ class SecoClient:
     EXCEL_URL = "https://www.sesam.search.admin.ch/sesam-search-web/pages/search.xhtml"
     CACHE_DIR = Path.home() / ".cache" / "seco"
     CACHE_DURATION = timedelta(hours=24)
+    # The Excel export is several MB, allow more time than for registry searches
+    DOWNLOAD_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
     
     def __init__(self):
         """Initialize SECO client with cache directory"""
@@ -47,14 +50,14 @@ class SecoClient:
         
         # Download new file
         try:
-            response = requests.get(self.EXCEL_URL, params=params)
+            response = run_sync(request("GET", self.EXCEL_URL, params=params, timeout=self.DOWNLOAD_TIMEOUT))
             response.raise_for_status()
             
             with open(cache_file, "wb") as f:
                 f.write(response.content)
                 
             return cache_file
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Failed to download sanctions list: {e}")
             backup_file = Path(".excel.xlsx")
             if backup_file.exists():
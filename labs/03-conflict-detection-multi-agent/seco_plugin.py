@@ -1,7 +1,9 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, Optional, Union
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 from seco_api import SecoClient
-from plugin_logger import log_plugin_call, PluginType
+from output_format import OutputFormat, fit_to_budget, parse_output_format
+from plugin_logger import log_plugin_call, timed_plugin_call, PluginType
 
 class SecoPlugin:
     """
@@ -11,19 +13,31 @@ class SecoPlugin:
         kernel.add_plugin(SecoPlugin(), plugin_name="seco")
     """
     
-    def __init__(self):
+    def __init__(self,
+                 output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                 max_tokens: Optional[int] = None):
         self._client = SecoClient()
+        self._format = parse_output_format(output_format)
+        self._max_tokens = max_tokens
     
     @kernel_function(
         description="Check if a person or entity is on the sanctions list",
         name="check_sanctions"
     )
-    def check_sanctions(
+    @timed_plugin_call(PluginType.SECO)
+    async def check_sanctions(
         self,
         name: Annotated[str, "Name to check against sanctions list"]
     ) -> Annotated[str, "Sanctions check results or error message"]:
-        matches = self._client.search(name)
-        result = "No sanctions found" if not matches else "SANCTIONS FOUND:\n" + "\n".join([f"- {m}" for m in matches])
+        # Fuzzy matching over the sanctions list is CPU bound, keep it off the event loop
+        matches = await asyncio.to_thread(self._client.search, name)
+        if not matches:
+            result = "No sanctions found"
+        elif self._format == OutputFormat.COMPACT:
+            result = "SANCTIONS FOUND: " + "; ".join(matches)
+        else:
+            result = "SANCTIONS FOUND:\n" + "\n".join([f"- {m}" for m in matches])
+        result = fit_to_budget(result, self._max_tokens)
         
         log_plugin_call(
             PluginType.SECO,
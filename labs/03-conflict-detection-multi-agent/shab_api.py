@@ -1,8 +1,11 @@
-from dataclasses import dataclass, field
+from dataclasses import MISSING, dataclass, field, fields
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-import requests
+from typing import List, Optional, Dict, Any, AsyncIterator, Callable, Iterator
+import httpx
 from enum import Enum
+from http_client import run_sync
+from pagination import iter_items, iter_items_async, iter_pages, iter_pages_async
+from response_cache import ResponseCache, default_cache
 
 class PublicationState(Enum):
     PUBLISHED = "PUBLISHED"
@@ -81,8 +84,102 @@ class SearchResponse:
     total: int
     pageRequest: PageRequest
 
+# Field filters computed once instead of per publication
+_META_FIELDS = {f.name: f for f in fields(PublicationMeta)}
+_META_FIELD_NAMES = frozenset(_META_FIELDS)
+_PUBLICATION_FIELDS = {f.name: f for f in fields(Publication)}
+_REGISTRATION_OFFICE_FIELDS = frozenset(f.name for f in fields(RegistrationOffice))
+_MUNICIPALITY_FIELDS = frozenset(f.name for f in fields(Municipality))
+_DATE_FIELDS = frozenset({"creationDate", "updateDate", "publicationDate", "expirationDate"})
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def _default(dataclass_field) -> Any:
+    if dataclass_field.default is not MISSING:
+        return dataclass_field.default
+    if dataclass_field.default_factory is not MISSING:
+        return dataclass_field.default_factory()
+    return None
+
+class LazyPublicationMeta:
+    """
+    Read-only PublicationMeta view over the raw JSON.
+
+    Dates, the registration office and municipalities are decoded on first
+    access and then cached, so fields that are never read cost nothing.
+    """
+    __slots__ = ("_raw", "_decoded")
+
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+        self._decoded: Optional[Dict[str, Any]] = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not slots, i.e. PublicationMeta fields
+        if name not in _META_FIELD_NAMES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        decoded = self._decoded
+        if decoded is None:
+            decoded = self._decoded = {}
+        elif name in decoded:
+            return decoded[name]
+
+        value = self._raw.get(name)
+        if value is None:
+            value = _default(_META_FIELDS[name])
+        elif name in _DATE_FIELDS:
+            value = _parse_datetime(value)
+        elif name == "registrationOffice":
+            value = RegistrationOffice(**{k: v for k, v in value.items() if k in _REGISTRATION_OFFICE_FIELDS})
+        elif name == "municipalities":
+            value = [Municipality(**{k: v for k, v in m.items() if k in _MUNICIPALITY_FIELDS}) for m in value]
+        decoded[name] = value
+        return value
+
+    def to_meta(self) -> PublicationMeta:
+        """Decode all fields into a regular PublicationMeta"""
+        return PublicationMeta(**{name: getattr(self, name) for name in _META_FIELDS})
+
+class LazyPublication:
+    """Read-only Publication view over the raw JSON, see LazyPublicationMeta"""
+    __slots__ = ("_raw", "_meta")
+
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+        self._meta: Optional[LazyPublicationMeta] = None
+
+    @property
+    def meta(self) -> LazyPublicationMeta:
+        if self._meta is None:
+            self._meta = LazyPublicationMeta(self._raw["meta"])
+        return self._meta
+
+    @property
+    def privateMeta(self) -> None:
+        # Not part of search results, same as the eager decoder
+        return None
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _PUBLICATION_FIELDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        value = self._raw.get(name)
+        return _default(_PUBLICATION_FIELDS[name]) if value is None else value
+
+    def to_publication(self) -> Publication:
+        """Decode all fields into a regular Publication"""
+        return Publication(
+            meta=self.meta.to_meta(),
+            privateMeta=None,
+            content=self._raw.get("content"),
+            commented=self._raw.get("commented", False)
+        )
+
 class ShabClient:
     BASE_URL = "https://www.shab.ch/api/v1"
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        self._cache = cache if cache is not None else default_cache
     
     def search(self,
               keyword: str,
@@ -90,7 +187,19 @@ class ShabClient:
               page_size: int = 100,
               include_content: bool = False,
               publication_states: List[PublicationState] = None,
-              rubrics: List[str] = None) -> SearchResponse:
+              rubrics: List[str] = None,
+              lazy: bool = False) -> SearchResponse:
+        """Synchronous wrapper around search_async"""
+        return run_sync(self.search_async(keyword, page, page_size, include_content, publication_states, rubrics, lazy))
+
+    async def search_async(self,
+                           keyword: str,
+                           page: int = 0,
+                           page_size: int = 100,
+                           include_content: bool = False,
+                           publication_states: List[PublicationState] = None,
+                           rubrics: List[str] = None,
+                           lazy: bool = False) -> SearchResponse:
         """
         Search publications in SHAB
         
@@ -101,6 +210,7 @@ class ShabClient:
             include_content: Whether to include full content
             publication_states: List of publication states to include
             rubrics: List of rubrics to search in
+            lazy: Return LazyPublication views that decode fields on first access
             
         Returns:
             SearchResponse containing results
@@ -123,50 +233,114 @@ class ShabClient:
         }
         
         try:
-            response = requests.get(f"{self.BASE_URL}/publications", params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Convert string dates to datetime
-            publications = []
-            for pub_data in data["content"]:
-                # Convert dates in meta
-                meta = pub_data["meta"]
-                meta["creationDate"] = datetime.fromisoformat(meta["creationDate"].replace("Z", "+00:00"))
-                meta["updateDate"] = datetime.fromisoformat(meta["updateDate"].replace("Z", "+00:00"))
-                meta["publicationDate"] = datetime.fromisoformat(meta["publicationDate"].replace("Z", "+00:00"))
-                if meta.get("expirationDate"):
-                    meta["expirationDate"] = datetime.fromisoformat(meta["expirationDate"].replace("Z", "+00:00"))
-                
-                # Create registration office object
-                meta["registrationOffice"] = RegistrationOffice(**meta["registrationOffice"])
-                
-                # Clean metadata - remove any fields not in PublicationMeta
-                valid_fields = PublicationMeta.__annotations__.keys()
-                meta = {k: v for k, v in meta.items() if k in valid_fields}
-                
-                # Create PublicationMeta first
-                pub_meta = PublicationMeta(**meta)
-                
-                # Create Publication with proper structure
-                publication = Publication(
-                    meta=pub_meta,
-                    privateMeta=None,
-                    content=pub_data.get("content"),
-                    commented=pub_data.get("commented", False)
-                )
-                publications.append(publication)
-                
+            data = await self._cache.fetch_json("shab", "GET", f"{self.BASE_URL}/publications", params=params)
+            return self._parse_search_response(data, lazy)
+            
+        except httpx.HTTPError as e:
+            raise Exception(f"Failed to search SHAB API: {str(e)}")
+
+    def iter_publications(self,
+                          keyword: str,
+                          page_size: int = 100,
+                          include_content: bool = False,
+                          publication_states: List[PublicationState] = None,
+                          rubrics: List[str] = None,
+                          stop: Optional[Callable[[Publication], bool]] = None,
+                          max_items: Optional[int] = None,
+                          lazy: bool = False) -> Iterator[Publication]:
+        """
+        Iterate over all matching publications, fetching the next page in the background
+        
+        Args:
+            keyword: Search keyword
+            page_size: Number of results per request
+            include_content: Whether to include full content
+            publication_states: List of publication states to include
+            rubrics: List of rubrics to search in
+            stop: Stop after the first publication for which this returns True
+            max_items: Maximum number of publications to return
+            lazy: Return LazyPublication views that decode fields on first access
+            
+        Returns:
+            Iterator of Publication
+        """
+        pages = iter_pages(
+            lambda page: self.search_async(keyword, page, page_size, include_content, publication_states, rubrics, lazy),
+            lambda response, page: self._next_page(response, page, page_size)
+        )
+        return iter_items(pages, lambda response: response.content, stop, max_items)
+
+    def iter_publications_async(self,
+                                keyword: str,
+                                page_size: int = 100,
+                                include_content: bool = False,
+                                publication_states: List[PublicationState] = None,
+                                rubrics: List[str] = None,
+                                stop: Optional[Callable[[Publication], bool]] = None,
+                                max_items: Optional[int] = None,
+                                lazy: bool = False) -> AsyncIterator[Publication]:
+        """Async variant of iter_publications"""
+        pages = iter_pages_async(
+            lambda page: self.search_async(keyword, page, page_size, include_content, publication_states, rubrics, lazy),
+            lambda response, page: self._next_page(response, page, page_size)
+        )
+        return iter_items_async(pages, lambda response: response.content, stop, max_items)
+
+    @staticmethod
+    def _next_page(response: SearchResponse, page: int, page_size: int) -> Optional[int]:
+        return page + 1 if response.content and (page + 1) * page_size < response.total else None
+
+    @staticmethod
+    def _parse_search_response(data: Dict[str, Any], lazy: bool = False) -> SearchResponse:
+        if lazy:
             return SearchResponse(
-                content=publications,
+                content=[LazyPublication(pub_data) for pub_data in data["content"]],
                 total=data["total"],
                 pageRequest=PageRequest(**data["pageRequest"])
             )
+
+        # Convert string dates to datetime
+        publications = []
+        for pub_data in data["content"]:
+            # Convert dates in meta
+            meta = pub_data["meta"]
+            meta["creationDate"] = _parse_datetime(meta["creationDate"])
+            meta["updateDate"] = _parse_datetime(meta["updateDate"])
+            meta["publicationDate"] = _parse_datetime(meta["publicationDate"])
+            if meta.get("expirationDate"):
+                meta["expirationDate"] = _parse_datetime(meta["expirationDate"])
             
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to search SHAB API: {str(e)}")
+            # Create registration office object
+            meta["registrationOffice"] = RegistrationOffice(**meta["registrationOffice"])
+            if meta.get("municipalities"):
+                meta["municipalities"] = [Municipality(**m) for m in meta["municipalities"]]
+            
+            # Clean metadata - remove any fields not in PublicationMeta
+            meta = {k: v for k, v in meta.items() if k in _META_FIELD_NAMES}
+            
+            # Create PublicationMeta first
+            pub_meta = PublicationMeta(**meta)
+            
+            # Create Publication with proper structure
+            publication = Publication(
+                meta=pub_meta,
+                privateMeta=None,
+                content=pub_data.get("content"),
+                commented=pub_data.get("commented", False)
+            )
+            publications.append(publication)
+            
+        return SearchResponse(
+            content=publications,
+            total=data["total"],
+            pageRequest=PageRequest(**data["pageRequest"])
+        )
 
     def get_publication(self, publication_id: str) -> Publication:
+        """Synchronous wrapper around get_publication_async"""
+        return run_sync(self.get_publication_async(publication_id))
+
+    async def get_publication_async(self, publication_id: str) -> Publication:
         """
         Get detailed information about a specific publication
         
@@ -180,17 +354,15 @@ class ShabClient:
             Exception: If publication not found or API error occurs
         """
         try:
-            response = requests.get(f"{self.BASE_URL}/publications/{publication_id}")
-            response.raise_for_status()
-            data = response.json()
+            data = await self._cache.fetch_json("shab", "GET", f"{self.BASE_URL}/publications/{publication_id}")
             
             # Convert dates in meta
             meta = data["meta"]
-            meta["creationDate"] = datetime.fromisoformat(meta["creationDate"].replace("Z", "+00:00"))
-            meta["updateDate"] = datetime.fromisoformat(meta["updateDate"].replace("Z", "+00:00"))
-            meta["publicationDate"] = datetime.fromisoformat(meta["publicationDate"].replace("Z", "+00:00"))
+            meta["creationDate"] = _parse_datetime(meta["creationDate"])
+            meta["updateDate"] = _parse_datetime(meta["updateDate"])
+            meta["publicationDate"] = _parse_datetime(meta["publicationDate"])
             if meta.get("expirationDate"):
-                meta["expirationDate"] = datetime.fromisoformat(meta["expirationDate"].replace("Z", "+00:00"))
+                meta["expirationDate"] = _parse_datetime(meta["expirationDate"])
             
             # Convert nested objects
             meta["registrationOffice"] = RegistrationOffice(**meta["registrationOffice"])
@@ -200,7 +372,9 @@ class ShabClient:
             data["meta"] = PublicationMeta(**meta)
             return Publication(**data)
             
-        except requests.exceptions.RequestException as e:
-            if e.response and e.response.status_code == 404:
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
                 raise Exception(f"Publication {publication_id} not found")
+            raise Exception(f"Failed to get publication details: {str(e)}")
+        except httpx.HTTPError as e:
             raise Exception(f"Failed to get publication details: {str(e)}")
\ No newline at end of file
@@ -1,96 +1,157 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, Dict, List, Optional, Union
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
 from shab_api import ShabClient, PublicationState
-from plugin_logger import log_plugin_call, PluginType
+from output_format import OutputFormat, compact_table, fit_to_budget, parse_output_format
+from plugin_logger import log_plugin_call, timed_plugin_call, PluginType
 
 class ShabPlugin:
     """
     Description: Plugin for searching Swiss Official Gazette (SHAB) publications.
-    
+
     Usage:
         kernel.add_plugin(ShabPlugin(), plugin_name="shab")
-        
+
     Examples:
         {{shab.search_publications keyword="Example AG"}} => Returns latest publications
+        {{shab.search_publications keyword="Example AG" rubrics="HR,KK"}} => Registry changes and bankruptcies
     """
-    
-    def __init__(self):
+
+    def __init__(self,
+                 output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                 max_tokens: Optional[int] = None):
         self._client = ShabClient()
-    
+        self._format = parse_output_format(output_format)
+        self._max_tokens = max_tokens
+
     @kernel_function(
-        description="Search for company-related publications in SHAB gazette",
+        description="Search for company-related publications in SHAB gazette, across one or more publication types at once",
         name="search_publications"
     )
-    def search_publications(
+    @timed_plugin_call(PluginType.SHAB)
+    async def search_publications(
         self,
         keyword: Annotated[str, "Company name or keyword to search for"],
-        rubric: Annotated[str, "Publication type (HR=Commercial Registry, BB=Bankruptcy, etc)"] = "HR"
-    ) -> Annotated[str, "List of relevant publications"]:
+        rubrics: Annotated[str, "Comma-separated publication types, e.g. HR,KK (HR=Commercial Registry, KK=Bankruptcy, etc)"] = "HR",
+        max_results: Annotated[int, "Maximum number of publications to return"] = 5
+    ) -> Annotated[str, "List of relevant publications, newest first"]:
         """Search official publications for company information"""
         result = ""
+        inputs = {"keyword": keyword, "rubrics": rubrics, "max_results": max_results}
         if not keyword:
             result = "Error: Search keyword is required"
             log_plugin_call(
                 PluginType.SHAB,
                 "search_publications",
-                {"keyword": keyword, "rubric": rubric},
+                inputs,
                 result
             )
             return result
-            
+
+        rubric_list = list(dict.fromkeys(r.strip().upper() for r in (rubrics or "").split(",") if r.strip()))
+        max_results = max(1, max_results)
+
         try:
-            results = self._client.search(
-                keyword=keyword,
-                publication_states=[PublicationState.PUBLISHED],
-                rubrics=[rubric] if rubric else None,
-                page_size=5
-            )
-            
-            if not results.content:
+            # One search per rubric, run concurrently; a failing rubric does not hide the others
+            # (no rubric given searches all of them in one request)
+            responses = await asyncio.gather(*(
+                self._client.search_async(
+                    keyword=keyword,
+                    publication_states=[PublicationState.PUBLISHED],
+                    rubrics=rubric_group,
+                    page_size=max_results,
+                    # Only a few fields are rendered, decode them on access
+                    lazy=True
+                )
+                for rubric_group in ([[rubric] for rubric in rubric_list] or [None])
+            ), return_exceptions=True)
+
+            failed = [str(r) for r in responses if isinstance(r, Exception)]
+            succeeded = [r for r in responses if not isinstance(r, Exception)]
+            if not succeeded:
+                raise Exception(failed[0])
+
+            # Merge by publication id, newest first
+            merged: Dict[str, object] = {}
+            for response in succeeded:
+                for pub in response.content:
+                    merged.setdefault(pub.meta.id, pub)
+            publications: List = sorted(merged.values(), key=lambda p: p.meta.publicationDate, reverse=True)
+            total = sum(response.total for response in succeeded)
+
+            if not publications:
                 result = f"No publications found for '{keyword}'"
+                if failed:
+                    result += f"\nNote: some rubrics could not be searched ({'; '.join(failed)})"
                 log_plugin_call(
                     PluginType.SHAB,
                     "search_publications",
-                    {"keyword": keyword, "rubric": rubric},
+                    inputs,
                     result
                 )
                 return result
-                
-            output = [f"Publications for '{keyword}':"]
-            
-            for pub in results.content:
-                meta = pub.meta
-                output.append("=" * 40)
-                
-                # Add publication title
-                title = meta.title.get('en') or meta.title.get('de') or "No title"
-                output.append(f"Title: {title}")
-                
-                # Add key details
-                output.append(f"Date: {meta.publicationDate.strftime('%Y-%m-%d')}")
-                output.append(f"Type: {meta.rubric}")
-                
-                # Add location info if available
-                if meta.municipalities:
-                    location = meta.municipalities[0]
-                    output.append(f"Location: {location.town} ({location.swissZipCode})")
-                
-                # Add company UID if available
-                if meta.uid:
-                    output.append(f"UID: {meta.uid[0]}")
-                
-            if results.total > len(results.content):
-                output.append(f"\nNote: {results.total - len(results.content)} more results available")
-                
-            result = "\n".join(output)
-            
+
+            shown = min(len(publications), max_results)
+            notes = []
+            if total > shown:
+                notes.append(f"{total - shown} more results available")
+            if failed:
+                notes.append(f"some rubrics could not be searched ({'; '.join(failed)})")
+
+            if self._format == OutputFormat.COMPACT:
+                result = compact_table(
+                    f"publications {shown}/{total}",
+                    ("date", "rubric", "title", "town", "uid"),
+                    (
+                        (
+                            pub.meta.publicationDate.strftime('%Y-%m-%d'),
+                            pub.meta.rubric,
+                            pub.meta.title.get('en') or pub.meta.title.get('de') or "",
+                            pub.meta.municipalities[0].town if pub.meta.municipalities else "",
+                            pub.meta.uid[0] if pub.meta.uid else "",
+                        )
+                        for pub in publications[:max_results]
+                    ),
+                    [f"note: {note}" for note in notes]
+                )
+            else:
+                output = [f"Publications for '{keyword}':"]
+
+                for pub in publications[:max_results]:
+                    meta = pub.meta
+                    output.append("=" * 40)
+
+                    # Add publication title
+                    title = meta.title.get('en') or meta.title.get('de') or "No title"
+                    output.append(f"Title: {title}")
+
+                    # Add key details
+                    output.append(f"Date: {meta.publicationDate.strftime('%Y-%m-%d')}")
+                    output.append(f"Type: {meta.rubric}")
+
+                    # Add location info if available
+                    if meta.municipalities:
+                        location = meta.municipalities[0]
+                        output.append(f"Location: {location.town} ({location.swissZipCode})")
+
+                    # Add company UID if available
+                    if meta.uid:
+                        output.append(f"UID: {meta.uid[0]}")
+
+                if notes:
+                    output.append("")
+                    output.extend(f"Note: {note}" for note in notes)
+
+                result = "\n".join(output)
+
         except Exception as e:
             result = f"Error searching publications: {str(e)}"
-            
+        result = fit_to_budget(result, self._max_tokens)
+
         log_plugin_call(
             PluginType.SHAB,
             "search_publications",
-            {"keyword": keyword, "rubric": rubric},
+            inputs,
             result
         )
         return result
@@ -1,13 +1,40 @@
+import os
+from pathlib import Path
+from typing import Optional
 from bank_api import InMemoryBankAPI
+from sqlite_bank_api import SqliteBankAPI
 from seco_api import SecoClient
+from zefix_index import ZefixIndex
+from finma_snapshot import FinmaSnapshot
 
 # Shared instances
-bank_api = InMemoryBankAPI()
+# Accounts persist across restarts when BANK_DB_PATH is set
+bank_api = SqliteBankAPI(Path(os.getenv("BANK_DB_PATH"))) if os.getenv("BANK_DB_PATH") else InMemoryBankAPI()
 seco_client = SecoClient()
+zefix_index = ZefixIndex.load(Path(os.getenv("ZEFIX_INDEX_PATH") or Path.home() / ".cache" / "zefix" / "index.jsonl"))
+# Call finma_snapshot.start() to build and refresh the snapshot in the background
+finma_snapshot = FinmaSnapshot.load(Path(os.getenv("FINMA_SNAPSHOT_PATH") or Path.home() / ".cache" / "finma" / "snapshot.json"))
+
+SAMPLE_COMPANY = "Test Company AG"
+# Owner of the sample account on the sanctions list, set by init_sample_data
+_sample_sanctioned_person: Optional[str] = None
 
 # Create some sample accounts for testing
 def init_sample_data():
+    global _sample_sanctioned_person
     from bank_api import AccountType
+    if bank_api.get_account(SAMPLE_COMPANY) is not None:
+        # Already created in a previous run of a persistent store, where the sanctioned
+        # person's account is the first individual one; reads a single row
+        if _sample_sanctioned_person is None:
+            first = next(bank_api.iter_accounts(account_type=AccountType.INDIVIDUAL, batch_size=1), None)
+            _sample_sanctioned_person = first.owner.name if first else None
+        return
     sanctioned_person = seco_client.get_random_sanctioned_person()
-    bank_api.create_account("Test Company AG", AccountType.COMPANY, 1000.0, "CHE-123.456.789")
+    bank_api.create_account(SAMPLE_COMPANY, AccountType.COMPANY, 1000.0, "CHE-123.456.788")
     bank_api.create_account(sanctioned_person, AccountType.INDIVIDUAL, 500.0)
+    _sample_sanctioned_person = sanctioned_person
+
+def get_sample_sanctioned_person() -> Optional[str]:
+    """Owner of the sample account on the sanctions list, None before init_sample_data"""
+    return _sample_sanctioned_person
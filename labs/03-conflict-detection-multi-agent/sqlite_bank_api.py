@@ -0,0 +1,286 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+from bank_api import AccountOwner, AccountStatus, AccountType, BankAccount, perform_basic_checks
+from zefix_index import normalize_uid
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    owner_name TEXT PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    owner_type TEXT NOT NULL,
+    uid TEXT,
+    uid_key TEXT,
+    balance REAL NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    freeze_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS accounts_uid_key ON accounts (uid_key) WHERE uid_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS accounts_status_type ON accounts (status, owner_type);
+CREATE INDEX IF NOT EXISTS accounts_created_at ON accounts (created_at);
+"""
+
+_COLUMNS = "owner_name, id, owner_type, uid, balance, status, created_at, freeze_reason"
+
+_UPSERT = """
+INSERT INTO accounts (owner_name, id, owner_type, uid, uid_key, balance, status, created_at, freeze_reason)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (owner_name) DO UPDATE SET
+    id = excluded.id, owner_type = excluded.owner_type, uid = excluded.uid, uid_key = excluded.uid_key,
+    balance = excluded.balance, status = excluded.status, created_at = excluded.created_at,
+    freeze_reason = excluded.freeze_reason
+"""
+
+class SqliteBankAPI:
+    """
+    Persistent account store on SQLite in WAL mode, with the same API as
+    InMemoryBankAPI.
+
+    Accounts live in the database only, so startup does not load them and
+    memory use does not grow with the number of accounts. Writes go through
+    one connection, reads through a small pool of read-only connections that
+    WAL lets run alongside the writer. `batch()` groups many writes into one
+    transaction.
+
+    Usage:
+        bank = SqliteBankAPI(Path.home() / ".cache" / "bank" / "accounts.db")
+        bank.create_account("Example AG", AccountType.COMPANY, uid="CHE-110.088.994")
+        with bank.batch():
+            for name in names:
+                bank.create_account(name, AccountType.INDIVIDUAL)
+    """
+
+    def __init__(self, path: Path, read_pool_size: int = 4, cache_size_kib: int = 8192):
+        """
+        Args:
+            path: Database file, created if missing
+            read_pool_size: Number of pooled read connections
+            cache_size_kib: Page cache per connection in KiB
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._cache_size_kib = cache_size_kib
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._version = 0
+
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.executescript(_SCHEMA)
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, read_pool_size)):
+            reader = self._connect()
+            reader.execute("PRAGMA query_only=ON")
+            self._readers.put(reader)
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented on every change made through this instance.
+
+        Writes by other connections or processes sharing the database file
+        are not counted, so views keyed on the version miss them until this
+        instance changes something.
+        """
+        return self._version
+
+    def __len__(self) -> int:
+        with self._reader() as conn:
+            return conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+    def list_accounts(self,
+                      status: Optional[AccountStatus] = None,
+                      account_type: Optional[AccountType] = None) -> Sequence[BankAccount]:
+        """
+        List accounts, optionally filtered by status and type
+
+        Args:
+            status: Only accounts with this status
+            account_type: Only accounts of this type
+
+        Returns:
+            Immutable sequence of accounts in creation order
+        """
+        return tuple(self.iter_accounts(status, account_type))
+
+    def iter_accounts(self,
+                      status: Optional[AccountStatus] = None,
+                      account_type: Optional[AccountType] = None,
+                      batch_size: int = 500) -> Iterator[BankAccount]:
+        """
+        Like list_accounts, but reads the accounts in batches instead of all at once
+
+        Each batch is a separate keyset query on (created_at, rowid), and no
+        reader connection is held while accounts are yielded, so a caller that
+        stops early does not keep one from the pool.
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status.value)
+        if account_type is not None:
+            clauses.append("owner_type = ?")
+            params.append(account_type.value)
+        after = None
+        while True:
+            page_clauses, page_params = list(clauses), list(params)
+            if after is not None:
+                page_clauses.append("(created_at, rowid) > (?, ?)")
+                page_params.extend(after)
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+            with self._reader() as conn:
+                rows = conn.execute(
+                    f"SELECT created_at, rowid, {_COLUMNS} FROM accounts {where} ORDER BY created_at, rowid LIMIT ?",
+                    page_params + [batch_size]
+                ).fetchall()
+            for row in rows:
+                yield self._from_row(row[2:])
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][:2]
+
+    def list_recent(self, limit: int) -> Sequence[BankAccount]:
+        """The `limit` most recently created accounts, newest first"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM accounts ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return tuple(self._from_row(row) for row in rows)
+
+    def find_by_uid(self, uid: str) -> Optional[BankAccount]:
+        """Get the account of a company by UID in any common format"""
+        return self._fetch_one("uid_key = ?", self._uid_key(uid))
+
+    def find_by_id(self, account_id: str) -> Optional[BankAccount]:
+        """Get an account by id"""
+        return self._fetch_one("id = ?", account_id)
+
+    def create_account(self, owner_name: str, account_type: AccountType, initial_balance: float = 0.0, uid: Optional[str] = None) -> BankAccount:
+        """Create a new bank account"""
+        account = perform_basic_checks(BankAccount(
+            owner=AccountOwner(name=owner_name, type=account_type, uid=uid),
+            balance=initial_balance
+        ))
+        self._write([account])
+        return account
+
+    def create_accounts(self, accounts: Iterable[Tuple[str, AccountType, float, Optional[str]]]) -> int:
+        """
+        Create many accounts in one transaction
+
+        Args:
+            accounts: (owner_name, account_type, initial_balance, uid) tuples
+
+        Returns:
+            Number of accounts written
+        """
+        return self._write(
+            perform_basic_checks(BankAccount(owner=AccountOwner(name=name, type=account_type, uid=uid), balance=balance))
+            for name, account_type, balance, uid in accounts
+        )
+
+    def get_account(self, owner_name: str) -> Optional[BankAccount]:
+        """Get account by owner name"""
+        return self._fetch_one("owner_name = ?", owner_name)
+
+    def freeze_account(self, owner_name: str, reason: str) -> bool:
+        """Freeze an account"""
+        return self._set_status(owner_name, AccountStatus.FROZEN, reason)
+
+    def unfreeze_account(self, owner_name: str) -> bool:
+        """Unfreeze an account"""
+        return self._set_status(owner_name, AccountStatus.ACTIVE, None)
+
+    @contextmanager
+    def batch(self):
+        """Group the writes inside the block into one transaction, rolled back on error"""
+        with self._lock:
+            if self._batch_depth == 0:
+                self._writer.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._writer.rollback()
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._writer.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    def _set_status(self, owner_name: str, status: AccountStatus, reason: Optional[str]) -> bool:
+        with self.batch():
+            changed = self._writer.execute(
+                "UPDATE accounts SET status = ?, freeze_reason = ? WHERE owner_name = ?",
+                (status.value, reason, owner_name)
+            ).rowcount
+            if changed:
+                self._version += 1
+        return bool(changed)
+
+    def _write(self, accounts: Iterable[BankAccount]) -> int:
+        with self.batch():
+            before = self._writer.total_changes
+            self._writer.executemany(_UPSERT, (self._to_row(account) for account in accounts))
+            written = self._writer.total_changes - before
+            if written:
+                self._version += 1
+        return written
+
+    def _fetch_one(self, where: str, value: str) -> Optional[BankAccount]:
+        with self._reader() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM accounts WHERE {where} LIMIT 1", (value,)).fetchone()
+        return self._from_row(row) if row else None
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are shared between threads, but each is used by one thread at a time
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=10.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self._cache_size_kib}")
+        return conn
+
+    @classmethod
+    def _to_row(cls, account: BankAccount) -> tuple:
+        owner = account.owner
+        return (
+            owner.name, account.id, owner.type.value, owner.uid,
+            cls._uid_key(owner.uid) if owner.uid else None,
+            account.balance, account.status.value, account.created_at.isoformat(), account.freeze_reason
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> BankAccount:
+        name, account_id, owner_type, uid, balance, status, created_at, freeze_reason = row
+        return BankAccount(
+            owner=AccountOwner(name=name, type=AccountType(owner_type), uid=uid),
+            balance=balance,
+            status=AccountStatus(status),
+            created_at=datetime.fromisoformat(created_at),
+            freeze_reason=freeze_reason,
+            id=account_id
+        )
+
+    @staticmethod
+    def _uid_key(uid: str) -> str:
+        return normalize_uid(uid) or uid.strip().upper()
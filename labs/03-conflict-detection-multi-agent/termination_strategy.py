@@ -0,0 +1,178 @@
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from pydantic import Field, PrivateAttr
+from semantic_kernel.agents import Agent
+from semantic_kernel.agents.strategies.termination.termination_strategy import TerminationStrategy
+from semantic_kernel.contents import ChatMessageContent, FunctionCallContent, FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from token_budget import estimate_message_tokens
+
+@dataclass
+class ConversationStats:
+    """Cost of one conversation, i.e. the agent turns answering one user message"""
+    started_at: float
+    duration_s: float = 0.0
+    turns: int = 0
+    tokens: int = 0
+    terminated_by: Optional[str] = None  # "decision", "time", "turns", "tokens" or None
+
+class BudgetTerminationStrategy(TerminationStrategy):
+    """
+    Ends a conversation once a decision is reached or one of its budgets
+    (wall-clock seconds, agent turns, tokens) is spent.
+
+    A decision is a successful bank function listed in `decision_functions`
+    followed by an agent message explaining it. Tokens are the usage reported
+    by the chat service, or an estimate of the agent and tool messages
+    themselves when there is no usage data.
+
+    Usage:
+        chat = AgentGroupChat(
+            agents=[agent_kyc, agent_account, agent_risk],
+            termination_strategy=BudgetTerminationStrategy(max_seconds=90, max_turns=8)
+        )
+        chat.termination_strategy.begin_conversation()
+        async for response in chat.invoke(): ...
+        print(chat.termination_strategy.get_stats())
+    """
+
+    max_seconds: float = 120.0
+    max_turns: int = 10
+    max_tokens: int = 60000
+    # "plugin-function" names whose successful result is a decision
+    decision_functions: List[str] = Field(default_factory=lambda: ["bank-create_account", "bank-freeze_account"])
+    failure_pattern: str = r"^\s*(Error|No account)"
+    min_rationale_chars: int = 40
+    # A new user message starts a new conversation, so the chat can be invoked again
+    automatic_reset: bool = True
+    maximum_iterations: int = 10
+    history_size: int = 100
+
+    _current: Optional[ConversationStats] = PrivateAttr(default=None)
+    _start_index: int = PrivateAttr(default=0)
+    _user_message: Optional[ChatMessageContent] = PrivateAttr(default=None)
+    _counted: int = PrivateAttr(default=0)
+    _pending_start: Optional[float] = PrivateAttr(default=None)
+    _conversations: Deque[ConversationStats] = PrivateAttr(default=None)
+    _failure_regex: Optional[re.Pattern] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._conversations = deque(maxlen=self.history_size)
+        self._failure_regex = re.compile(self.failure_pattern)
+        # The chat loop stops after this many selections even without a termination check
+        self.maximum_iterations = max(self.maximum_iterations, self.max_turns)
+
+    def begin_conversation(self) -> None:
+        """Start the wall clock of the next conversation now, before the first agent turn"""
+        self._pending_start = time.monotonic()
+
+    @property
+    def remaining_seconds(self) -> float:
+        """Seconds left of the wall-clock budget, the full budget outside of a conversation"""
+        started = self._pending_start
+        if started is None and self._current is not None and self._current.terminated_by is None:
+            started = self._current.started_at
+        if started is None:
+            return self.max_seconds
+        return max(0.0, self.max_seconds - (time.monotonic() - started))
+
+    async def should_agent_terminate(self, agent: Agent, history: List[ChatMessageContent]) -> bool:
+        stats = self._conversation_for(history)
+        if stats.terminated_by is not None:
+            # Further messages of the turn that ended the conversation
+            return True
+        for message in history[self._counted:]:
+            stats.tokens += self._message_tokens(message)
+            if message.role == AuthorRole.ASSISTANT and message.content and not self._has_function_calls(message):
+                stats.turns += 1
+        self._counted = len(history)
+        stats.duration_s = time.monotonic() - stats.started_at
+
+        if self._decision_reached(history[self._start_index:]):
+            reason = "decision"
+        elif stats.duration_s >= self.max_seconds:
+            reason = "time"
+        elif stats.turns >= self.max_turns:
+            reason = "turns"
+        elif stats.tokens >= self.max_tokens:
+            reason = "tokens"
+        else:
+            return False
+
+        stats.terminated_by = reason
+        self._conversations.append(stats)
+        print(f"Conversation ended by {reason}: {stats.turns} turns, {stats.tokens} tokens, {stats.duration_s:.1f}s")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summary over the recent conversations, plus the conversations themselves"""
+        conversations = list(self._conversations)
+        if self._current is not None and self._current.terminated_by is None:
+            conversations.append(self._current)
+        durations = sorted(c.duration_s for c in conversations)
+        ended_by: Dict[str, int] = {}
+        for conversation in conversations:
+            key = conversation.terminated_by or "open"
+            ended_by[key] = ended_by.get(key, 0) + 1
+        return {
+            "conversations": len(conversations),
+            "mean_turns": sum(c.turns for c in conversations) / len(conversations) if conversations else 0.0,
+            "mean_tokens": sum(c.tokens for c in conversations) / len(conversations) if conversations else 0.0,
+            "p50_duration_s": durations[len(durations) // 2] if durations else 0.0,
+            "p95_duration_s": durations[min(len(durations) - 1, int(len(durations) * 0.95))] if durations else 0.0,
+            "max_duration_s": durations[-1] if durations else 0.0,
+            "terminated_by": ended_by,
+            "recent": [asdict(c) for c in conversations[-10:]],
+        }
+
+    def _conversation_for(self, history: List[ChatMessageContent]) -> ConversationStats:
+        """The current conversation, or a new one if a user message arrived since the last check"""
+        last_user = next((i for i in range(len(history) - 1, -1, -1) if history[i].role == AuthorRole.USER), -1)
+        user_message = history[last_user] if last_user >= 0 else None
+        # Compared by identity, the history may have been reduced and shifted since
+        if self._current is not None and user_message is self._user_message:
+            return self._current
+        if self._current is not None and self._current.terminated_by is None:
+            # Still open, the previous invoke ended without a termination
+            self._conversations.append(self._current)
+        self._user_message = user_message
+        self._start_index = last_user + 1
+        self._counted = self._start_index
+        self._current = ConversationStats(started_at=self._pending_start or time.monotonic())
+        self._pending_start = None
+        return self._current
+
+    def _decision_reached(self, messages: List[ChatMessageContent]) -> bool:
+        """True if a decision function succeeded and an agent has explained it since"""
+        decided = False
+        for message in messages:
+            for item in message.items:
+                if (isinstance(item, FunctionResultContent)
+                        and f"{item.plugin_name}-{item.function_name}" in self.decision_functions
+                        and not self._failure_regex.match(str(item.result))):
+                    decided = True
+            if (decided and message.role == AuthorRole.ASSISTANT and not self._has_function_calls(message)
+                    and len(message.content or "") >= self.min_rationale_chars):
+                return True
+        return False
+
+    @staticmethod
+    def _has_function_calls(message: ChatMessageContent) -> bool:
+        return any(isinstance(item, FunctionCallContent) for item in message.items)
+
+    @staticmethod
+    def _message_tokens(message: ChatMessageContent) -> int:
+        usage = (message.metadata or {}).get("usage")
+        if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+            # Reported usage includes the whole prompt the service was sent for this message
+            return (usage.prompt_tokens or 0) + (usage.completion_tokens or 0)
+        if message.role == AuthorRole.USER:
+            return 0
+        # Without usage data only the message itself can be counted, a lower bound
+        return estimate_message_tokens(message)
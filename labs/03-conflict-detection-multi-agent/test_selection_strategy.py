@@ -0,0 +1,63 @@
+import pytest
+
+from selection_strategy import USER, default_banking_rules
+
+KYC_OFFICER, ACCOUNT_MANAGER, RISK_OFFICER = "KYC_Officer", "Account_Manager", "Risk_Officer"
+
+def rule(name):
+    return next(rule for rule in default_banking_rules(KYC_OFFICER, ACCOUNT_MANAGER, RISK_OFFICER)
+                if rule.name == name)
+
+@pytest.mark.parametrize("text", [
+    "SECO: SANCTIONS FOUND",
+    "SANCTIONS FOUND: Ivan Petrov (95%)",
+    "KYC assessment for Ivan Petrov: SANCTIONS FOUND on the SECO list.",
+])
+def test_sanctions_rule_matches_plugin_marker(text):
+    assert rule("sanctions_hit").matches(KYC_OFFICER, text)
+
+@pytest.mark.parametrize("text", [
+    "SECO: No sanctions found",
+    "No sanctions hits were found.",
+    "No SECO sanctions found.",
+    "Not any sanctions found",
+    "I checked for sanctions hits in the SECO list",
+    "The screening returned a sanctions hit for the director.",
+])
+def test_sanctions_rule_ignores_prose(text):
+    assert not rule("sanctions_hit").matches(KYC_OFFICER, text)
+
+def test_sanctions_rule_only_applies_to_kyc_and_account_manager():
+    assert rule("sanctions_hit").matches(ACCOUNT_MANAGER, "SANCTIONS FOUND")
+    assert not rule("sanctions_hit").matches(RISK_OFFICER, "SANCTIONS FOUND")
+
+@pytest.mark.parametrize("text, expected", [
+    ("Perform an Account Review for Ivan Petrov", True),
+    ("review account 3f2a", True),
+    ("Please freeze the account of Example AG", True),
+    ("What is the account status of Example AG?", True),
+    ("new customer Example AG company CHE-110.088.994", False),
+])
+def test_account_request_rule(text, expected):
+    assert rule("account_request").matches(USER, text) is expected
+    assert not rule("account_request").matches(KYC_OFFICER, text)
+
+@pytest.mark.parametrize("text, expected", [
+    ("new customer John Doe", True),
+    ("  New Customer Example AG company CHE-110.088.994", True),
+    ("Is John Doe a new customer?", False),
+])
+def test_new_customer_rule(text, expected):
+    assert rule("new_customer").matches(USER, text) is expected
+    assert not rule("new_customer").matches(ACCOUNT_MANAGER, "new customer John Doe")
+
+@pytest.mark.parametrize("text, expected", [
+    ("KYC approved, please open an account.", True),
+    ("KYC status: approved", True),
+    ("KYC passed for Example AG", True),
+    ("KYC not approved until the registration is confirmed.", False),
+    ("The customer is not KYC approved.", False),
+])
+def test_kyc_approved_rule(text, expected):
+    assert rule("kyc_approved").matches(KYC_OFFICER, text) is expected
+    assert not rule("kyc_approved").matches(ACCOUNT_MANAGER, "KYC approved")
@@ -0,0 +1,50 @@
+import json
+from typing import Iterable, Optional
+
+from semantic_kernel.contents import ChatMessageContent, FunctionCallContent, FunctionResultContent
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional, the estimate falls back to characters per token
+    tiktoken = None
+
+# Average characters per token of English/German text for GPT-4 class tokenizers
+CHARS_PER_TOKEN = 4
+# Role, name and separators the chat format adds to every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding, tiktoken
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # The encoding is downloaded on first use, which fails offline
+            tiktoken = None
+    return _encoding
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the number of tokens of a text, exactly if tiktoken is installed"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def estimate_message_tokens(message: ChatMessageContent) -> int:
+    """Estimate the prompt tokens of a chat message, including function calls and results"""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.content)
+    for item in message.items:
+        if isinstance(item, FunctionCallContent):
+            arguments = item.arguments if isinstance(item.arguments, str) else json.dumps(item.arguments or {})
+            tokens += estimate_tokens(item.name) + estimate_tokens(arguments)
+        elif isinstance(item, FunctionResultContent):
+            tokens += estimate_tokens(str(item.result))
+    return tokens
+
+def estimate_history_tokens(messages: Iterable[ChatMessageContent]) -> int:
+    """Estimate the prompt tokens of a list of chat messages"""
+    return sum(estimate_message_tokens(message) for message in messages)
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
-from typing import List, Optional
-import requests
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+import httpx
+from http_client import run_sync
+from pagination import iter_items, iter_items_async, iter_pages, iter_pages_async
+from response_cache import ResponseCache, default_cache
 
 @dataclass
 class CompanySearchResult:
@@ -30,6 +33,9 @@ class SearchResponse:
 
 class ZefixClient:
     BASE_URL = "https://www.zefix.admin.ch/ZefixREST/api/v1"
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        self._cache = cache if cache is not None else default_cache
     
     def search(self, 
               name: str, 
@@ -37,6 +43,15 @@ class ZefixClient:
               max_entries: int = 30,
               offset: int = 0,
               include_deleted: bool = True) -> SearchResponse:
+        """Synchronous wrapper around search_async"""
+        return run_sync(self.search_async(name, language, max_entries, offset, include_deleted))
+
+    async def search_async(self,
+                           name: str,
+                           language: str = "en",
+                           max_entries: int = 30,
+                           offset: int = 0,
+                           include_deleted: bool = True) -> SearchResponse:
         """
         Search for companies in the Zefix registry
         
@@ -61,19 +76,65 @@ class ZefixClient:
         }
         
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._cache.fetch_json("zefix", "POST", url, json=payload)
+            return self._parse_search_response(data)
             
-            # Convert raw response to SearchResponse model
-            companies = [CompanySearchResult(**c) for c in data["list"]]
-            return SearchResponse(
-                list=companies,
-                offset=data["offset"],
-                maxEntries=data["maxEntries"], 
-                hasMoreResults=data["hasMoreResults"],
-                maxOffset=data["maxOffset"]
-            )
+        except httpx.HTTPError as e:
+            raise Exception(f"Failed to search Zefix API: {str(e)}")
+
+    def iter_companies(self,
+                       name: str,
+                       language: str = "en",
+                       page_size: int = 100,
+                       include_deleted: bool = True,
+                       stop: Optional[Callable[[CompanySearchResult], bool]] = None,
+                       max_items: Optional[int] = None) -> Iterator[CompanySearchResult]:
+        """
+        Iterate over all matching companies, fetching the next page in the background
+        
+        Args:
+            name: Company name to search for
+            language: Language for results (en, de, fr, it)
+            page_size: Number of results per request
+            include_deleted: Whether to include deleted companies
+            stop: Stop after the first company for which this returns True
+            max_items: Maximum number of companies to return
             
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to search Zefix API: {str(e)}")
\ No newline at end of file
+        Returns:
+            Iterator of CompanySearchResult
+        """
+        pages = iter_pages(
+            lambda offset: self.search_async(name, language, page_size, offset, include_deleted),
+            self._next_offset
+        )
+        return iter_items(pages, lambda page: page.list, stop, max_items)
+
+    def iter_companies_async(self,
+                             name: str,
+                             language: str = "en",
+                             page_size: int = 100,
+                             include_deleted: bool = True,
+                             stop: Optional[Callable[[CompanySearchResult], bool]] = None,
+                             max_items: Optional[int] = None) -> AsyncIterator[CompanySearchResult]:
+        """Async variant of iter_companies"""
+        pages = iter_pages_async(
+            lambda offset: self.search_async(name, language, page_size, offset, include_deleted),
+            self._next_offset
+        )
+        return iter_items_async(pages, lambda page: page.list, stop, max_items)
+
+    @staticmethod
+    def _next_offset(page: SearchResponse, offset: int) -> Optional[int]:
+        return offset + len(page.list) if page.hasMoreResults and page.list else None
+
+    @staticmethod
+    def _parse_search_response(data: Dict[str, Any]) -> SearchResponse:
+        # Convert raw response to SearchResponse model
+        companies = [CompanySearchResult(**c) for c in data["list"]]
+        return SearchResponse(
+            list=companies,
+            offset=data["offset"],
+            maxEntries=data["maxEntries"], 
+            hasMoreResults=data["hasMoreResults"],
+            maxOffset=data["maxOffset"]
+        )
\ No newline at end of file
@@ -0,0 +1,225 @@
+import csv
+import json
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# CHE-123.456.789, CHE123456789 or CHE-123456789
+_UID_PATTERN = re.compile(r"^CHE-?(\d{3})\.?(\d{3})\.?(\d{3})$")
+_UID_WEIGHTS = (5, 4, 3, 2, 7, 6, 5, 4)
+
+def normalize_uid(uid: str) -> Optional[str]:
+    """Return the UID as CHE123456789, or None if it is not formatted like a UID"""
+    match = _UID_PATTERN.match(uid.strip().upper().replace(" ", "")) if uid else None
+    return "CHE" + "".join(match.groups()) if match else None
+
+def format_uid(uid: str) -> str:
+    """Format a UID as CHE-123.456.789"""
+    digits = (normalize_uid(uid) or uid)[3:]
+    return f"CHE-{digits[0:3]}.{digits[3:6]}.{digits[6:9]}"
+
+def is_valid_uid(uid: str) -> bool:
+    """
+    Check the format and the modulo 11 check digit of a Swiss company UID.
+
+    The check digit is 11 minus the weighted digit sum modulo 11 (weights
+    5, 4, 3, 2, 7, 6, 5, 4); 11 becomes 0 and 10 is never issued.
+    """
+    normalized = normalize_uid(uid)
+    if normalized is None:
+        return False
+    digits = [int(d) for d in normalized[3:]]
+    check = 11 - sum(d * w for d, w in zip(digits, _UID_WEIGHTS)) % 11
+    if check == 11:
+        check = 0
+    return check != 10 and check == digits[8]
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", ascii_name).split())
+
+@dataclass
+class CompanyRecord:
+    __slots__ = ("uid", "name", "status", "legal_seat")
+    uid: str          # CHE123456789
+    name: str
+    status: str
+    legal_seat: str
+
+class ZefixIndex:
+    """
+    Local index of Zefix companies by UID and by name prefix.
+
+    Records come from bulk JSONL/CSV exports or from accumulated live search
+    results. Changes are appended to the index file, so persisting an update
+    does not rewrite the whole snapshot; later lines override earlier ones.
+
+    Usage:
+        index = ZefixIndex.load(Path.home() / ".cache" / "zefix" / "index.jsonl")
+        index.add_search_response(zefix_client.search("Example AG"))
+        index.flush()
+        record = index.get("CHE-110.088.994")
+        matches = index.search("microsoft schweiz")
+    """
+
+    PREFIX_LENGTH = 3
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._by_uid: Dict[str, CompanyRecord] = {}
+        self._by_prefix: Dict[str, Set[str]] = {}
+        self._dirty: Dict[str, CompanyRecord] = {}
+        self._needs_newline = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._by_uid)
+
+    @classmethod
+    def load(cls, path: Path) -> "ZefixIndex":
+        """
+        Load an index file, or start an empty index that will be saved there
+
+        Unreadable lines, e.g. an append cut short by a crash, are skipped;
+        the record is added again by the next search that returns it.
+        """
+        index = cls(path)
+        if index.path.exists():
+            skipped, line = 0, ""
+            with open(index.path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        uid, name, status, legal_seat = json.loads(line)
+                    except (ValueError, TypeError):
+                        skipped += 1
+                        continue
+                    index._put(CompanyRecord(uid, name, status, legal_seat))
+                # Start the next append on a new line after a truncated last line
+                index._needs_newline = line != "" and not line.endswith("\n")
+            if skipped:
+                print(f"Skipped {skipped} unreadable lines in Zefix index {index.path}")
+        return index
+
+    def get(self, uid: str) -> Optional[CompanyRecord]:
+        """Look up a company by UID in any common format"""
+        normalized = normalize_uid(uid)
+        return self._by_uid.get(normalized) if normalized else None
+
+    def search(self, name: str, limit: int = 5) -> List[CompanyRecord]:
+        """Find companies whose name words start with all words of the query"""
+        words = normalize_name(name).split()
+        if not words:
+            return []
+        with self._lock:
+            # Words shorter than the prefix cannot use the buckets, they are only checked below
+            buckets = [self._by_prefix.get(word[:self.PREFIX_LENGTH], set())
+                       for word in words if len(word) >= self.PREFIX_LENGTH]
+            if buckets:
+                buckets.sort(key=len)
+                candidates = buckets[0].intersection(*buckets[1:])
+            else:
+                candidates = set(self._by_uid)
+            matches = []
+            for uid in candidates:
+                record = self._by_uid[uid]
+                name_words = normalize_name(record.name).split()
+                if all(any(w.startswith(q) for w in name_words) for q in words):
+                    matches.append(record)
+        matches.sort(key=lambda r: (r.status != "ACTIVE", len(r.name), r.name))
+        return matches[:limit]
+
+    def add(self, uid: str, name: str, status: str = "", legal_seat: str = "") -> Optional[CompanyRecord]:
+        """Add or update a company; records with an invalid UID are skipped"""
+        normalized = normalize_uid(uid)
+        if normalized is None or not is_valid_uid(normalized):
+            return None
+        record = CompanyRecord(normalized, name, status or "", legal_seat or "")
+        with self._lock:
+            existing = self._by_uid.get(normalized)
+            if existing is not None and (existing.name, existing.status, existing.legal_seat) == (record.name, record.status, record.legal_seat):
+                return existing
+            self._put(record)
+            self._dirty[normalized] = record
+        return record
+
+    def add_search_response(self, response) -> int:
+        """Add the companies of a zefix_api.SearchResponse; returns the number added or changed"""
+        changed = 0
+        for company in response.list:
+            existing = self.get(company.uid) if company.uid else None
+            record = self.add(company.uid, company.name, company.status, company.legalSeat) if company.uid else None
+            if record is not None and record is not existing:
+                changed += 1
+        return changed
+
+    def import_records(self, rows: Iterable[Dict[str, str]]) -> int:
+        """Import rows with Zefix (uid, name, status, legalSeat) or snake_case (legal_seat) keys"""
+        count = 0
+        for row in rows:
+            if self.add(row.get("uid") or "", row.get("name") or "", row.get("status") or "",
+                        row.get("legalSeat") or row.get("legal_seat") or "") is not None:
+                count += 1
+        return count
+
+    def import_jsonl(self, path: Path) -> int:
+        """Import a bulk JSON lines export, one company object per line"""
+        with open(path, encoding="utf-8") as f:
+            return self.import_records(json.loads(line) for line in f if line.strip())
+
+    def import_csv(self, path: Path) -> int:
+        """Import a bulk CSV export with a header row"""
+        with open(path, encoding="utf-8", newline="") as f:
+            return self.import_records(csv.DictReader(f))
+
+    def flush(self) -> int:
+        """Append changed records to the index file; returns the number written"""
+        if self.path is None:
+            return 0
+        with self._lock:
+            dirty, self._dirty = list(self._dirty.values()), {}
+        if dirty:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if self._needs_newline:
+                    f.write("\n")
+                    self._needs_newline = False
+                f.writelines(self._line(record) for record in dirty)
+        return len(dirty)
+
+    def compact(self) -> None:
+        """Rewrite the index file with one line per company"""
+        if self.path is None:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(self._line(record) for record in self._by_uid.values())
+            tmp_path.replace(self.path)
+            self._dirty.clear()
+            self._needs_newline = False
+
+    def _put(self, record: CompanyRecord) -> None:
+        existing = self._by_uid.get(record.uid)
+        if existing is not None:
+            for prefix in self._prefixes(existing.name):
+                bucket = self._by_prefix.get(prefix)
+                if bucket is not None:
+                    bucket.discard(record.uid)
+        self._by_uid[record.uid] = record
+        for prefix in self._prefixes(record.name):
+            self._by_prefix.setdefault(prefix, set()).add(record.uid)
+
+    def _prefixes(self, name: str) -> Set[str]:
+        return {word[:self.PREFIX_LENGTH] for word in normalize_name(name).split()}
+
+    @staticmethod
+    def _line(record: CompanyRecord) -> str:
+        return json.dumps([record.uid, record.name, record.status, record.legal_seat], ensure_ascii=False) + "\n"
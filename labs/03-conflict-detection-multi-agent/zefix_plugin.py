@@ -1,7 +1,11 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, Optional, Union
 from semantic_kernel.functions.kernel_function_decorator import kernel_function
-from zefix_api import ZefixClient
-from plugin_logger import log_plugin_call, PluginType
+from zefix_api import ZefixClient, SearchResponse
+from zefix_index import ZefixIndex, format_uid, is_valid_uid
+from output_format import OutputFormat, compact_table, fit_to_budget, parse_output_format
+from plugin_logger import log_plugin_call, timed_plugin_call, PluginType
+from shared_state import zefix_index
 
 class ZefixPlugin:
     """
@@ -12,16 +16,25 @@ class ZefixPlugin:
         
     Examples:
         {{zefix.search_companies name="Example AG"}} => Returns company matches
+        {{zefix.lookup_uid uid="CHE-110.088.994"}} => Returns the registered company
     """
     
-    def __init__(self):
+    def __init__(self,
+                 index: ZefixIndex = None,
+                 output_format: Union[OutputFormat, str] = OutputFormat.TEXT,
+                 max_tokens: Optional[int] = None):
         self._client = ZefixClient()
+        # Live search results are accumulated in the local index for offline UID lookups
+        self._index = index if index is not None else zefix_index
+        self._format = parse_output_format(output_format)
+        self._max_tokens = max_tokens
     
     @kernel_function(
         description="Search for companies in Swiss commercial registry",
         name="search_companies"
     )
-    def search_companies(
+    @timed_plugin_call(PluginType.ZEFIX)
+    async def search_companies(
         self,
         name: Annotated[str, "Company name to search for"],
         include_deleted: Annotated[bool, "Include deleted companies"] = False
@@ -32,14 +45,21 @@ class ZefixPlugin:
             
         result = ""
         try:
-            results = self._client.search(
+            results = await self._client.search_async(
                 name=name,
                 max_entries=5,
                 include_deleted=include_deleted
             )
+            await self._remember(results)
             
             if not results.list:
                 result = "No matching companies found"
+            elif self._format == OutputFormat.COMPACT:
+                result = compact_table(
+                    f"companies {len(results.list)}/{results.maxOffset if results.hasMoreResults else len(results.list)}",
+                    ("name", "uid", "status", "seat"),
+                    ((c.name, c.uidFormatted, c.status, c.legalSeat) for c in results.list)
+                )
             else:
                 output = ["Found companies:"]
                 for company in results.list:
@@ -59,6 +79,7 @@ class ZefixPlugin:
                 result = "\n".join(output)
         except Exception as e:
             result = f"Error searching company registry: {str(e)}"
+        result = fit_to_budget(result, self._max_tokens)
             
         log_plugin_call(
             PluginType.ZEFIX, 
@@ -67,3 +88,55 @@ class ZefixPlugin:
             result
         )
         return result
+
+    @kernel_function(
+        description="Look up a company by its UID (e.g. CHE-110.088.994), validating the check digit",
+        name="lookup_uid"
+    )
+    @timed_plugin_call(PluginType.ZEFIX)
+    async def lookup_uid(
+        self,
+        uid: Annotated[str, "Company UID, e.g. CHE-110.088.994"]
+    ) -> Annotated[str, "Registered company or error message"]:
+        """Look up a UID in the local index, falling back to the live registry"""
+        result = ""
+        if not is_valid_uid(uid):
+            result = f"Invalid UID '{uid}': wrong format or check digit"
+        else:
+            record = self._index.get(uid)
+            try:
+                if record is None:
+                    # Zefix accepts a UID in place of the company name
+                    await self._remember(await self._client.search_async(name=format_uid(uid), max_entries=5))
+                    record = self._index.get(uid)
+                if record is None:
+                    result = f"No company registered under {format_uid(uid)}"
+                elif self._format == OutputFormat.COMPACT:
+                    result = compact_table(
+                        "company", ("name", "uid", "status", "seat"),
+                        [(record.name, format_uid(record.uid), record.status, record.legal_seat)]
+                    )
+                else:
+                    result = "\n".join([
+                        "Found company:",
+                        f"Name: {record.name}",
+                        f"UID: {format_uid(record.uid)}",
+                        f"Status: {record.status}",
+                        f"Location: {record.legal_seat}",
+                    ])
+            except Exception as e:
+                result = f"Error searching company registry: {str(e)}"
+        result = fit_to_budget(result, self._max_tokens)
+
+        log_plugin_call(
+            PluginType.ZEFIX,
+            "lookup_uid",
+            {"uid": uid},
+            result
+        )
+        return result
+
+    async def _remember(self, results: SearchResponse) -> None:
+        if self._index.add_search_response(results):
+            # Appending to the index file is blocking I/O, keep it off the event loop
+            await asyncio.to_thread(self._index.flush)
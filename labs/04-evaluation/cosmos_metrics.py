@@ -0,0 +1,131 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    from opentelemetry import metrics, trace
+except ImportError:  # OpenTelemetry is optional outside of lab 05
+    metrics = None
+    trace = None
+
+if metrics is not None:
+    _meter = metrics.get_meter(__name__)
+    _request_charge = _meter.create_histogram(
+        "cosmos.request_charge", unit="RU", description="Request units consumed per Cosmos DB operation")
+    _duration = _meter.create_histogram(
+        "cosmos.duration", unit="ms", description="Client-side duration per Cosmos DB operation")
+    _item_count = _meter.create_histogram(
+        "cosmos.item_count", unit="{item}", description="Items returned per Cosmos DB operation")
+    _pages = _meter.create_histogram(
+        "cosmos.pages", unit="{page}", description="Result pages fetched per Cosmos DB query")
+
+@dataclass
+class CosmosCallMetrics:
+    """Cost of a single Cosmos DB operation, summed over all of its requests"""
+    operation: str
+    kind: str
+    request_charge: float = 0.0
+    duration_ms: float = 0.0
+    server_duration_ms: float = 0.0
+    item_count: int = 0
+    pages: int = 0
+    partition_ranges: Set[str] = field(default_factory=set)
+
+# operation -> aggregated totals, readable without an OpenTelemetry exporter
+_totals: Dict[str, Dict[str, float]] = {}
+_totals_lock = threading.Lock()
+
+def _last_headers(container) -> Dict[str, str]:
+    connection = getattr(container, "client_connection", None)
+    return getattr(connection, "last_response_headers", None) or {}
+
+def _add_response(call: CosmosCallMetrics, headers: Dict[str, str]) -> None:
+    call.request_charge += float(headers.get("x-ms-request-charge", 0) or 0)
+    call.server_duration_ms += float(headers.get("x-ms-request-duration-ms", 0) or 0)
+    if headers.get("x-ms-documentdb-partitionkeyrangeid"):
+        call.partition_ranges.add(headers["x-ms-documentdb-partitionkeyrangeid"])
+
+def query_items(container, operation: str, query: str, parameters: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    """
+    Run a query page by page and record its request charge, duration,
+    item count, continuation pages and partition fan-out.
+
+    Args:
+        container: Cosmos DB container client
+        operation: Name of the calling tool function, e.g. "get_kyc_data"
+        query: SQL query text
+        parameters: Query parameters
+
+    Returns:
+        All items returned by the query
+    """
+    call = CosmosCallMetrics(operation=operation, kind="query")
+    start = time.perf_counter()
+    items: List[Dict[str, Any]] = []
+    try:
+        for page in container.query_items(query=query, parameters=parameters, **kwargs).by_page():
+            page_items = list(page)
+            items.extend(page_items)
+            call.pages += 1
+            _add_response(call, _last_headers(container))
+    finally:
+        call.item_count = len(items)
+        call.duration_ms = (time.perf_counter() - start) * 1000
+        record(call)
+    return items
+
+def upsert_item(container, operation: str, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """Upsert an item and record its request charge and duration"""
+    call = CosmosCallMetrics(operation=operation, kind="upsert")
+    start = time.perf_counter()
+    try:
+        result = container.upsert_item(body, **kwargs)
+        call.item_count = 1
+        _add_response(call, _last_headers(container))
+        return result
+    finally:
+        call.duration_ms = (time.perf_counter() - start) * 1000
+        record(call)
+
+def record(call: CosmosCallMetrics) -> None:
+    """Export a finished call as OpenTelemetry metrics and attributes of the current span"""
+    with _totals_lock:
+        totals = _totals.setdefault(call.operation, {
+            "calls": 0, "request_charge": 0.0, "duration_ms": 0.0, "items": 0, "pages": 0
+        })
+        totals["calls"] += 1
+        totals["request_charge"] += call.request_charge
+        totals["duration_ms"] += call.duration_ms
+        totals["items"] += call.item_count
+        totals["pages"] += call.pages
+
+    if metrics is None:
+        return
+
+    attributes = {"cosmos.operation": call.operation, "cosmos.kind": call.kind}
+    _request_charge.record(call.request_charge, attributes)
+    _duration.record(call.duration_ms, attributes)
+    _item_count.record(call.item_count, attributes)
+    if call.kind == "query":
+        _pages.record(call.pages, attributes)
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        span_attributes = {
+            f"cosmos.{call.kind}.request_charge": call.request_charge,
+            f"cosmos.{call.kind}.duration_ms": call.duration_ms,
+            f"cosmos.{call.kind}.server_duration_ms": call.server_duration_ms,
+            f"cosmos.{call.kind}.item_count": call.item_count,
+        }
+        if call.kind == "query":
+            span_attributes["cosmos.query.pages"] = call.pages
+            span_attributes["cosmos.query.partition_ranges"] = len(call.partition_ranges)
+        span.set_attributes(span_attributes)
+
+def get_cosmos_stats(operation: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Return aggregated Cosmos DB cost per calling operation"""
+    with _totals_lock:
+        if operation is not None:
+            return {operation: dict(_totals.get(operation, {}))}
+        return {name: dict(totals) for name, totals in _totals.items()}
@@ -3,6 +3,7 @@ import json
 from typing import Any, Dict
 from dotenv import load_dotenv
 from azure.cosmos import CosmosClient
+import cosmos_metrics
 
 load_dotenv(override=True)
 
@@ -36,11 +37,13 @@ def get_kyc_data(person_name: str) -> str:
             params.append({"name": param_name, "value": part})
         
         query = f"SELECT * FROM c WHERE {' OR '.join(conditions)}"
-        results = list(container.query_items(
+        results = cosmos_metrics.query_items(
+            container,
+            "get_kyc_data",
             query=query, 
             parameters=params,
             enable_cross_partition_query=True
-        ))
+        )
         
         if not results:
             return json.dumps({"error": f"No KYC records found matching '{person_name}'."})
@@ -60,7 +63,7 @@ def update_kyc_data(person_name: str, updated_data: Dict[str, Any]) -> str:
         container = _get_container()
         query = "SELECT * FROM c WHERE CONTAINS(LOWER(c.full_name), LOWER(@person_name))"
         params = [{"name": "@person_name", "value": person_name}]
-        results = list(container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
+        results = cosmos_metrics.query_items(container, "update_kyc_data", query=query, parameters=params, enable_cross_partition_query=True)
         
         if not results:
             return json.dumps({"error": f"No KYC record found for '{person_name}' to update."})
@@ -69,7 +72,7 @@ def update_kyc_data(person_name: str, updated_data: Dict[str, Any]) -> str:
         for key, val in updated_data.items():
             record[key] = val
 
-        container.upsert_item(record)
+        cosmos_metrics.upsert_item(container, "update_kyc_data", record)
         return json.dumps({
             "message": f"KYC record updated for {record['full_name']}", 
             "record": record